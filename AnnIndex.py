@@ -0,0 +1,497 @@
+import json
+import math
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import zlib
+import numpy
+from numpy.lib.format import open_memmap
+from sqlalchemy import text, bindparam
+from StatementIndex import IndexedBestMatch, TOKEN_PATTERN
+
+
+DEFAULT_DIMENSIONS = 128
+CHUNK_SIZE = 10000
+MAX_LISTS = 4096
+TRAINING_POINTS_PER_LIST = 64
+
+META_FILE = 'meta.json'
+CENTROIDS_FILE = 'centroids.npy'
+VECTORS_FILE = 'vectors.npy'
+IDS_FILE = 'ids.npy'
+OFFSETS_FILE = 'offsets.npy'
+DELTA_VECTORS_FILE = 'delta_vectors.npy'
+DELTA_IDS_FILE = 'delta_ids.npy'
+
+RESPONSE_STATEMENTS_QUERY = 'SELECT id, text FROM statement WHERE text IN (SELECT text FROM response) ORDER BY id'
+
+
+def default_index_path(database):
+    '''
+    default_index_path(database)
+
+    Returns
+    -------
+        The directory that the index for database is kept in. It sits
+        right next to the database, Ie, RC_2001-06.db.ann
+    '''
+    return str(database) + '.ann'
+
+
+def embed(words, dimensions=DEFAULT_DIMENSIONS):
+    '''
+    embed(words, dimensions)
+
+    Parameters
+    ----------
+        param1 : words
+            The statement text to turn into a vector.
+
+        param2 : dimensions
+            The length of the vector.
+
+    Returns
+    -------
+        A unit length numpy float32 vector.
+
+    Notes
+    -----
+        Every word and every three character sequence of the statement
+        is hashed with crc32 into one of the dimensions, with the sign
+        taken from the top bit of the hash. Words count twice as much
+        as character trigrams. The trigrams let spelling mistakes still
+        land close to the correct statement. crc32 is used instead of
+        hash() because hash() changes between runs of python, and the
+        vectors have to match the ones saved on disk.
+    '''
+    vector = numpy.zeros(dimensions, dtype=numpy.float32)
+    lowered = str(words).lower()
+    for token in TOKEN_PATTERN.findall(lowered):
+        hashed = zlib.crc32(('w:' + token).encode('utf-8'))
+        vector[hashed % dimensions] += 2.0 if hashed & 0x80000000 else -2.0
+    padded = ' ' + ' '.join(lowered.split()) + ' '
+    for position in range(len(padded) - 2):
+        hashed = zlib.crc32(padded[position:position + 3].encode('utf-8'))
+        vector[hashed % dimensions] += 1.0 if hashed & 0x80000000 else -1.0
+    norm = math.sqrt(float(vector.dot(vector)))
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def embed_many(texts, dimensions=DEFAULT_DIMENSIONS):
+    vectors = numpy.zeros((len(texts), dimensions), dtype=numpy.float32)
+    for row, statement_text in enumerate(texts):
+        vectors[row] = embed(statement_text, dimensions)
+    return vectors
+
+
+def nearest_centroids(vectors, centroids):
+    '''
+    nearest_centroids(vectors, centroids)
+
+    Returns
+    -------
+        The row of centroids with the largest dot product for every
+        row of vectors. We work through vectors in chunks so the score
+        matrix never gets bigger than CHUNK_SIZE x len(centroids).
+    '''
+    assignments = numpy.empty(len(vectors), dtype=numpy.int32)
+    for start in range(0, len(vectors), CHUNK_SIZE):
+        chunk = numpy.asarray(vectors[start:start + CHUNK_SIZE], dtype=numpy.float32)
+        assignments[start:start + len(chunk)] = chunk.dot(centroids.T).argmax(axis=1)
+    return assignments
+
+
+def train_centroids(vectors, lists, iterations, seed=0):
+    '''
+    train_centroids(vectors, lists, iterations, seed)
+
+    Notes
+    -----
+        Spherical k-means on a random sample of the vectors. We only
+        need the centroids to split the corpus into buckets of roughly
+        even size, so a sample of TRAINING_POINTS_PER_LIST vectors per
+        bucket and a handful of iterations is plenty.
+    '''
+    generator = numpy.random.RandomState(seed)
+    sample_size = min(len(vectors), lists * TRAINING_POINTS_PER_LIST)
+    sample = numpy.sort(generator.choice(len(vectors), sample_size, replace=False))
+    data = numpy.asarray(vectors[sample], dtype=numpy.float32)
+    centroids = data[generator.choice(sample_size, lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = nearest_centroids(data, centroids)
+        sums = numpy.zeros_like(centroids)
+        numpy.add.at(sums, assignments, data)
+        sizes = numpy.bincount(assignments, minlength=lists)
+        empty = sizes == 0
+        sums[empty] = data[generator.choice(sample_size, int(empty.sum()))]
+        norms = numpy.sqrt((sums * sums).sum(axis=1))
+        norms[norms == 0] = 1.0
+        centroids = sums / norms[:, None]
+    return centroids.astype(numpy.float32)
+
+
+def build_index(database, path=None, dimensions=DEFAULT_DIMENSIONS, lists=None, iterations=8, report=None):
+    '''
+    build_index(database, path, dimensions, lists, iterations, report)
+
+    Parameters
+    ----------
+        param1 : database
+            The path of the sqlite corpus, Ie, RC_2001-06.db
+
+        param2 : path
+            The directory to write the index to. Defaults to
+            default_index_path(database).
+
+        param3 : dimensions
+            The length of the statement vectors.
+
+        param4 : lists
+            The number of buckets the statements are split into. By
+            default this is the square root of the number of
+            statements, capped at MAX_LISTS.
+
+        param5 : iterations
+            The number of k-means iterations.
+
+        param6 : report
+            An optional function that is called with progress messages.
+
+    Returns
+    -------
+        The number of statements in the index.
+
+    Notes
+    -----
+        The index is written to path + '.building' and then moved into
+        place, so a build that dies half way never leaves a broken index
+        behind for the chatbot to load. Vectors are stored as float16 to
+        halve the size of the file, 10 million statements at 128
+        dimensions comes out at about 2.5 GB.
+    '''
+    path = path or default_index_path(database)
+    report = report or (lambda message: None)
+    connection = sqlite3.connect(database)
+    count = connection.execute('SELECT COUNT(*) FROM statement WHERE text IN (SELECT text FROM response)').fetchone()[0]
+    if count <= 0:
+        connection.close()
+        raise ValueError(str(database) + ' has no statements with a known response to index.')
+
+    staging = path + '.building'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    raw_path = os.path.join(staging, 'raw.npy')
+    raw = open_memmap(raw_path, mode='w+', dtype=numpy.float16, shape=(count, dimensions))
+    ids = numpy.empty(count, dtype=numpy.int64)
+    position = 0
+    cursor = connection.execute(RESPONSE_STATEMENTS_QUERY)
+    while position < count:
+        rows = cursor.fetchmany(CHUNK_SIZE)[:count - position]
+        if not rows:
+            break
+        ids[position:position + len(rows)] = [row[0] for row in rows]
+        raw[position:position + len(rows)] = embed_many([row[1] for row in rows], dimensions)
+        position += len(rows)
+        report('Embedded ' + str(position) + ' of ' + str(count) + ' statements')
+    connection.close()
+    count = position
+
+    if lists is None:
+        lists = int(round(math.sqrt(count)))
+    lists = max(1, min(int(lists), MAX_LISTS, count))
+    report('Training ' + str(lists) + ' centroids')
+    centroids = train_centroids(raw[:count], lists, iterations)
+
+    assignments = nearest_centroids(raw[:count], centroids)
+    order = numpy.argsort(assignments, kind='stable')
+    offsets = numpy.concatenate([[0], numpy.cumsum(numpy.bincount(assignments, minlength=lists))]).astype(numpy.int64)
+
+    vectors = open_memmap(os.path.join(staging, VECTORS_FILE), mode='w+', dtype=numpy.float16, shape=(count, dimensions))
+    for start in range(0, count, CHUNK_SIZE):
+        vectors[start:start + CHUNK_SIZE] = raw[order[start:start + CHUNK_SIZE]]
+    vectors.flush()
+    del vectors
+    del raw
+    os.remove(raw_path)
+
+    numpy.save(os.path.join(staging, IDS_FILE), ids[:count][order])
+    numpy.save(os.path.join(staging, OFFSETS_FILE), offsets)
+    numpy.save(os.path.join(staging, CENTROIDS_FILE), centroids)
+    with open(os.path.join(staging, META_FILE), 'w') as out:
+        json.dump({'database': os.path.basename(str(database)),
+                   'dimensions': dimensions,
+                   'lists': lists,
+                   'count': count,
+                   'delta_count': 0,
+                   'built': time.strftime('%Y-%m-%d %H:%M:%S')}, out, indent=4)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(staging, path)
+    report('Indexed ' + str(count) + ' statements into ' + path)
+    return count
+
+
+def add_to_index(database, path=None, report=None):
+    '''
+    add_to_index(database, path, report)
+
+    Returns
+    -------
+        The number of statements that were added.
+
+    Notes
+    -----
+        Response statements that are in the database but not in the
+        index are embedded and appended to the delta files. The delta
+        is searched in full on every query, so once it grows past a
+        few percent of the index it's time to run a full build again.
+    '''
+    path = path or default_index_path(database)
+    report = report or (lambda message: None)
+    index = AnnIndex(path)
+    index.load()
+    indexed = numpy.sort(numpy.concatenate([numpy.asarray(index.ids), numpy.asarray(index.delta_ids)]))
+
+    new_ids = []
+    new_texts = []
+    connection = sqlite3.connect(database)
+    cursor = connection.execute(RESPONSE_STATEMENTS_QUERY)
+    while True:
+        rows = cursor.fetchmany(CHUNK_SIZE)
+        if not rows:
+            break
+        chunk_ids = numpy.array([row[0] for row in rows], dtype=numpy.int64)
+        positions = numpy.searchsorted(indexed, chunk_ids)
+        positions[positions >= len(indexed)] = 0
+        missing = indexed[positions] != chunk_ids if len(indexed) > 0 else numpy.ones(len(rows), dtype=bool)
+        for row, is_missing in zip(rows, missing):
+            if is_missing:
+                new_ids.append(row[0])
+                new_texts.append(row[1])
+    connection.close()
+
+    if len(new_ids) <= 0:
+        report('The index is up to date')
+        return 0
+
+    delta_vectors = numpy.concatenate([numpy.asarray(index.delta_vectors), embed_many(new_texts, index.dimensions).astype(numpy.float16)])
+    delta_ids = numpy.concatenate([numpy.asarray(index.delta_ids), numpy.array(new_ids, dtype=numpy.int64)])
+    index.close()
+    _replace_file(os.path.join(path, DELTA_VECTORS_FILE), delta_vectors)
+    _replace_file(os.path.join(path, DELTA_IDS_FILE), delta_ids)
+
+    meta = dict(index.meta)
+    meta['delta_count'] = len(delta_ids)
+    meta['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    with open(os.path.join(path, META_FILE), 'w') as out:
+        json.dump(meta, out, indent=4)
+    report('Added ' + str(len(new_ids)) + ' statements, ' + str(len(delta_ids)) + ' are waiting for the next build')
+    return len(new_ids)
+
+
+def _replace_file(path, array):
+    with open(path + '.tmp', 'wb') as out:
+        numpy.save(out, array)
+    os.replace(path + '.tmp', path)
+
+
+class AnnIndex(object):
+    '''
+    AnnIndex(object):
+
+    Parameters
+    ----------
+        param1 : path
+            The directory that build_index() wrote the index to.
+
+    Attributes
+    ----------
+        self.meta
+            The contents of meta.json.
+
+        self.centroids
+            One unit vector per bucket, loaded into memory.
+
+        self.vectors
+            Every indexed statement vector, memory mapped and sorted by
+            bucket so each bucket is one contiguous slice.
+
+        self.ids
+            The statement.id of every row of self.vectors.
+
+        self.offsets
+            Bucket n is rows self.offsets[n] to self.offsets[n + 1].
+
+        self.delta_vectors, self.delta_ids
+            Statements added with add_to_index() since the last build.
+
+    Members
+    -------
+        def exists(self)
+            True if there's an index at self.path.
+
+        def load(self)
+            Memory maps the index files.
+
+        def search(self, words, count, probes)
+            Returns the statement ids of the count statements closest
+            to words, searching the probes closest buckets.
+
+    Notes
+    -----
+        Because the vectors are memory mapped, loading the index at
+        startup only reads meta.json, the centroids and the offsets.
+        The operating system pages in the buckets that queries touch.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.meta = {}
+        self.dimensions = DEFAULT_DIMENSIONS
+        self.centroids = None
+        self.vectors = None
+        self.ids = None
+        self.offsets = None
+        self.delta_vectors = None
+        self.delta_ids = None
+
+    def exists(self):
+        return os.path.isfile(os.path.join(self.path, META_FILE))
+
+    def load(self):
+        with open(os.path.join(self.path, META_FILE)) as meta:
+            self.meta = json.load(meta)
+        self.dimensions = int(self.meta['dimensions'])
+        self.centroids = numpy.load(os.path.join(self.path, CENTROIDS_FILE))
+        self.offsets = numpy.load(os.path.join(self.path, OFFSETS_FILE))
+        self.vectors = numpy.load(os.path.join(self.path, VECTORS_FILE), mmap_mode='r')
+        self.ids = numpy.load(os.path.join(self.path, IDS_FILE), mmap_mode='r')
+        if os.path.isfile(os.path.join(self.path, DELTA_IDS_FILE)):
+            self.delta_vectors = numpy.load(os.path.join(self.path, DELTA_VECTORS_FILE), mmap_mode='r')
+            self.delta_ids = numpy.load(os.path.join(self.path, DELTA_IDS_FILE), mmap_mode='r')
+        else:
+            self.delta_vectors = numpy.zeros((0, self.dimensions), dtype=numpy.float16)
+            self.delta_ids = numpy.zeros(0, dtype=numpy.int64)
+        return self
+
+    def close(self):
+        self.vectors = None
+        self.ids = None
+        self.delta_vectors = None
+        self.delta_ids = None
+
+    def search(self, words, count=20, probes=8):
+        query = embed(words, self.dimensions)
+        probes = max(1, min(int(probes), len(self.centroids)))
+        buckets = numpy.argpartition(-self.centroids.dot(query), probes - 1)[:probes]
+
+        scores = []
+        ids = []
+        for bucket in buckets:
+            start, end = int(self.offsets[bucket]), int(self.offsets[bucket + 1])
+            if end > start:
+                scores.append(numpy.asarray(self.vectors[start:end], dtype=numpy.float32).dot(query))
+                ids.append(self.ids[start:end])
+        if len(self.delta_ids) > 0:
+            scores.append(numpy.asarray(self.delta_vectors, dtype=numpy.float32).dot(query))
+            ids.append(self.delta_ids)
+        if len(scores) <= 0:
+            return []
+
+        scores = numpy.concatenate(scores)
+        ids = numpy.concatenate(ids)
+        if len(scores) > count:
+            best = numpy.argpartition(-scores, count - 1)[:count]
+        else:
+            best = numpy.arange(len(scores))
+        best = best[numpy.argsort(-scores[best])]
+        return [int(statement_id) for statement_id in ids[best]]
+
+
+class AnnBestMatch(IndexedBestMatch):
+    '''
+    AnnBestMatch(IndexedBestMatch):
+
+    Parameters
+    ----------
+        param1 : **kwargs
+            The keyword arguments that ChatBot() passes to every logic
+            adapter. We use database to find the index, and
+            ann_index_path, ann_candidates and ann_probes if they're
+            supplied.
+
+    Attributes
+    ----------
+        self.ann_index
+            The loaded AnnIndex() or None if the index hasn't been
+            built yet. In that case we fall back to the token index of
+            IndexedBestMatch.
+
+        self.learned
+            Vectors of statements that became response statements while
+            the program has been running. They're searched along side
+            the index until the next 'index add'.
+
+    Notes
+    -----
+        The index is built with 'python Sentience.py index build' and
+        kept up to date with 'python Sentience.py index add'. The
+        closest statements are then compared to the input with
+        Levenshtein distance exactly like BestMatch does, so the
+        confidence values mean the same thing.
+    '''
+
+    def __init__(self, **kwargs):
+        super(AnnBestMatch, self).__init__(**kwargs)
+        database = kwargs.get('database')
+        self.index_path = kwargs.get('ann_index_path') or (default_index_path(database) if database else None)
+        self.candidate_count = int(kwargs.get('ann_candidates', 20))
+        self.probes = int(kwargs.get('ann_probes', 8))
+        self.ann_index = None
+        self.learned = {}
+        self.__lock = threading.Lock()
+        if self.index_path and AnnIndex(self.index_path).exists():
+            self.ann_index = AnnIndex(self.index_path).load()
+        else:
+            self.logger.info('No ANN index at {}. Run "python Sentience.py index build" to create one.'.format(self.index_path))
+
+    def set_chatbot(self, chatbot):
+        super(AnnBestMatch, self).set_chatbot(chatbot)
+        listeners = getattr(chatbot.storage, 'update_listeners', None)
+        if listeners is not None:
+            listeners.append(self.learn)
+
+    def learn(self, texts):
+        if self.ann_index is None:
+            return None
+        with self.__lock:
+            for statement_text in texts:
+                if statement_text not in self.learned:
+                    self.learned[statement_text] = embed(statement_text, self.ann_index.dimensions)
+
+    def get_candidates(self, input_statement):
+        if self.ann_index is None:
+            return super(AnnBestMatch, self).get_candidates(input_statement)
+
+        statement_ids = self.ann_index.search(input_statement.text, self.candidate_count, self.probes)
+        candidates = []
+        if len(statement_ids) > 0:
+            query = text('SELECT text FROM statement WHERE id IN :ids')
+            query = query.bindparams(bindparam('ids', expanding=True))
+            with self.chatbot.storage.engine.connect() as connection:
+                candidates = [row[0] for row in connection.execute(query, {'ids': statement_ids}).fetchall()]
+
+        with self.__lock:
+            learned = list(self.learned.items())
+        if len(learned) > 0:
+            vector = embed(input_statement.text, self.ann_index.dimensions)
+            scores = numpy.array([learned_vector.dot(vector) for _, learned_vector in learned])
+            for position in numpy.argsort(-scores)[:self.candidate_count]:
+                if learned[position][0] not in candidates:
+                    candidates.append(learned[position][0])
+        return candidates
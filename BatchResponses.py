@@ -0,0 +1,263 @@
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+
+
+TIMESTAMP_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} ?')
+
+_chatbot = None
+_startup_error = None
+
+
+def read_statements(lines):
+    '''
+    read_statements(lines)
+
+    Parameters
+    ----------
+        param1 : lines
+            An open text file, or anything else that hands out lines.
+
+    Returns
+    -------
+        A generator of (line number, statement) for every line that
+        isn't blank. The timestamp User_Statements.txt and
+        Caprica_Statements.txt put in front of every statement is
+        taken off, so those files can be replayed as they are.
+    '''
+    for number, line in enumerate(lines, 1):
+        statement = TIMESTAMP_PATTERN.sub('', line.strip(), count=1).strip()
+        if statement:
+            yield number, statement
+
+
+def worker_config(database, matcher):
+    '''
+    worker_config(database, matcher)
+
+    Returns
+    -------
+        sentience.ini with [corpus] database and [corpus] matcher
+        replaced by database and matcher when they're given.
+    '''
+    from SentienceConfig import load_config
+
+    config = load_config()
+    if database is not None:
+        config.set('corpus', 'database', database)
+    if matcher is not None:
+        config.set('corpus', 'matcher', matcher)
+    return config
+
+
+def check_settings(database, matcher):
+    '''
+    check_settings(database, matcher)
+
+    Exceptions
+    ----------
+        ValueError
+            Raised if the matcher isn't one of CapricaBot.MATCHERS or
+            the corpus database, or one of its shards, doesn't exist.
+
+    Notes
+    -----
+        Called before any worker is started, so the usual mistakes are
+        reported once instead of by every worker. sqlite would quietly
+        make an empty database and every statement would be answered
+        from nothing.
+    '''
+    from CapricaBot import MATCHERS
+    from ShardedStorage import expand_shards
+
+    config = worker_config(database, matcher)
+    matcher = config.get('corpus', 'matcher')
+    if matcher not in MATCHERS:
+        raise ValueError('Unknown matcher ' + matcher + '. Use one of ' + ', '.join(sorted(MATCHERS)))
+    paths = expand_shards(config.get('corpus', 'shards'), config.get('corpus', 'database')) or [config.get('corpus', 'database')]
+    for path in paths:
+        if not os.path.isfile(path):
+            raise ValueError('There is no corpus database at ' + path)
+
+
+def start_worker(database, matcher):
+    '''
+    start_worker(database, matcher)
+
+    Notes
+    -----
+        Runs once in every worker process. Each of them builds its own
+        read_only chatbot, so nothing is learned from the replay. The
+        only thing a worker writes is the empty conversation every
+        ChatBot() starts with.
+
+        If the chatbot can't be built the error is kept in
+        _startup_error rather than raised. A Pool whose initializer
+        raises starts a new worker in its place, which fails the same
+        way, forever, and the batch never finishes.
+    '''
+    global _chatbot, _startup_error
+    from CapricaBot import build_chatbot
+
+    try:
+        _chatbot = build_chatbot(worker_config(database, matcher), read_only=True)
+    except Exception as error:
+        _startup_error = type(error).__name__ + ': ' + str(error)
+
+
+def answer(item):
+    '''
+    answer(item)
+
+    Parameters
+    ----------
+        param1 : item
+            (line number, statement)
+
+    Returns
+    -------
+        The dictionary that's written as one line of the results, with
+        how long get_response() took in milliseconds. A statement the
+        chatbot fails on gets an error instead of a response rather
+        than stopping the batch.
+
+    Exceptions
+    ----------
+        RuntimeError
+            Raised if this worker couldn't build its chatbot, which
+            stops the batch.
+    '''
+    if _chatbot is None:
+        raise RuntimeError('A worker could not build its chatbot: ' + str(_startup_error))
+    number, statement = item
+    start = time.perf_counter()
+    result = {'line': number, 'input': statement}
+    try:
+        response = _chatbot.get_response(statement)
+        result['response'] = response.text
+        result['confidence'] = response.confidence
+    except Exception as error:
+        result['error'] = type(error).__name__ + ': ' + str(error)
+    result['latency_ms'] = round(1000.0 * (time.perf_counter() - start), 3)
+    return result
+
+
+def _throttle(statements, slots, stopping):
+    '''
+    _throttle(statements, slots, stopping)
+
+    Notes
+    -----
+        Runs on the Pools task thread. Waits for a free slot before
+        handing out each statement, and gives up once stopping is set
+        so terminate() isn't left waiting on us.
+    '''
+    for item in statements:
+        while not slots.acquire(timeout=0.1):
+            if stopping.is_set():
+                return None
+        if stopping.is_set():
+            return None
+        yield item
+
+
+def answer_file(lines, output, workers=None, database=None, matcher=None, chunk_size=8, report=None):
+    '''
+    answer_file(lines, output, workers, database, matcher, chunk_size, report)
+
+    Parameters
+    ----------
+        param1 : lines
+            The statements to answer, one per line. See read_statements().
+
+        param2 : output
+            The open file the results are written to, one JSON object
+            per line, in the same order as the statements.
+
+        param3 : workers
+            How many processes answer statements. Defaults to one per
+            core.
+
+        param4 : database, param5 : matcher
+            Replace [corpus] database and [corpus] matcher from
+            sentience.ini when they're given.
+
+        param6 : chunk_size
+            Statements handed to a worker at a time.
+
+        param7 : report
+            An optional function that's called with a line of progress
+            every 1000 statements and with the totals at the end.
+
+    Returns
+    -------
+        A dictionary of the totals: answered, errors, seconds, per_second
+        and the p50, p95 and p99 latency in milliseconds.
+
+    Exceptions
+    ----------
+        ValueError
+            Raised by check_settings() before any worker is started.
+
+        RuntimeError
+            Raised if a worker couldn't build its chatbot. Whatever was
+            answered before that has been written to output.
+
+    Notes
+    -----
+        A chatbot answers one statement at a time, and the GIL would
+        keep threads from doing any better, so every worker is its own
+        process with its own chatbot. They share nothing but the
+        corpus files, which sqlite and the operating systems page
+        cache are happy to let any number of readers at, so throughput
+        goes up with the number of cores until the disk can't keep up.
+
+        The whole file goes through one imap(), which hands results
+        back in the order of the file, so a worker that's done with its
+        chunk picks up the next one straight away instead of waiting
+        for the slowest chunk of the others. The Pool reads the
+        statements from a thread of its own, which would read the
+        whole file into its queue if we let it, so every statement
+        takes a slot and every result we write gives one back. No
+        more than workers * chunk_size * 4 are ever in memory, and the
+        first results show up straight away.
+    '''
+    from LatencyMetrics import Histogram
+
+    check_settings(database, matcher)
+    workers = workers or multiprocessing.cpu_count()
+    slots = threading.Semaphore(max(chunk_size, workers * chunk_size * 4))
+    stopping = threading.Event()
+    histogram = Histogram()
+    errors = 0
+    start = time.perf_counter()
+    pool = multiprocessing.Pool(workers, initializer=start_worker, initargs=(database, matcher))
+    try:
+        for result in pool.imap(answer, _throttle(read_statements(lines), slots, stopping), chunk_size):
+            slots.release()
+            output.write(json.dumps(result) + '\n')
+            histogram.add(result['latency_ms'] / 1000.0)
+            if 'error' in result:
+                errors += 1
+            if report is not None and histogram.count % 1000 == 0:
+                report(str(histogram.count) + ' answered, ' + '{:.1f}'.format(histogram.count / (time.perf_counter() - start)) + ' a second')
+        pool.close()
+    finally:
+        stopping.set()
+        pool.terminate()
+        pool.join()
+    seconds = time.perf_counter() - start
+    totals = {'answered': histogram.count,
+              'errors': errors,
+              'seconds': round(seconds, 3),
+              'per_second': round(histogram.count / seconds, 1) if seconds > 0 else 0.0,
+              'p50': round(1000.0 * histogram.percentile(50), 3),
+              'p95': round(1000.0 * histogram.percentile(95), 3),
+              'p99': round(1000.0 * histogram.percentile(99), 3)}
+    if report is not None:
+        report(' '.join(key + '=' + str(totals[key]) for key in ('answered', 'errors', 'seconds', 'per_second', 'p50', 'p95', 'p99')))
+    return totals
+
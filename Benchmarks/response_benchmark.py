@@ -0,0 +1,286 @@
+'''
+response_benchmark.py
+
+Measures chatbot.get_response() throughput, latency percentiles and peak
+memory for every matcher in CapricaBot.MATCHERS over corpora of
+increasing size.
+
+Usage
+-----
+    python Benchmarks/response_benchmark.py [--database RC_2001-06.db]
+                                            [--samples 250,500,all]
+                                            [--synthetic 2000,10000,50000]
+                                            [--matchers index,tfidf,ann,bestmatch]
+                                            [--queries 100] [--time-limit 60]
+                                            [--seed 7] [--json results.json]
+
+Notes
+-----
+    Two kinds of corpora are built in a temporary folder. 'sample-N' is N
+    conversation pairs drawn from the bundled database. 'synthetic-N' is
+    N made up statements, chained into a conversation. Their words are
+    drawn with the word frequencies of the bundled database and their
+    lengths follow its statement lengths. Every corpus is migrated like
+    SentienceScreen does at start up.
+
+    The queries are the same for every run. They're response statements
+    from the bundled database with one word dropped, so nothing wins
+    with an exact match.
+
+    Every corpus and matcher pair runs in a fresh process so that peak
+    RSS is the peak of that run alone. The chatbot is built through
+    CapricaBot.build_chatbot() with read_only=True, which is the app's
+    chatbot minus learning. Only chatterbot and the matcher's own
+    dependencies are imported, never kivy or the audio libraries, so
+    this runs on a server. A run that goes over --time-limit stops and
+    reports the queries it got through. Matchers whose dependencies
+    aren't installed are skipped.
+
+    Every logic adapter is warmed up before the clock starts, the lazy
+    time adapter included. Otherwise the first query with the word time
+    in it pays for loading nltk and that one query is the p99.
+'''
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from CapricaBot import MATCHERS
+from CorpusSchema import migrate
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+TABLES = ('tag', 'statement', 'conversation', 'tag_association', 'response', 'conversation_association')
+
+
+def make_queries(database, count, seed):
+    connection = sqlite3.connect(database)
+    rows = connection.execute('SELECT text FROM statement WHERE text IN (SELECT text FROM response) ORDER BY id').fetchall()
+    connection.close()
+    generator = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = generator.choice(rows)[0].split()
+        if len(words) > 2:
+            del words[generator.randrange(len(words))]
+        queries.append(' '.join(words))
+    return queries
+
+
+def create_schema(source, path):
+    '''
+    Creates an empty corpus at path with the chatterbot tables of source.
+    '''
+    connection = sqlite3.connect(source)
+    statements = [row[0] for row in connection.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name IN (" + ', '.join('?' * len(TABLES)) + ')', TABLES)]
+    connection.close()
+    target = sqlite3.connect(path)
+    for statement in statements:
+        target.execute(statement)
+    target.commit()
+    return target
+
+
+def sample_corpus(source, path, pairs, seed):
+    '''
+    Copies pairs random rows of the response table of source, and the two
+    statements each of them joins, into a new corpus at path.
+    '''
+    connection = sqlite3.connect(source)
+    rows = connection.execute('SELECT text, created_at, occurrence, statement_text FROM response ORDER BY id').fetchall()
+    if pairs is not None and pairs < len(rows):
+        rows = random.Random(seed).sample(rows, pairs)
+    texts = set(row[0] for row in rows) | set(row[3] for row in rows)
+    statements = [row for row in connection.execute('SELECT text, extra_data FROM statement ORDER BY id') if row[0] in texts]
+    connection.close()
+    target = create_schema(source, path)
+    with target:
+        target.executemany('INSERT INTO statement (text, extra_data) VALUES (?, ?)', statements)
+        target.executemany('INSERT INTO response (text, created_at, occurrence, statement_text) VALUES (?, ?, ?, ?)', rows)
+    target.close()
+    return len(statements)
+
+
+def synthetic_corpus(source, path, size, seed):
+    '''
+    Writes size made up statements to a new corpus at path. Each one is
+    the response to the one before it, like a trained conversation.
+    '''
+    connection = sqlite3.connect(source)
+    texts = [row[0] for row in connection.execute('SELECT text FROM statement')]
+    connection.close()
+    frequencies = Counter(word for text in texts for word in text.split())
+    words = list(frequencies)
+    weights = [frequencies[word] for word in words]
+    lengths = [len(text.split()) for text in texts]
+    generator = random.Random(seed)
+    extra_data = pickle.dumps({})
+    statements = []
+    seen = set()
+    while len(statements) < size:
+        text = ' '.join(generator.choices(words, weights, k=generator.choice(lengths)))
+        if text not in seen:
+            seen.add(text)
+            statements.append(text)
+    target = create_schema(source, path)
+    with target:
+        target.executemany('INSERT INTO statement (text, extra_data) VALUES (?, ?)', ((text, extra_data) for text in statements))
+        target.executemany("INSERT INTO response (text, created_at, occurrence, statement_text) VALUES (?, datetime('now'), 1, ?)", zip(statements, statements[1:]))
+    target.close()
+    return len(statements)
+
+
+def peak_rss():
+    '''
+    Returns the peak resident set size of this process in megabytes, or
+    None where the resource module doesn't exist.
+    '''
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak / 1048576.0
+    return peak / 1024.0
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_matcher(database, matcher, queries, time_limit, results):
+    '''
+    Runs in its own process. Puts a dictionary of results, or of the
+    error that stopped it, on the results queue.
+    '''
+    try:
+        from CapricaBot import build_chatbot
+        from SentienceConfig import load_config
+        from TimeMatch import warm_adapters
+
+        config = load_config()
+        config.set('corpus', 'database', database)
+        config.set('corpus', 'matcher', matcher)
+        start = time.perf_counter()
+        if matcher == 'ann':
+            from AnnIndex import build_index
+            build_index(database)
+        chatbot = build_chatbot(config, read_only=True)
+        warm_adapters(chatbot, wait=True)
+        chatbot.get_response('warm up')
+        chatbot.get_response('what time is it')
+        setup = time.perf_counter() - start
+        latencies = []
+        deadline = time.perf_counter() + time_limit
+        begin = time.perf_counter()
+        for query in queries:
+            start = time.perf_counter()
+            chatbot.get_response(query)
+            latencies.append(time.perf_counter() - start)
+            if start > deadline:
+                break
+        elapsed = time.perf_counter() - begin
+        results.put({'setup': setup,
+                     'answered': len(latencies),
+                     'qps': len(latencies) / elapsed,
+                     'p50': 1000 * percentile(latencies, 0.50),
+                     'p95': 1000 * percentile(latencies, 0.95),
+                     'p99': 1000 * percentile(latencies, 0.99),
+                     'rss': peak_rss()})
+    except ImportError as error:
+        results.put({'skipped': 'needs ' + str(error)})
+    except Exception as error:
+        results.put({'error': type(error).__name__ + ': ' + str(error)})
+
+
+def run_isolated(context, database, matcher, queries, time_limit):
+    results = context.Queue()
+    process = context.Process(target=run_matcher, args=(database, matcher, queries, time_limit, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def parse_sizes(value):
+    sizes = []
+    for part in value.split(','):
+        part = part.strip()
+        if part == 'all':
+            sizes.append(None)
+        elif part:
+            sizes.append(int(part))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--database', default='RC_2001-06.db')
+    parser.add_argument('--samples', default='250,500,all', help='Conversation pairs per sampled corpus, all for every one.')
+    parser.add_argument('--synthetic', default='2000,10000,50000', help='Statements per synthetic corpus.')
+    parser.add_argument('--matchers', default='index,tfidf,ann,bestmatch')
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--time-limit', type=float, default=60, help='Seconds of queries per run before it stops early.')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', default=None, help='Also write every result to this file.')
+    arguments = parser.parse_args()
+
+    matchers = [matcher.strip() for matcher in arguments.matchers.split(',') if matcher.strip()]
+    for matcher in matchers:
+        if matcher not in MATCHERS:
+            parser.error('Unknown matcher ' + matcher + '. Use some of ' + ', '.join(sorted(MATCHERS)))
+    source = os.path.abspath(arguments.database)
+    queries = make_queries(source, arguments.queries, arguments.seed)
+    context = multiprocessing.get_context('spawn')
+    directory = tempfile.mkdtemp()
+    report = []
+    try:
+        corpora = []
+        for pairs in parse_sizes(arguments.samples):
+            path = os.path.join(directory, 'sample-' + str(pairs or 'all') + '.db')
+            statements = sample_corpus(source, path, pairs, arguments.seed)
+            corpora.append(('sample-' + str(pairs or 'all'), path, statements))
+        for size in parse_sizes(arguments.synthetic):
+            path = os.path.join(directory, 'synthetic-' + str(size) + '.db')
+            statements = synthetic_corpus(source, path, size, arguments.seed)
+            corpora.append(('synthetic-' + str(size), path, statements))
+
+        print('{:<18} {:>10} {:<10} {:>8} {:>9} {:>9} {:>9} {:>9} {:>8}'.format('corpus', 'statements', 'matcher', 'setup s', 'q/s', 'p50 ms', 'p95 ms', 'p99 ms', 'rss MB'))
+        for name, path, statements in corpora:
+            migrate(path, 0)
+            for matcher in matchers:
+                result = run_isolated(context, path, matcher, queries, arguments.time_limit)
+                result.update({'corpus': name, 'statements': statements, 'matcher': matcher})
+                report.append(result)
+                if 'skipped' in result or 'error' in result:
+                    print('{:<18} {:>10} {:<10} {}'.format(name, statements, matcher, result.get('skipped') or result.get('error')))
+                    continue
+                print('{:<18} {:>10} {:<10} {:>8.2f} {:>9.1f} {:>9.2f} {:>9.2f} {:>9.2f} {:>8}'.format(
+                    name, statements, matcher, result['setup'], result['qps'], result['p50'], result['p95'], result['p99'],
+                    '-' if result['rss'] is None else '{:.0f}'.format(result['rss'])))
+                if result['answered'] < len(queries):
+                    print('{:<18} {:>10} {:<10} stopped after {} of {} queries'.format('', '', '', result['answered'], len(queries)))
+                sys.stdout.flush()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    if arguments.json is not None:
+        with open(arguments.json, 'w') as out:
+            json.dump(report, out, indent=2)
+
+
+if __name__ == '__main__':
+    main()
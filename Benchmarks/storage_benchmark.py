@@ -0,0 +1,93 @@
+'''
+storage_benchmark.py
+
+Measures read and learn throughput of the corpus database under each of
+the sqlite profiles in StorageProfile.PROFILES.
+
+Usage
+-----
+    python Benchmarks/storage_benchmark.py [--database RC_2001-06.db]
+                                           [--reads 2000] [--learns 300]
+                                           [--seed 7]
+
+Notes
+-----
+    Every profile gets its own temporary copy of the database. A read is
+    what BestMatch does once it has a closest match, storage.find() of
+    the statement followed by storage.filter(in_response_to__contains).
+    A learn is chatbot.learn_response() of a statement the corpus hasn't
+    seen, which is one committed write transaction, the same as a turn
+    of conversation. 'default' is chatterbot on its own and is the
+    before number.
+'''
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatterbot import ChatBot
+from chatterbot.conversation import Statement
+from StorageProfile import PROFILES
+
+
+def load_prompts(database):
+    connection = sqlite3.connect(database)
+    rows = connection.execute('SELECT text FROM statement WHERE text IN (SELECT text FROM response)').fetchall()
+    connection.close()
+    return [row[0] for row in rows]
+
+
+def run_profile(database, pragmas, prompts, reads, learns, seed):
+    directory = tempfile.mkdtemp()
+    try:
+        copy = os.path.join(directory, 'corpus.db')
+        shutil.copyfile(database, copy)
+        chatbot = ChatBot('Caprica',
+                          storage_adapter='StatementIndex.IndexedSQLStorageAdapter',
+                          logic_adapters=['StatementIndex.IndexedBestMatch'],
+                          database=copy,
+                          sqlite_pragmas=pragmas)
+        storage = chatbot.storage
+        generator = random.Random(seed)
+
+        start = time.perf_counter()
+        for _ in range(reads):
+            prompt = generator.choice(prompts)
+            storage.find(prompt)
+            storage.filter(in_response_to__contains=prompt)
+        read_rate = reads / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for number in range(learns):
+            statement = Statement('benchmark statement ' + str(number) + ' ' + str(seed))
+            chatbot.learn_response(statement, Statement(generator.choice(prompts)))
+        learn_rate = learns / (time.perf_counter() - start)
+        storage.engine.dispose()
+        return read_rate, learn_rate
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--database', default='RC_2001-06.db')
+    parser.add_argument('--reads', type=int, default=2000)
+    parser.add_argument('--learns', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=7)
+    arguments = parser.parse_args()
+
+    prompts = load_prompts(arguments.database)
+    print('{:<10} {:>12} {:>12}'.format('profile', 'reads/s', 'learns/s'))
+    for name in ('default', 'durable', 'fast', 'bulk'):
+        read_rate, learn_rate = run_profile(arguments.database, PROFILES[name], prompts, arguments.reads, arguments.learns, arguments.seed)
+        print('{:<10} {:>12.0f} {:>12.0f}'.format(name, read_rate, learn_rate))
+
+
+if __name__ == '__main__':
+    main()
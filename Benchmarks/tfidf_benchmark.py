@@ -0,0 +1,109 @@
+'''
+tfidf_benchmark.py
+
+Compares the response latency of StatementIndex.IndexedBestMatch,
+chatterbot.logic.BestMatch and TfidfMatch.TfidfBestMatch on a copy of
+the bundled RC_2001-06.db.
+
+Usage
+-----
+    python Benchmarks/tfidf_benchmark.py [--database RC_2001-06.db]
+                                         [--queries 200] [--seed 7]
+
+Notes
+-----
+    Each adapter gets its own temporary copy of the database and a
+    read only ChatBot() so nothing is learned while we're timing. The
+    queries are response statements taken from the database with one
+    word dropped, so that none of the adapters can win with an exact
+    match.
+'''
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatterbot import ChatBot
+
+
+ADAPTERS = [
+    ('BestMatch', 'chatterbot.storage.SQLStorageAdapter', 'chatterbot.logic.BestMatch'),
+    ('IndexedBestMatch', 'StatementIndex.IndexedSQLStorageAdapter', 'StatementIndex.IndexedBestMatch'),
+    ('TfidfBestMatch', 'StatementIndex.IndexedSQLStorageAdapter', 'TfidfMatch.TfidfBestMatch'),
+]
+
+
+def make_queries(database, count, seed):
+    connection = sqlite3.connect(database)
+    rows = connection.execute('SELECT text FROM statement WHERE text IN (SELECT text FROM response)').fetchall()
+    connection.close()
+    generator = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = generator.choice(rows)[0].split()
+        if len(words) > 2:
+            del words[generator.randrange(len(words))]
+        queries.append(' '.join(words))
+    return queries
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_adapter(database, storage_adapter, logic_adapter, queries):
+    directory = tempfile.mkdtemp()
+    try:
+        copy = os.path.join(directory, 'corpus.db')
+        shutil.copyfile(database, copy)
+        start = time.perf_counter()
+        chatbot = ChatBot('Caprica',
+                          storage_adapter=storage_adapter,
+                          logic_adapters=[logic_adapter],
+                          database=copy,
+                          read_only=True)
+        chatbot.get_response('warm up')
+        setup = time.perf_counter() - start
+        latencies = []
+        answers = []
+        for query in queries:
+            start = time.perf_counter()
+            answers.append(str(chatbot.get_response(query)))
+            latencies.append(time.perf_counter() - start)
+        return setup, latencies, answers
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--database', default='RC_2001-06.db')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    arguments = parser.parse_args()
+
+    queries = make_queries(arguments.database, arguments.queries, arguments.seed)
+    baseline = None
+    print('{:<18} {:>9} {:>10} {:>10} {:>10} {:>9}'.format('adapter', 'setup s', 'mean ms', 'p50 ms', 'p95 ms', 'agree'))
+    for name, storage_adapter, logic_adapter in ADAPTERS:
+        setup, latencies, answers = run_adapter(arguments.database, storage_adapter, logic_adapter, queries)
+        if baseline is None:
+            baseline = answers
+        agreement = sum(1 for a, b in zip(answers, baseline) if a == b) / float(len(queries))
+        print('{:<18} {:>9.2f} {:>10.2f} {:>10.2f} {:>10.2f} {:>8.0%}'.format(
+            name, setup,
+            1000 * sum(latencies) / len(latencies),
+            1000 * percentile(latencies, 0.50),
+            1000 * percentile(latencies, 0.95),
+            agreement))
+
+
+if __name__ == '__main__':
+    main()
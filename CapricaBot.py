@@ -0,0 +1,107 @@
+from chatterbot import ChatBot
+from StorageProfile import profile_pragmas
+from ShardedStorage import expand_shards
+from MemoryCorpus import default_snapshot_path
+
+
+MATCHERS = {
+    'bestmatch': 'chatterbot.logic.BestMatch',
+    'index': 'StatementIndex.IndexedBestMatch',
+    'tfidf': 'TfidfMatch.TfidfBestMatch',
+    'ann': 'AnnIndex.AnnBestMatch',
+}
+
+
+def build_chatbot(config, **kwargs):
+    '''
+    build_chatbot(config, **kwargs)
+
+    Parameters
+    ----------
+        param1 : config
+            The ConfigParser returned by SentienceConfig.load_config().
+            The [corpus] section picks the database and the logic
+            adapter that finds the closest statement to the input.
+
+        param2 : **kwargs
+            Anything here is passed straight to ChatBot() and replaces
+            the value we'd otherwise use. Ie, read_only=True.
+
+    Returns
+    -------
+        Our Caprica ChatBot() object.
+
+    Exceptions
+    ----------
+        ValueError
+            Raised if [corpus] matcher isn't one of the keys of
+            MATCHERS, or [storage] profile isn't one of the keys of
+            StorageProfile.PROFILES. Also raised if [corpus] shards is
+            set with a matcher other than index, which would quietly
+            never look at the shards, if [corpus] in_memory is on with a
+            matcher other than index or bestmatch, or if both of them
+            are set.
+
+    Notes
+    -----
+        The matcher can be one of:
+            bestmatch - chatterbots own BestMatch, compares the input
+                        to every statement.
+            index     - BestMatch over the token index shortlist.
+            tfidf     - TF-IDF cosine similarity, needs numpy and scipy.
+            ann       - Approximate nearest neighbour index built with
+                        'python Sentience.py index build', needs numpy.
+
+        The [storage] profile picks the sqlite pragmas the database
+        connections are opened with, see StorageProfile.py.
+
+        With [corpus] shards set the corpus is spread over several
+        databases and the matcher has to be index, see ShardedStorage.py.
+
+        With [learning] write_behind on, what the chatbot learns every
+        turn is committed in batches from a background thread, see
+        LearningQueue.py.
+
+        With [corpus] in_memory on the chatbot is read only. The corpus
+        is loaded into memory, or mapped in from [corpus] snapshot, and
+        get_response() runs without any SQL, see MemoryCorpus.py.
+
+        The time adapter is TimeMatch.LazyTimeLogicAdapter, which
+        doesn't load nltk until someone asks what time it is.
+    '''
+    matcher = config.get('corpus', 'matcher')
+    if matcher not in MATCHERS:
+        raise ValueError('Unknown matcher ' + matcher + ' in sentience.ini. Use one of ' + ', '.join(sorted(MATCHERS)))
+    settings = {
+        'storage_adapter': 'StatementIndex.IndexedSQLStorageAdapter',
+        'logic_adapters': [MATCHERS[matcher], 'TimeMatch.LazyTimeLogicAdapter', 'chatterbot.logic.MathematicalEvaluation'],
+        'input_adapter': 'chatterbot.input.VariableInputTypeAdapter',
+        'output_adapter': 'chatterbot.output.OutputAdapter',
+        'filters': ['chatterbot.filters.RepetitiveResponseFilter'],
+        'database': config.get('corpus', 'database'),
+        'trainer': 'chatterbot.trainers.ChatterBotCorpusTrainer',
+        'index_shortlist_size': config.getint('corpus', 'shortlist_size'),
+        'ann_candidates': config.getint('corpus', 'ann_candidates'),
+        'ann_probes': config.getint('corpus', 'ann_probes'),
+        'sqlite_pragmas': profile_pragmas(config),
+        'learning_write_behind': config.getboolean('learning', 'write_behind'),
+        'learning_batch_size': config.getint('learning', 'batch_size'),
+        'learning_interval': config.getfloat('learning', 'interval'),
+    }
+    shards = expand_shards(config.get('corpus', 'shards'), config.get('corpus', 'database'))
+    if len(shards) > 0:
+        if matcher != 'index':
+            raise ValueError('[corpus] shards needs matcher = index in sentience.ini, ' + matcher + ' only searches [corpus] database.')
+        settings['storage_adapter'] = 'ShardedStorage.ShardedStorageAdapter'
+        settings['shard_databases'] = shards
+        settings['shard_threads'] = config.getint('corpus', 'shard_threads')
+    if config.getboolean('corpus', 'in_memory'):
+        if len(shards) > 0:
+            raise ValueError('[corpus] in_memory and [corpus] shards can\'t be used together in sentience.ini.')
+        if matcher not in ('index', 'bestmatch'):
+            raise ValueError('[corpus] in_memory needs matcher = index or bestmatch in sentience.ini, ' + matcher + ' reads the database itself.')
+        settings['storage_adapter'] = 'MemoryCorpus.MemoryStorageAdapter'
+        settings['memory_snapshot'] = config.get('corpus', 'snapshot') or default_snapshot_path(config.get('corpus', 'database'))
+        settings['read_only'] = True
+    settings.update(kwargs)
+    return ChatBot('Caprica', **settings)
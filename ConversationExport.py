@@ -0,0 +1,74 @@
+import gzip
+import os
+import threading
+
+
+class ConversationExport(object):
+    '''
+    ConversationExport(object):
+
+    Parameters
+    ----------
+        param1 : compress
+            When True the conversation is written to path + '.gz'
+            instead of path. Every export adds a new gzip member to the
+            end of the file, gzip.open() and zcat read them back as one.
+
+    Members
+    -------
+        def export(self, path, header, transcript)
+            Appends the turns of transcript that haven't been written to
+            path yet. The first time, or whenever the file has gone
+            missing, the file is started again with header followed by
+            the whole transcript. Returns how many turns it wrote.
+
+        def reset(self, path)
+            Forgets how much has been written to path, so the next
+            export starts it again.
+
+    Notes
+    -----
+        write_logs used to open <username>_Conversation.txt with 'w' and
+        write the profile and the whole conversation every time, so the
+        longer someone talked the longer it took. We remember how many
+        turns of the transcript each file already has and only write
+        the ones after that.
+
+        The transcript is cleared when the username, age or gender
+        changes. When its generation has moved on since the last export
+        we start the file again, which is what the old 'w' did anyway.
+    '''
+
+    def __init__(self, compress=False):
+        self.compress = compress
+        self.__offsets = {}
+        self.__lock = threading.Lock()
+
+    def export(self, path, header, transcript):
+        if self.compress:
+            path = path + '.gz'
+        with self.__lock:
+            generation, offset = self.__offsets.get(path, (transcript.generation, 0))
+            if generation != transcript.generation or offset > len(transcript) or not os.path.isfile(path):
+                offset = 0
+            turns = list(transcript.turns(offset))
+            text = ''.join('\n' + turn.speaker + ': ' + turn.text for turn in turns)
+            if offset == 0:
+                text = header + text
+                mode = 'w'
+            else:
+                mode = 'a'
+            if len(text) > 0:
+                if self.compress:
+                    with gzip.open(path, mode + 't') as out:
+                        out.write(text)
+                else:
+                    with open(path, mode) as out:
+                        out.write(text)
+            self.__offsets[path] = (transcript.generation, offset + len(turns))
+            return len(turns)
+
+    def reset(self, path):
+        with self.__lock:
+            self.__offsets.pop(path, None)
+            self.__offsets.pop(path + '.gz', None)
@@ -0,0 +1,294 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS turn ('
+    'id INTEGER PRIMARY KEY, '
+    'session TEXT NOT NULL, '
+    'user TEXT NOT NULL, '
+    'speaker TEXT NOT NULL, '
+    'timestamp REAL NOT NULL, '
+    'text TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS ix_turn_user_timestamp ON turn (user, timestamp)',
+    'CREATE INDEX IF NOT EXISTS ix_turn_session ON turn (session, id)',
+)
+
+FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS turn_fts USING fts5(text, content='turn', content_rowid='id')",
+    'CREATE TRIGGER IF NOT EXISTS turn_fts_insert AFTER INSERT ON turn BEGIN '
+    'INSERT INTO turn_fts (rowid, text) VALUES (new.id, new.text); END',
+    'CREATE TRIGGER IF NOT EXISTS turn_fts_delete AFTER DELETE ON turn BEGIN '
+    "INSERT INTO turn_fts (turn_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+)
+
+StoredTurn = namedtuple('StoredTurn', ['session', 'user', 'speaker', 'timestamp', 'text'])
+
+COLUMNS = 'turn.session, turn.user, turn.speaker, turn.timestamp, turn.text'
+
+# What has to be escaped for a word to be matched as it is by LIKE.
+LIKE_PATTERN = re.compile(r'[\\%_]')
+
+
+def quote_query(query):
+    '''
+    quote_query(query)
+
+    Returns
+    -------
+        query with every word in double quotes, so punctuation like the
+        ' and ? in "what's up?" is matched as text instead of being read
+        as fts5 syntax. A * at the end of a word is kept outside the
+        quotes, so 'pass*' is still a prefix search.
+    '''
+    terms = []
+    for word in str(query).split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*')
+        if len(word) <= 0:
+            continue
+        terms.append('"' + word.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+class ConversationStore(object):
+    '''
+    ConversationStore(object):
+
+    Parameters
+    ----------
+        param1 : path
+            The sqlite database the conversations are kept in. It's
+            created, along with its folder, if it doesn't exist.
+
+        param2 : session
+            The id every turn added through this store is saved under.
+            Defaults to a new random id, so every run of the program is
+            its own session.
+
+        param3 : logger
+            Where turns that couldn't be saved are reported.
+
+        param4 : flush_interval
+            The most seconds a turn waits before the writer thread
+            saves it.
+
+    Attributes
+    ----------
+        self.full_text
+            True if this sqlite has fts5. Without it search() falls back
+            to one LIKE per word, which is slower and finds words inside
+            other words too, 'pass' finds 'passage', but like fts5 a
+            turn has to have every word.
+
+    Members
+    -------
+        def attach(self, transcript, user)
+            Saves every turn appended to transcript from now on. user is
+            a function that returns the current username.
+
+        def add(self, user, speaker, text, timestamp)
+            Queues one turn to be saved by the writer thread. If saving
+            fails it's logged and the conversation carries on without
+            it.
+
+        def flush(self, timeout)
+            Saves every turn that's waiting and returns once they're
+            committed.
+
+        def search(self, query, user, limit, raw)
+            Returns the turns that have every word of query, best first.
+            With raw=True query is handed to fts5 as it is, so phrases,
+            OR and NEAR work, and a malformed one raises
+            sqlite3.OperationalError.
+
+        def history(self, user, limit, before)
+            Returns the most recent turns of a user, oldest first.
+
+        def sessions(self, user)
+            Returns (session, first timestamp, last timestamp, turns)
+            for every session, most recent first.
+
+        def close(self, timeout)
+            Saves whatever is waiting, stops the writer thread and
+            closes the database. Calling it again does nothing, and a
+            turn added after it is logged and dropped.
+
+    Returns
+    -------
+        search() and history() return lists of StoredTurn tuples with the
+        fields session, user, speaker, timestamp and text.
+
+    Notes
+    -----
+        The text files are still written, this sits next to them. Every
+        turn is one row, and the turn_fts index is kept up to date by
+        triggers, so searching the whole history or pulling up what a
+        user said last week is an indexed query instead of reading
+        every *_Conversation.txt. add() is called from the transcript
+        on the response worker, so like LogWriter it only puts the row
+        on a list and a writer thread inserts whatever has built up in
+        one transaction, instead of an insert and a commit on every
+        turn. The connection is shared behind a lock, and search(),
+        history() and sessions() flush first so they see every turn
+        that's been added.
+    '''
+
+    def __init__(self, path, session=None, logger=None, flush_interval=1.0):
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.session = session or uuid.uuid4().hex
+        self.logger = logger or logging.getLogger(__name__)
+        self.flush_interval = float(flush_interval)
+        self.__lock = threading.Lock()
+        self.__closed = False
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        with self.__connection:
+            for statement in SCHEMA:
+                self.__connection.execute(statement)
+            try:
+                for statement in FTS_SCHEMA:
+                    self.__connection.execute(statement)
+                self.full_text = True
+            except sqlite3.OperationalError:
+                self.full_text = False
+        self.__pending = []
+        self.__written = 0
+        self.__requested = 0
+        self.__closing = False
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(name='conversation_writer', target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def attach(self, transcript, user):
+        transcript.listeners.append(lambda turn: self.add(user(), turn.speaker, turn.text, turn.timestamp))
+
+    def add(self, user, speaker, text, timestamp=None):
+        row = (self.session, str(user), str(speaker), timestamp or time.time(), str(text))
+        with self.__condition:
+            if not self.__closing:
+                self.__pending.append(row)
+                return None
+        self.__insert([row])
+
+    def flush(self, timeout=5.0):
+        '''
+        flush(self, timeout)
+
+        Returns
+        -------
+            True if every turn that was waiting when we were called
+            has been committed, False if timeout ran out first.
+        '''
+        deadline = time.monotonic() + timeout
+        with self.__condition:
+            self.__requested += 1
+            target = self.__requested
+            self.__condition.notify_all()
+            while self.__written < target and self.__thread.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.__condition.wait(remaining)
+        return True
+
+    def search(self, query, user=None, limit=50, raw=False):
+        if self.full_text:
+            if not raw:
+                query = quote_query(query)
+                if len(query) <= 0:
+                    return []
+            sql = 'SELECT ' + COLUMNS + ' FROM turn_fts JOIN turn ON turn.id = turn_fts.rowid WHERE turn_fts MATCH ?'
+            arguments = [query]
+            order = ' ORDER BY turn_fts.rank'
+        else:
+            words = [word.rstrip('*') for word in str(query).split() if len(word.rstrip('*')) > 0]
+            if len(words) <= 0:
+                return []
+            sql = 'SELECT ' + COLUMNS + ' FROM turn WHERE ' + ' AND '.join(["turn.text LIKE ? ESCAPE '\\'"] * len(words))
+            arguments = ['%' + LIKE_PATTERN.sub(r'\\\g<0>', word) + '%' for word in words]
+            order = ' ORDER BY turn.timestamp DESC'
+        if user is not None:
+            sql += ' AND turn.user = ?'
+            arguments.append(user)
+        return self.__query(sql + order + ' LIMIT ?', arguments + [int(limit)])
+
+    def history(self, user, limit=100, before=None):
+        sql = 'SELECT ' + COLUMNS + ' FROM turn WHERE turn.user = ?'
+        arguments = [user]
+        if before is not None:
+            sql += ' AND turn.timestamp < ?'
+            arguments.append(before)
+        rows = self.__query(sql + ' ORDER BY turn.timestamp DESC LIMIT ?', arguments + [int(limit)])
+        rows.reverse()
+        return rows
+
+    def sessions(self, user=None):
+        sql = 'SELECT session, MIN(timestamp), MAX(timestamp), COUNT(*) FROM turn'
+        arguments = []
+        if user is not None:
+            sql += ' WHERE user = ?'
+            arguments.append(user)
+        self.__catch_up()
+        with self.__lock:
+            return self.__connection.execute(sql + ' GROUP BY session ORDER BY MAX(timestamp) DESC', arguments).fetchall()
+
+    def close(self, timeout=5.0):
+        with self.__condition:
+            self.__closing = True
+            self.__condition.notify_all()
+        self.__thread.join(timeout)
+        with self.__lock:
+            if not self.__closed:
+                self.__closed = True
+                self.__connection.close()
+
+    def __query(self, sql, arguments):
+        self.__catch_up()
+        with self.__lock:
+            return [StoredTurn(*row) for row in self.__connection.execute(sql, arguments)]
+
+    def __catch_up(self):
+        with self.__condition:
+            waiting = len(self.__pending) > 0
+        if waiting:
+            self.flush()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                if not self.__closing and self.__requested <= self.__written:
+                    self.__condition.wait(self.flush_interval)
+                pending = self.__pending
+                target = self.__requested
+                closing = self.__closing
+                self.__pending = []
+            if len(pending) > 0:
+                self.__insert(pending)
+            with self.__condition:
+                self.__written = max(self.__written, target)
+                self.__condition.notify_all()
+                if closing and len(self.__pending) <= 0:
+                    return None
+
+    def __insert(self, rows):
+        try:
+            with self.__lock:
+                if self.__closed:
+                    self.logger.warning('ConversationStore: closed, dropped ' + str(len(rows)) + ' turns')
+                    return None
+                with self.__connection:
+                    self.__connection.executemany('INSERT INTO turn (session, user, speaker, timestamp, text) VALUES (?, ?, ?, ?, ?)', rows)
+        except sqlite3.Error as error:
+            self.logger.error('ConversationStore: could not save ' + str(len(rows)) + ' turns: ' + str(error))
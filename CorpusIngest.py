@@ -0,0 +1,268 @@
+import multiprocessing
+import os
+import pickle
+import re
+import sqlite3
+import time
+from CorpusSchema import MIGRATIONS, migrate
+from RedditTrainer import TARGET_PRAGMAS, RedditTrainer, create_corpus
+from StatementIndex import tokenize
+from StorageProfile import apply_pragmas
+
+
+# The indexes migrate() creates. They're dropped while a merge loads the
+# corpus and migrate() puts them back once it's done.
+MIGRATED_INDEXES = [name for step, statements in MIGRATIONS for statement in statements
+                    for name in re.findall(r'CREATE INDEX IF NOT EXISTS (\w+)', statement)]
+
+# merge_pair is a TEMP table, so a merge that fails part way leaves
+# nothing behind for the next one to count again. The DROP clears a
+# merge_pair older versions left in the corpus itself.
+MERGE_SCHEMA = (
+    'DROP TABLE IF EXISTS main.merge_pair',
+    'CREATE TEMP TABLE merge_pair ('
+    'text TEXT NOT NULL, '
+    'statement_text TEXT NOT NULL, '
+    'occurrence INTEGER NOT NULL, '
+    'created_at TEXT, '
+    'PRIMARY KEY (text, statement_text))',
+)
+
+
+def shard_path(path, shard_dir):
+    '''
+    shard_path(path, shard_dir)
+
+    Returns
+    -------
+        Where the shard of the dump at path goes, RC_2015-01.bz2 is
+        shard_dir/RC_2015-01.shard.db.
+    '''
+    return os.path.join(shard_dir, os.path.basename(path).split('.')[0] + '.shard.db')
+
+
+def ingest_month(job):
+    '''
+    ingest_month(job)
+
+    Parameters
+    ----------
+        param1 : job
+            (dump path, shard path, batch_size, min_score, max_length).
+            Runs in a worker process, so it's one picklable tuple. The
+            months are reported by ingest() as they finish, a worker
+            doesn't print anything itself.
+
+    Returns
+    -------
+        The counts from RedditTrainer.shard(), with the dump and the
+        shard added.
+    '''
+    path, shard, batch_size, min_score, max_length = job
+    trainer = RedditTrainer(shard, batch_size, min_score, max_length, os.path.dirname(os.path.abspath(shard)))
+    counts = trainer.shard(path, shard)
+    counts['dump'] = path
+    counts['shard'] = shard
+    return counts
+
+
+def merge_shards(database, shards, batch_size=50000, report=None):
+    '''
+    merge_shards(database, shards, batch_size, report)
+
+    Parameters
+    ----------
+        param1 : database
+            The chatterbot database the shards are merged into. It's
+            created if it doesn't exist.
+
+        param2 : shards
+            The shard databases RedditTrainer.shard() wrote.
+
+        param3 : batch_size
+            Statements tokenized at a time for the statement_token
+            index.
+
+        param4 : report
+            An optional function that's called with a line of progress
+            text after every step.
+
+    Returns
+    -------
+        A dictionary of counts: pairs, new_responses and new_statements.
+
+    Notes
+    -----
+        The pairs of every shard are summed into one merge_pair table,
+        keyed on the pair, so a pair that turns up in several months is
+        one row with all of its occurrences. It's a TEMP table, which
+        only this connection can see and which goes away with it, so
+        if a shard fails to load the corpus hasn't been touched and
+        running the merge again doesn't count any pair twice. A shard
+        can't be attached in the middle of a transaction, and sqlite
+        only attaches ten at a time, which is why the shards are read
+        one transaction each rather than all in one. The merged pairs
+        are then applied to the corpus in one transaction. Pairs the corpus
+        already has get their occurrence added to, the rest are new
+        responses, and any text that isn't a statement yet becomes one.
+        statement.text is unique, so a text that's in several months is
+        still one statement.
+
+        The migrate() indexes are dropped for the load and built once
+        at the end, which is a lot quicker than keeping them up to date
+        a row at a time. The statement_token index, if there is one, is
+        given the new statements in the same transaction.
+    '''
+    report = report or (lambda line: None)
+    started = time.monotonic()
+    extra_data = pickle.dumps({})
+    create_corpus(database)
+    connection = sqlite3.connect(database, isolation_level=None)
+    counts = {'pairs': 0, 'new_responses': 0, 'new_statements': 0}
+    try:
+        apply_pragmas(connection, TARGET_PRAGMAS)
+        for statement in MERGE_SCHEMA:
+            connection.execute(statement)
+        for shard in shards:
+            connection.execute('ATTACH DATABASE ? AS shard', (shard,))
+            try:
+                connection.execute('BEGIN')
+                connection.execute(
+                    'INSERT INTO merge_pair (text, statement_text, occurrence, created_at) '
+                    'SELECT text, statement_text, occurrence, created_at FROM shard.pair WHERE 1 '
+                    'ON CONFLICT (text, statement_text) DO UPDATE SET '
+                    'occurrence = occurrence + excluded.occurrence, '
+                    'created_at = MIN(created_at, excluded.created_at)')
+                connection.execute('COMMIT')
+            finally:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                connection.execute('DETACH DATABASE shard')
+            report('Merged ' + shard + ' in ' + str(round(time.monotonic() - started, 1)) + 's')
+
+        indexed = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'statement_token'").fetchone() is not None
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            counts['pairs'] = connection.execute('SELECT COUNT(*) FROM merge_pair').fetchone()[0]
+            for name in MIGRATED_INDEXES:
+                connection.execute('DROP INDEX IF EXISTS ' + name)
+            connection.execute(
+                'UPDATE response SET occurrence = occurrence + ('
+                'SELECT merge_pair.occurrence FROM merge_pair '
+                'WHERE merge_pair.text = response.text AND merge_pair.statement_text = response.statement_text) '
+                'WHERE EXISTS ('
+                'SELECT 1 FROM merge_pair '
+                'WHERE merge_pair.text = response.text AND merge_pair.statement_text = response.statement_text)')
+            connection.execute(
+                'DELETE FROM merge_pair WHERE rowid IN ('
+                'SELECT merge_pair.rowid FROM response JOIN merge_pair '
+                'ON merge_pair.text = response.text AND merge_pair.statement_text = response.statement_text)')
+            before = connection.total_changes
+            connection.execute('INSERT OR IGNORE INTO statement (text, extra_data) SELECT text, ? FROM merge_pair', (extra_data,))
+            connection.execute('INSERT OR IGNORE INTO statement (text, extra_data) SELECT statement_text, ? FROM merge_pair', (extra_data,))
+            counts['new_statements'] = connection.total_changes - before
+            before = connection.total_changes
+            connection.execute(
+                'INSERT INTO response (text, created_at, occurrence, statement_text) '
+                'SELECT text, created_at, occurrence, statement_text FROM merge_pair')
+            counts['new_responses'] = connection.total_changes - before
+            if indexed:
+                cursor = connection.execute('SELECT id, text FROM statement WHERE text IN (SELECT text FROM merge_pair)')
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if len(rows) <= 0:
+                        break
+                    connection.executemany('INSERT OR IGNORE INTO statement_token (token, statement_id) VALUES (?, ?)',
+                                           [(token, statement_id) for statement_id, text in rows for token in tokenize(text)])
+            connection.execute('DROP TABLE merge_pair')
+            connection.execute('PRAGMA user_version = 0')
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        report('Loaded ' + str(counts['pairs']) + ' pairs, ' + str(counts['new_responses']) + ' new responses, ' + str(counts['new_statements']) + ' new statements in ' + str(round(time.monotonic() - started, 1)) + 's')
+    finally:
+        connection.close()
+    migrate(database, 0, report)
+    report('Done in ' + str(round(time.monotonic() - started, 1)) + 's')
+    return counts
+
+
+def ingest(dumps, database, workers=None, shard_dir=None, keep_shards=False, batch_size=50000, min_score=1, max_length=400, report=None):
+    '''
+    ingest(dumps, database, workers, shard_dir, keep_shards, batch_size, min_score, max_length, report)
+
+    Parameters
+    ----------
+        param1 : dumps
+            The reddit dump files, one month each.
+
+        param2 : database
+            The corpus database they're all merged into.
+
+        param3 : workers
+            How many months are read at once. Defaults to one per core.
+
+        param4 : shard_dir
+            Where the shards are written. Defaults to the folder of
+            database.
+
+        param5 : keep_shards
+            Leave the shards behind after the merge instead of deleting
+            them.
+
+        param6 : batch_size, param7 : min_score, param8 : max_length
+            See RedditTrainer().
+
+        param9 : report
+            An optional function that's called with a line of progress
+            text for every month and every merge step.
+
+    Returns
+    -------
+        The counts from merge_shards() with the number of comments
+        that were kept added.
+
+    Exceptions
+    ----------
+        ValueError
+            Raised if two of the dumps would have the same shard.
+
+    Notes
+    -----
+        Training the months one after the other into the same file is
+        one core decompressing, parsing and writing while the others
+        sit there. Here every month is read, cleaned up and paired in
+        its own process, into its own shard database, so as many months
+        are worked on at once as there are workers. Nothing is shared
+        until merge_shards() puts them together, which is the only
+        step that runs on one core.
+    '''
+    report = report or (lambda line: None)
+    shard_dir = shard_dir or os.path.dirname(os.path.abspath(database))
+    if not os.path.isdir(shard_dir):
+        os.makedirs(shard_dir)
+    shards = [shard_path(path, shard_dir) for path in dumps]
+    if len(set(shards)) < len(shards):
+        raise ValueError('Two of the dumps have the same name, every month needs its own shard.')
+    jobs = [(path, shard, batch_size, min_score, max_length) for path, shard in zip(dumps, shards)]
+    comments = 0
+    try:
+        pool = multiprocessing.Pool(max(1, min(workers or multiprocessing.cpu_count(), len(jobs))))
+        try:
+            for counts in pool.imap_unordered(ingest_month, jobs):
+                comments += counts['comments']
+                report(counts['dump'] + ': ' + str(counts['comments']) + ' comments, ' + str(counts['pairs']) + ' pairs in ' + str(counts['seconds']) + 's')
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+        counts = merge_shards(database, shards, batch_size, report)
+    finally:
+        if not keep_shards:
+            for shard in shards:
+                for suffix in ('', '-journal', '-wal', '-shm'):
+                    if os.path.exists(shard + suffix):
+                        os.remove(shard + suffix)
+    counts['comments'] = comments
+    return counts
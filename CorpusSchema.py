@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import time
+
+
+# Each step moves the database to the next schema version. Steps are only
+# ever appended, the version a database is at is kept in PRAGMA user_version.
+MIGRATIONS = [
+    (1, ['CREATE INDEX IF NOT EXISTS ix_response_statement_text ON response (statement_text)']),
+    (2, ['CREATE INDEX IF NOT EXISTS ix_response_text ON response (text)']),
+    (3, ['CREATE INDEX IF NOT EXISTS ix_tag_association_statement_id ON tag_association (statement_id)']),
+    (4, ['CREATE INDEX IF NOT EXISTS ix_conversation_association_statement_id ON conversation_association (statement_id)']),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+REQUIRED_TABLES = ('statement', 'response', 'tag_association', 'conversation_association')
+
+
+def schema_version(database):
+    '''
+    schema_version(database)
+
+    Returns
+    -------
+        The schema version recorded in the database, 0 if it has
+        never been migrated.
+    '''
+    connection = sqlite3.connect(database)
+    try:
+        return connection.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        connection.close()
+
+
+def migrate(database, time_budget=30.0, report=None):
+    '''
+    migrate(database, time_budget, report)
+
+    Parameters
+    ----------
+        param1 : database
+            Path of the chatterbot SQLite database.
+
+        param2 : time_budget
+            The most seconds we spend migrating. 0 means no limit.
+
+        param3 : report
+            An optional function that's called with a line of text
+            for every step we run, skip or give up on.
+
+    Returns
+    -------
+        The schema version the database is at when we're done, or
+        None if there's nothing to migrate yet.
+
+    Notes
+    -----
+        Every step runs in its own transaction together with the
+        version bump, so a step is either done or it isn't. If a step
+        runs past the time budget sqlite is interrupted, the step is
+        rolled back and we stop. The chatbot still works without the
+        index, just slower, and the remaining steps are picked up the
+        next time we're started. 'python Sentience.py migrate
+        --time-budget 0' finishes them without a limit.
+
+        A database that chatterbot hasn't created yet is left alone,
+        it gets migrated on the next start once the tables exist.
+    '''
+    report = report or (lambda line: None)
+    if not os.path.exists(database):
+        return None
+
+    deadline = time.monotonic() + time_budget if time_budget > 0 else None
+    connection = sqlite3.connect(database, timeout=time_budget if time_budget > 0 else 30.0, isolation_level=None)
+    try:
+        tables = set(row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'"))
+        if not tables.issuperset(REQUIRED_TABLES):
+            return None
+        if deadline is not None:
+            connection.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        for step, statements in MIGRATIONS:
+            if step <= version:
+                continue
+            started = time.monotonic()
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                for statement in statements:
+                    connection.execute(statement)
+                connection.execute('PRAGMA user_version = ' + str(int(step)))
+                connection.execute('COMMIT')
+            except sqlite3.OperationalError as error:
+                if connection.in_transaction:
+                    connection.set_progress_handler(None, 0)
+                    connection.execute('ROLLBACK')
+                report('Schema migration to version ' + str(step) + ' stopped: ' + str(error) + '. It will be retried on the next start.')
+                break
+            version = step
+            report('Schema migrated to version ' + str(step) + ' in ' + str(round(time.monotonic() - started, 3)) + 's')
+        return version
+    finally:
+        connection.close()
@@ -0,0 +1,271 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+STAGES = ('listen', 'recognize_sphinx', 'get_response', 'append_file', 'caprica_speak')
+
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram(object):
+    '''
+    Histogram(object):
+
+    Parameters
+    ----------
+        param1 : smallest
+            Anything quicker than this many seconds goes in the first
+            bucket.
+
+        param2 : steps
+            Buckets per doubling. 8 keeps every percentile within
+            about 9% of the real value.
+
+    Members
+    -------
+        def add(self, seconds)
+            Counts one duration.
+
+        def percentile(self, percent)
+            Returns the duration percent of the counted ones were at or
+            under.
+
+    Notes
+    -----
+        Durations are counted in buckets that grow geometrically, so
+        add() is one log() and a dictionary increment however many
+        turns there have been, and a microsecond and a ten second
+        listen() both land in a bucket that's the right size for them.
+    '''
+
+    def __init__(self, smallest=1e-6, steps=8):
+        self.smallest = smallest
+        self.ratio = 2.0 ** (1.0 / steps)
+        self.count = 0
+        self.total = 0.0
+        self.largest = 0.0
+        self.__buckets = {}
+        self.__log_ratio = math.log(self.ratio)
+
+    def add(self, seconds):
+        if seconds <= self.smallest:
+            bucket = 0
+        else:
+            bucket = int(math.log(seconds / self.smallest) / self.__log_ratio) + 1
+        self.__buckets[bucket] = self.__buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.largest:
+            self.largest = seconds
+
+    def percentile(self, percent):
+        if self.count <= 0:
+            return 0.0
+        wanted = self.count * percent / 100.0
+        seen = 0
+        for bucket in sorted(self.__buckets):
+            seen += self.__buckets[bucket]
+            if seen >= wanted:
+                return min(self.smallest * self.ratio ** bucket, self.largest)
+        return self.largest
+
+
+class Span(object):
+    '''
+    Span(object):
+
+    Notes
+    -----
+        What LatencyMetrics.span() returns. It times the with block and
+        hands the duration back when the block ends, whether it ended
+        normally or with an exception.
+    '''
+
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        self.metrics.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class LatencyMetrics(object):
+    '''
+    LatencyMetrics(object):
+
+    Parameters
+    ----------
+        param1 : path
+            The JSON file the numbers are written to. None doesn't
+            write one.
+
+        param2 : interval
+            Seconds between writes of path once start() is called.
+
+        param3 : logger
+            Where write errors are reported.
+
+    Members
+    -------
+        def span(self, stage)
+            with self.metrics.span('listen'): ... times the block and
+            adds it to the histogram of that stage.
+
+        def record(self, stage, seconds)
+            Adds a duration that was timed some other way.
+
+        def summary(self)
+            Returns {stage: {count, mean, p50, p95, p99, max}}, every
+            duration in milliseconds, for the stages in STAGES that have
+            been seen first and then any others.
+
+        def gauge(self, name, function)
+            Adds function(), a dictionary of numbers, to every write()
+            and readout() under name. Ie, the response worker's depth.
+
+        def gauges(self)
+            Returns {name: function()} for every gauge.
+
+        def readout(self)
+            Returns summary() as a small text table, then the gauges.
+
+        def write(self, create)
+            Writes summary() to path. The file is replaced in one go, so
+            anything reading it never sees half of it. The folder of
+            path is only made if create is True, otherwise nothing is
+            written when it's gone.
+
+        def start(self), def stop(self)
+            Start and stop the thread that calls write() every interval
+            seconds. start() makes the folder of path, after that it's
+            never made again, so a folder that's been deleted stays
+            deleted. stop() writes one last time and does nothing the
+            second time it's called.
+
+    Notes
+    -----
+        A turn goes through listen, recognize_sphinx, get_response,
+        append_file and caprica_speak and it was impossible to tell
+        which of them a slow one had spent its time in. Each of them
+        is wrapped in a span() and the readout shows where the time
+        goes. A span costs a couple of microseconds.
+    '''
+
+    def __init__(self, path=None, interval=10.0, logger=None):
+        self.path = path
+        self.interval = float(interval)
+        self.logger = logger or logging.getLogger(__name__)
+        self.started = time.time()
+        self.__histograms = {}
+        self.__gauges = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__stopping = threading.Event()
+        self.__thread = None
+
+    def span(self, stage):
+        return Span(self, stage)
+
+    def record(self, stage, seconds):
+        with self.__lock:
+            histogram = self.__histograms.get(stage)
+            if histogram is None:
+                histogram = self.__histograms[stage] = Histogram()
+            histogram.add(seconds)
+
+    def summary(self):
+        summary = OrderedDict()
+        with self.__lock:
+            stages = [stage for stage in STAGES if stage in self.__histograms]
+            stages += sorted(stage for stage in self.__histograms if stage not in STAGES)
+            for stage in stages:
+                histogram = self.__histograms[stage]
+                numbers = OrderedDict()
+                numbers['count'] = histogram.count
+                numbers['mean'] = round(1000.0 * histogram.total / max(1, histogram.count), 3)
+                for percent in PERCENTILES:
+                    numbers['p' + str(percent)] = round(1000.0 * histogram.percentile(percent), 3)
+                numbers['max'] = round(1000.0 * histogram.largest, 3)
+                summary[stage] = numbers
+        return summary
+
+    def gauge(self, name, function):
+        with self.__lock:
+            self.__gauges[name] = function
+
+    def gauges(self):
+        with self.__lock:
+            gauges = list(self.__gauges.items())
+        return OrderedDict((name, function()) for name, function in gauges)
+
+    def readout(self):
+        summary = self.summary()
+        if len(summary) <= 0:
+            lines = ['No turns have been timed yet.']
+        else:
+            lines = ['{:<17}{:>7}{:>10}{:>10}{:>10}{:>10}'.format('stage (ms)', 'count', 'p50', 'p95', 'p99', 'max')]
+            for stage, numbers in summary.items():
+                lines.append('{:<17}{:>7}{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}'.format(stage, numbers['count'], numbers['p50'], numbers['p95'], numbers['p99'], numbers['max']))
+        for name, numbers in self.gauges().items():
+            lines.append(name + ': ' + ' '.join(key + '=' + str(numbers[key]) for key in sorted(numbers)))
+        return '\n'.join(lines)
+
+    def write(self, create=True):
+        if self.path is None:
+            return None
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            if not create:
+                return None
+            os.makedirs(directory)
+        report = OrderedDict()
+        report['started'] = self.started
+        report['written'] = time.time()
+        report['stages'] = self.summary()
+        report['gauges'] = self.gauges()
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as out:
+            json.dump(report, out, indent=2)
+        os.replace(temporary, self.path)
+        return self.path
+
+    def start(self):
+        if self.path is None or self.__thread is not None:
+            return None
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        if self.interval <= 0:
+            return None
+        self.__thread = threading.Thread(name='latency_metrics', target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        if self.__stopping.is_set():
+            return None
+        self.__stopping.set()
+        if self.__thread is not None:
+            self.__thread.join(1.0)
+        try:
+            self.write(False)
+        except (IOError, OSError) as error:
+            self.logger.error('LatencyMetrics: could not write ' + str(self.path) + ': ' + str(error))
+
+    def __run(self):
+        while not self.__stopping.wait(self.interval):
+            try:
+                self.write(False)
+            except (IOError, OSError) as error:
+                self.logger.error('LatencyMetrics: could not write ' + str(self.path) + ': ' + str(error))
@@ -0,0 +1,514 @@
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import text
+from chatterbot.conversation import Response, Statement
+from StatementIndex import tokenize
+
+
+def merge_responses(statement, responses):
+    '''
+    merge_responses(statement, responses)
+
+    Parameters
+    ----------
+        param1 : statement
+            A Statement() read from the database.
+
+        param2 : responses
+            {prompt text: occurrence} to add to its in_response_to.
+
+    Returns
+    -------
+        statement, with the occurrence of a prompt it already has
+        added to and the other prompts appended.
+    '''
+    for prompt, occurrence in responses.items():
+        for response in statement.in_response_to:
+            if response.text == prompt:
+                response.occurrence += occurrence
+                break
+        else:
+            statement.in_response_to.append(Response(prompt, occurrence=occurrence))
+    return statement
+
+
+class LearnedStatementIndex(object):
+    '''
+    LearnedStatementIndex(object):
+
+    Parameters
+    ----------
+        param1 : primary
+            The StatementIndex() of the database.
+
+        param2 : queue
+            The LearningQueue() whose learned statements aren't in the
+            database yet.
+
+    Members
+    -------
+        def exists(self), def build(self), def add(self, texts)
+            The same as the primary StatementIndex().
+
+        def candidates(self, words), def scored_candidates(self, words)
+            The primary shortlist with the learned statements that
+            share tokens with words merged into it.
+
+    Notes
+    -----
+        It stands in for the StatementIndex() of the storage adapter
+        the same way ShardedStorage.ShardedStatementIndex does.
+    '''
+
+    def __init__(self, primary, queue):
+        self.primary = primary
+        self.queue = queue
+        self.shortlist_size = primary.shortlist_size
+
+    def exists(self):
+        return self.primary.exists()
+
+    def build(self):
+        return self.primary.build()
+
+    def add(self, texts):
+        return self.primary.add(texts)
+
+    def candidates(self, words):
+        return [match for match, shared in self.scored_candidates(words)]
+
+    def scored_candidates(self, words):
+        learned = self.queue.scored_candidates(words)
+        best = dict(self.primary.scored_candidates(words))
+        for match, shared in learned:
+            if shared > best.get(match, 0):
+                best[match] = shared
+        return sorted(best.items(), key=lambda item: -item[1])[:self.shortlist_size]
+
+
+class LearningQueue(object):
+    '''
+    LearningQueue(object):
+
+    Parameters
+    ----------
+        param1 : engine
+            The SQLAlchemy engine of the storage adapter.
+
+        param2 : batch_size
+            Once this many writes are waiting the writer thread is
+            woken up to commit them.
+
+        param3 : interval
+            The most seconds a write waits before it's committed.
+
+        param4 : logger
+            Where errors from the writer thread are reported.
+
+        param5 : retries, param6 : retry_delay
+            How many more times a batch that couldn't be committed is
+            tried, and the seconds waited before the first of them. The
+            wait doubles every time.
+
+    Attributes
+    ----------
+        self.committed, self.failed
+            How many writes were committed, and how many were given up
+            on after every retry failed.
+
+        self.error
+            Why the last batch that was given up on couldn't be
+            committed, or None.
+
+    Members
+    -------
+        def update(self, statement)
+            Queues what SQLStorageAdapter.update(statement) would save.
+
+        def add_to_conversation(self, conversation_id, statement, response)
+            Queues what SQLStorageAdapter.add_to_conversation() would
+            save.
+
+        def responses(self, words)
+            Returns {statement text: occurrence} for the learned
+            responses to words that haven't been committed yet.
+
+        def statement(self, words, found)
+            Adds what's waiting to be committed for the statement words
+            to found, what SQLStorageAdapter.find() returned for it.
+
+        def latest_response(self, conversation_id)
+            Returns what SQLStorageAdapter.get_latest_response() would
+            once everything is committed, or None if nothing has been
+            added to the conversation since we started.
+
+        def scored_candidates(self, words)
+            Returns (text, tokens shared with words) for the learned
+            statements that haven't been committed yet.
+
+        def flush(self, timeout)
+            Commits everything that's waiting and returns once it's in
+            the database, or False if it couldn't be.
+
+        def close(self, timeout)
+            Flushes and stops the writer thread.
+
+    Notes
+    -----
+        chatterbot learns from every turn. update() and
+        add_to_conversation() are a dozen queries and two commits, on
+        the thread that's waiting to give the user a response. Here
+        they only go on a list and into an in memory overlay, and the
+        writer thread commits the list in one transaction every
+        batch_size writes or interval seconds.
+
+        The overlay is what makes that invisible. The storage adapter
+        adds what's in it to what it reads from the database, so the
+        response to a statement that was learned a moment ago is found,
+        and its statement is a candidate for the index, before it's
+        committed. Once a batch is committed its writes are taken back
+        out of the overlay. The overlay is read before the database, so
+        a batch that's committed in between can be counted twice but
+        never missed, which only nudges which of the responses to a
+        statement is picked.
+
+        find() matters as much as filter(). chatterbot looks the users
+        input up with it and learns it again as a response to every
+        prompt it already has, so a statement the overlay didn't hand
+        back would be learned differently than if it had been
+        committed straight away.
+
+        latest_response() remembers the statements of every
+        conversation and their ids for as long as we run, so the
+        statement the next turn is learned as a response to doesn't
+        have to wait for the conversation to be committed either.
+        chatterbot picks the second highest id in the conversation, and
+        so do we. A statement that isn't in the database yet is given
+        the id sqlite will give it, the next one after the highest,
+        since the writer thread inserts them in the order they were
+        queued.
+
+        A batch that fails to commit, say because another process has
+        the database locked, stays in the overlay and is tried again
+        after retry_delay, 2 * retry_delay and so on. Writes queued in
+        the meantime wait behind it. If it still can't be committed
+        it's given up on, logged and kept in self.error, and the ids
+        of what's still waiting are worked out again from MAX(id) so
+        they carry on matching what sqlite will give them.
+    '''
+
+    def __init__(self, engine, batch_size=64, interval=0.25, logger=None, retries=5, retry_delay=0.5):
+        self.engine = engine
+        self.batch_size = max(1, int(batch_size))
+        self.interval = float(interval)
+        self.logger = logger or logging.getLogger(__name__)
+        self.retries = max(0, int(retries))
+        self.retry_delay = float(retry_delay)
+        self.committed = 0
+        self.failed = 0
+        self.error = None
+        self.__pending = []
+        self.__responses = {}
+        self.__learned = {}
+        self.__prompts = {}
+        self.__conversations = {}
+        self.__ids = {}
+        with engine.connect() as connection:
+            self.__last_id = connection.execute(text('SELECT MAX(id) FROM statement')).scalar() or 0
+        self.__written = 0
+        self.__requested = 0
+        self.__closing = False
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(name='learning_queue', target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def update(self, statement):
+        write = ('update', statement.text, pickle.dumps(dict(statement.extra_data)), list(statement.tags),
+                 [(response.text, response.occurrence) for response in statement.in_response_to])
+        statement_id = self.__find(statement.text)
+        with self.__condition:
+            self.__assign(statement.text, statement_id)
+            for prompt, occurrence in write[4]:
+                learned = self.__responses.setdefault(prompt, OrderedDict())
+                learned[statement.text] = learned.get(statement.text, 0) + 1
+                learned = self.__learned.setdefault(statement.text, OrderedDict())
+                learned[prompt] = learned.get(prompt, 0) + 1
+                if prompt not in self.__prompts:
+                    self.__prompts[prompt] = [tokenize(prompt), 0]
+                self.__prompts[prompt][1] += 1
+            self.__queue(write)
+
+    def add_to_conversation(self, conversation_id, statement, response):
+        statement_id = self.__find(statement.text)
+        response_id = self.__find(response.text)
+        with self.__condition:
+            conversation = self.__conversations.setdefault(conversation_id, {})
+            conversation[statement.text] = self.__assign(statement.text, statement_id)
+            conversation[response.text] = self.__assign(response.text, response_id)
+            self.__queue(('conversation', conversation_id, statement.text, response.text))
+
+    def responses(self, words):
+        with self.__condition:
+            return dict(self.__responses.get(words, {}))
+
+    def statement(self, words, found):
+        '''
+        statement(self, words, found)
+
+        Parameters
+        ----------
+            param1 : words
+                The text that was looked up.
+
+            param2 : found
+                A function that returns the Statement() the database
+                has for words, or None. It's called after the overlay
+                is read.
+
+        Returns
+        -------
+            The statement with its learned responses added, or None if
+            neither the database nor the queue has it.
+        '''
+        with self.__condition:
+            learned = dict(self.__learned.get(words, {}))
+            pending = words in self.__ids
+        statement = found()
+        if statement is None:
+            if not pending and len(learned) <= 0:
+                return None
+            statement = Statement(words)
+        return merge_responses(statement, learned)
+
+    def latest_response(self, conversation_id):
+        with self.__condition:
+            conversation = self.__conversations.get(conversation_id)
+            if not conversation:
+                return None
+            texts = sorted(conversation, key=conversation.get)
+        return Statement(texts[-2] if len(texts) >= 2 else texts[0])
+
+    def scored_candidates(self, words):
+        tokens = tokenize(words)
+        with self.__condition:
+            prompts = [(prompt, len(tokens & entry[0])) for prompt, entry in self.__prompts.items()]
+        return [(prompt, shared) for prompt, shared in prompts if shared > 0]
+
+    def flush(self, timeout=5.0):
+        '''
+        flush(self, timeout)
+
+        Returns
+        -------
+            True if everything that was waiting when we were called
+            has been committed. False if timeout ran out first, or a
+            batch was given up on while we waited, see self.error.
+        '''
+        deadline = time.monotonic() + timeout
+        with self.__condition:
+            failed = self.failed
+            self.__requested += 1
+            target = self.__requested
+            self.__condition.notify_all()
+            while self.__written < target and self.__thread.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.__condition.wait(remaining)
+            return self.failed == failed
+
+    def close(self, timeout=5.0):
+        with self.__condition:
+            self.__closing = True
+            self.__condition.notify_all()
+        self.__thread.join(timeout)
+
+    def __find(self, words):
+        with self.__condition:
+            if words in self.__ids:
+                return self.__ids[words]
+        with self.engine.connect() as connection:
+            return connection.execute(text('SELECT id FROM statement WHERE text = :text'), {'text': words}).scalar()
+
+    def __assign(self, words, statement_id):
+        if statement_id is None:
+            statement_id = self.__ids.get(words)
+        if statement_id is None:
+            self.__last_id += 1
+            statement_id = self.__ids[words] = self.__last_id
+        return statement_id
+
+    def __queue(self, write):
+        if self.__closing:
+            self.__save([write], 0)
+            return None
+        self.__pending.append(write)
+        if len(self.__pending) >= self.batch_size:
+            self.__condition.notify()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                if not self.__closing and self.__requested <= self.__written and len(self.__pending) < self.batch_size:
+                    self.__condition.wait(self.interval)
+                pending = self.__pending
+                target = self.__requested
+                closing = self.__closing
+                self.__pending = []
+            if len(pending) > 0:
+                self.__save(pending, self.retries)
+            with self.__condition:
+                self.__written = max(self.__written, target)
+                self.__condition.notify_all()
+                if closing and len(self.__pending) <= 0:
+                    return None
+
+    def __save(self, pending, retries):
+        '''
+        __save(self, pending, retries)
+
+        Notes
+        -----
+            Commits pending, trying again up to retries times, and
+            takes it out of the overlay once it's in the database or
+            we've given up on it.
+        '''
+        delay = self.retry_delay
+        for attempt in range(retries + 1):
+            try:
+                self.__commit(pending)
+            except Exception as error:
+                failure = type(error).__name__ + ': ' + str(error)
+                if attempt < retries:
+                    self.logger.warning('LearningQueue: could not commit ' + str(len(pending)) + ' learned statements, trying again in ' + str(delay) + 's: ' + failure)
+                    time.sleep(delay)
+                    delay *= 2
+                continue
+            with self.__condition:
+                self.committed += len(pending)
+                self.__forget(pending)
+            return None
+        self.logger.error('LearningQueue: gave up on ' + str(len(pending)) + ' learned statements after ' + str(retries + 1) + ' tries: ' + failure)
+        try:
+            with self.engine.connect() as connection:
+                last_id = connection.execute(text('SELECT MAX(id) FROM statement')).scalar() or 0
+        except Exception as error:
+            self.logger.error('LearningQueue: could not read MAX(id) after giving up: ' + str(error))
+            last_id = None
+        with self.__condition:
+            lost = dict((words, self.__ids[words]) for write in pending
+                        for words in (write[1:2] if write[0] == 'update' else write[2:4]) if words in self.__ids)
+            self.__forget(pending)
+            self.failed += len(pending)
+            self.error = failure
+            if last_id is not None:
+                self.__renumber(lost, last_id)
+
+    def __renumber(self, lost, last_id):
+        '''
+        __renumber(self, lost, last_id)
+
+        Notes
+        -----
+            The statements in lost were given ids that sqlite never
+            handed out. They're taken out of the conversations, and
+            everything still waiting to be inserted gets the id after
+            last_id, in the order it was queued.
+        '''
+        renumbered = {}
+        for words, statement_id in sorted(self.__ids.items(), key=lambda item: item[1]):
+            last_id += 1
+            renumbered[statement_id] = self.__ids[words] = last_id
+        self.__last_id = last_id
+        for conversation in self.__conversations.values():
+            for words, statement_id in list(conversation.items()):
+                if lost.get(words) == statement_id:
+                    del conversation[words]
+                elif words in self.__ids and statement_id in renumbered:
+                    conversation[words] = renumbered[statement_id]
+
+    def __forget(self, pending):
+        for write in pending:
+            for words in (write[1:2] if write[0] == 'update' else write[2:4]):
+                self.__ids.pop(words, None)
+            if write[0] != 'update':
+                continue
+            for prompt, occurrence in write[4]:
+                self.__unlearn(self.__responses, prompt, write[1])
+                self.__unlearn(self.__learned, write[1], prompt)
+                entry = self.__prompts.get(prompt)
+                if entry is not None:
+                    entry[1] -= 1
+                    if entry[1] <= 0:
+                        del self.__prompts[prompt]
+
+    def __unlearn(self, overlay, key, words):
+        learned = overlay.get(key)
+        if learned is not None and words in learned:
+            learned[words] -= 1
+            if learned[words] <= 0:
+                del learned[words]
+            if len(learned) <= 0:
+                del overlay[key]
+
+    def __commit(self, pending):
+        '''
+        __commit(self, pending)
+
+        Notes
+        -----
+            The same rows SQLStorageAdapter.update() and
+            add_to_conversation() write, and the same statement_token
+            rows StatementIndex.add() writes, all in one transaction.
+        '''
+        with self.engine.begin() as connection:
+            prompts = set()
+            for write in pending:
+                if write[0] == 'update':
+                    kind, words, extra_data, tags, responses = write
+                    self.__save_statement(connection, words, extra_data)
+                    for tag in tags:
+                        connection.execute(text('INSERT INTO tag (name) SELECT :name WHERE NOT EXISTS (SELECT 1 FROM tag WHERE name = :name)'), {'name': tag})
+                        connection.execute(text(
+                            'INSERT INTO tag_association (tag_id, statement_id) '
+                            'SELECT (SELECT id FROM tag WHERE name = :name), (SELECT id FROM statement WHERE text = :text)'), {'name': tag, 'text': words})
+                    for prompt, occurrence in responses:
+                        updated = connection.execute(text(
+                            'UPDATE response SET occurrence = occurrence + 1 '
+                            'WHERE text = :prompt AND statement_text = :text'), {'prompt': prompt, 'text': words})
+                        if updated.rowcount <= 0:
+                            connection.execute(text(
+                                'INSERT INTO response (text, created_at, occurrence, statement_text) '
+                                'VALUES (:prompt, CURRENT_TIMESTAMP, :occurrence, :text)'), {'prompt': prompt, 'occurrence': occurrence, 'text': words})
+                        prompts.add(prompt)
+                else:
+                    kind, conversation_id, words, response = write
+                    for statement_text in (words, response):
+                        self.__save_statement(connection, statement_text, None)
+                        connection.execute(text(
+                            'INSERT INTO conversation_association (conversation_id, statement_id) '
+                            'SELECT :conversation_id, id FROM statement WHERE text = :text AND id NOT IN ('
+                            'SELECT statement_id FROM conversation_association WHERE conversation_id = :conversation_id)'),
+                            {'conversation_id': conversation_id, 'text': statement_text})
+            if len(prompts) > 0 and self.engine.dialect.has_table(connection, 'statement_token'):
+                for prompt in prompts:
+                    row = connection.execute(text('SELECT id FROM statement WHERE text = :text'), {'text': prompt}).fetchone()
+                    if row is None:
+                        continue
+                    for token in tokenize(prompt):
+                        connection.execute(text('INSERT OR IGNORE INTO statement_token (token, statement_id) VALUES (:token, :statement_id)'),
+                                           {'token': token, 'statement_id': row[0]})
+
+    def __save_statement(self, connection, words, extra_data):
+        if extra_data is None:
+            connection.execute(text(
+                'INSERT INTO statement (text, extra_data) SELECT :text, :extra_data '
+                'WHERE NOT EXISTS (SELECT 1 FROM statement WHERE text = :text)'), {'text': words, 'extra_data': pickle.dumps({})})
+            return None
+        updated = connection.execute(text('UPDATE statement SET extra_data = :extra_data WHERE text = :text'), {'text': words, 'extra_data': extra_data})
+        if updated.rowcount <= 0:
+            connection.execute(text('INSERT INTO statement (text, extra_data) VALUES (:text, :extra_data)'), {'text': words, 'extra_data': extra_data})
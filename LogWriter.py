@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+import time
+
+
+FSYNC_POLICIES = ('off', 'batch', 'close')
+
+
+class LogWriter(object):
+    '''
+    LogWriter(object):
+
+    Parameters
+    ----------
+        param1 : flush_bytes
+            Once this many characters are waiting the writer thread is
+            woken up to write them out.
+
+        param2 : flush_interval
+            The most seconds anything waits before it's written.
+
+        param3 : fsync
+            off   - leave it to the operating system.
+            batch - fsync every file that was written to after each
+                    flush.
+            close - only fsync when the writer is closed.
+
+        param4 : logger
+            Where errors from the writer thread are reported, we can't
+            very well write them to the error log.
+
+    Members
+    -------
+        def write(self, path, words)
+            Queues words to be appended to the file at path.
+
+        def flush(self, timeout)
+            Writes out everything that's waiting and returns once it's
+            on disk.
+
+        def release(self)
+            Flushes and closes every open file. They're opened again
+            the next time they're written to.
+
+        def close(self, timeout)
+            Flushes, closes every file and stops the writer thread.
+
+    Exceptions
+    ----------
+        ValueError
+            Raised if fsync isn't one of FSYNC_POLICIES.
+
+    Notes
+    -----
+        write() only adds the text to a list, so logging never holds up
+        a response. The files stay open between flushes instead of
+        being opened, appended to and closed for every line.
+    '''
+
+    def __init__(self, flush_bytes=65536, flush_interval=1.0, fsync='batch', logger=None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError('Unknown fsync policy ' + str(fsync) + '. Use one of ' + ', '.join(FSYNC_POLICIES))
+        self.flush_bytes = int(flush_bytes)
+        self.flush_interval = float(flush_interval)
+        self.fsync = fsync
+        self.logger = logger or logging.getLogger(__name__)
+        self.__pending = {}
+        self.__pending_size = 0
+        self.__files = {}
+        self.__written = 0
+        self.__requested = 0
+        self.__closing = False
+        self.__condition = threading.Condition()
+        self.__file_lock = threading.Lock()
+        self.__thread = threading.Thread(name='log_writer', target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def write(self, path, words):
+        with self.__condition:
+            if self.__closing:
+                self.__append_now(path, words)
+                return None
+            self.__pending.setdefault(path, []).append(words)
+            self.__pending_size += len(words)
+            if self.__pending_size >= self.flush_bytes:
+                self.__condition.notify()
+
+    def flush(self, timeout=5.0):
+        '''
+        flush(self, timeout)
+
+        Returns
+        -------
+            True if everything that was waiting when we were called
+            has been written, False if timeout ran out first.
+        '''
+        deadline = time.monotonic() + timeout
+        with self.__condition:
+            self.__requested += 1
+            target = self.__requested
+            self.__condition.notify_all()
+            while self.__written < target and self.__thread.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.__condition.wait(remaining)
+        return True
+
+    def release(self):
+        self.flush()
+        with self.__file_lock:
+            for handle in self.__files.values():
+                self.__close_file(handle)
+            self.__files = {}
+
+    def close(self, timeout=5.0):
+        with self.__condition:
+            self.__closing = True
+            self.__condition.notify_all()
+        self.__thread.join(timeout)
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                if not self.__closing and self.__requested <= self.__written and self.__pending_size < self.flush_bytes:
+                    self.__condition.wait(self.flush_interval)
+                pending = self.__pending
+                target = self.__requested
+                closing = self.__closing
+                self.__pending = {}
+                self.__pending_size = 0
+            self.__write(pending)
+            if closing:
+                with self.__file_lock:
+                    for handle in self.__files.values():
+                        self.__close_file(handle)
+                    self.__files = {}
+            with self.__condition:
+                self.__written = max(self.__written, target)
+                self.__condition.notify_all()
+                if closing and len(self.__pending) <= 0:
+                    return None
+
+    def __write(self, pending):
+        with self.__file_lock:
+            for path, chunks in pending.items():
+                try:
+                    handle = self.__files.get(path)
+                    if handle is None:
+                        directory = os.path.dirname(path)
+                        if directory and not os.path.isdir(directory):
+                            os.makedirs(directory)
+                        handle = open(path, 'a')
+                        self.__files[path] = handle
+                    handle.write(''.join(chunks))
+                    handle.flush()
+                    if self.fsync == 'batch':
+                        os.fsync(handle.fileno())
+                except (IOError, OSError) as error:
+                    self.logger.error('LogWriter: could not write ' + path + ': ' + str(error))
+                    self.__files.pop(path, None)
+
+    def __close_file(self, handle):
+        try:
+            if self.fsync != 'off':
+                handle.flush()
+                os.fsync(handle.fileno())
+            handle.close()
+        except (IOError, OSError) as error:
+            self.logger.error('LogWriter: could not close ' + handle.name + ': ' + str(error))
+
+    def __append_now(self, path, words):
+        try:
+            with open(path, 'a') as handle:
+                handle.write(words)
+        except (IOError, OSError) as error:
+            self.logger.error('LogWriter: could not write ' + path + ': ' + str(error))
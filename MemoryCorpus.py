@@ -0,0 +1,635 @@
+import heapq
+import itertools
+import json
+import mmap
+import os
+import random
+import sqlite3
+import struct
+import sys
+import time
+from array import array
+from collections import Counter
+from chatterbot.conversation import Response, Statement
+from chatterbot.storage import StorageAdapter
+from StatementIndex import tokenize
+
+
+MAGIC = b'CAPRICA\x00'
+SNAPSHOT_VERSION = 1
+# Written in the machines own byte order. A snapshot from a machine with
+# the other one reads this back wrong and is turned down.
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct('=8sIII')
+SECTION = struct.Struct('=24sQQ')
+ALIGNMENT = 8
+
+# The sections of a snapshot in the order they're written, and the array
+# typecode each of them holds.
+SECTIONS = (
+    ('meta', 'B'),
+    ('text_offsets', 'Q'),
+    ('text_data', 'B'),
+    ('text_order', 'I'),
+    ('response_offsets', 'I'),
+    ('response_statements', 'I'),
+    ('response_occurrences', 'I'),
+    ('token_offsets', 'Q'),
+    ('token_data', 'B'),
+    ('posting_offsets', 'I'),
+    ('posting_statements', 'I'),
+)
+
+
+def default_snapshot_path(database):
+    '''
+    default_snapshot_path(database)
+
+    Returns
+    -------
+        Where the snapshot of database is kept when [corpus] snapshot
+        is empty. It sits right next to the database, Ie,
+        RC_2001-06.db.snapshot
+    '''
+    return str(database) + '.snapshot'
+
+
+def offsets_from_counts(counts):
+    '''
+    offsets_from_counts(counts)
+
+    Returns
+    -------
+        An array one longer than counts where entry n is where the
+        entries of n start, so entries n + 1 is where they end.
+    '''
+    offsets = array('I', [0]) * (len(counts) + 1)
+    total = 0
+    for number, count in enumerate(counts):
+        offsets[number] = total
+        total += count
+    offsets[len(counts)] = total
+    return offsets
+
+
+class MemoryCorpus(object):
+    '''
+    MemoryCorpus(object):
+
+    Parameters
+    ----------
+        param1 : texts
+            Every statement text, in the order of statement.id. A
+            statements number is its position here.
+
+        param2 : tokens
+            Every token of the indexed statements, sorted. A tokens id
+            is its position here.
+
+        param3 : response_offsets, param4 : response_statements,
+        param5 : response_occurrences
+            The responses to statement number n are the statement
+            numbers in response_statements[response_offsets[n]:
+            response_offsets[n + 1]], with their occurrence at the same
+            place in response_occurrences.
+
+        param6 : posting_offsets, param7 : posting_statements
+            The same for the statement numbers that contain token id t.
+
+        param8 : shortlist_size
+            The most candidates candidates() returns.
+
+    Attributes
+    ----------
+        self.statement_count
+            How many statements there are.
+
+    Members
+    -------
+        def text(self, number), def number(self, words)
+            The text of a statement number and the number of a text,
+            or None if there's no such statement.
+
+        def token_id(self, token)
+            The id of a token, or None if no indexed statement has it.
+
+        def indexed(self)
+            A generator of the numbers of the statements that have at
+            least one response, the ones BestMatch can pick.
+
+        def responses(self, words)
+            Returns (response text, occurrence) for every response to
+            the statement words.
+
+        def candidates(self, words), def scored_candidates(self, words)
+            The same as StatementIndex(), so IndexedBestMatch can use
+            this as the storage adapters statement_index.
+
+        def close(self)
+            Lets go of anything that was opened.
+
+    Notes
+    -----
+        The whole of statement and response in a handful of flat
+        arrays. The texts are interned python strings and everything
+        else is 4 byte numbers in array.array()s, so a statement costs
+        its text plus a few bytes a response and a few bytes a token,
+        rather than the several hundred bytes a python object or a
+        tuple each would. Nothing here ever changes once it's built.
+    '''
+
+    def __init__(self, texts, tokens, response_offsets, response_statements, response_occurrences,
+                 posting_offsets, posting_statements, shortlist_size=50):
+        self.texts = texts
+        self.tokens = tokens
+        self.response_offsets = response_offsets
+        self.response_statements = response_statements
+        self.response_occurrences = response_occurrences
+        self.posting_offsets = posting_offsets
+        self.posting_statements = posting_statements
+        self.shortlist_size = shortlist_size
+        self.statement_count = len(texts)
+        self.__numbers = dict((words, number) for number, words in enumerate(texts))
+        self.__token_ids = dict((token, token_id) for token_id, token in enumerate(tokens))
+
+    def text(self, number):
+        return self.texts[number]
+
+    def number(self, words):
+        return self.__numbers.get(words)
+
+    def token_id(self, token):
+        return self.__token_ids.get(token)
+
+    def indexed(self):
+        offsets = self.response_offsets
+        return (number for number in range(self.statement_count) if offsets[number + 1] > offsets[number])
+
+    def responses(self, words):
+        number = self.number(words)
+        if number is None:
+            return []
+        start, end = self.response_offsets[number], self.response_offsets[number + 1]
+        return [(self.text(statement), occurrence) for statement, occurrence in
+                zip(self.response_statements[start:end], self.response_occurrences[start:end])]
+
+    def candidates(self, words):
+        return [match for match, shared in self.scored_candidates(words)]
+
+    def scored_candidates(self, words):
+        '''
+        scored_candidates(self, words)
+
+        Notes
+        -----
+            Counter adds up the posting lists of the tokens of words
+            in C, so this is one pass over the postings and no SQL.
+            Statements that share as many tokens come newest first,
+            which is the order sqlite's sorter nearly always hands
+            StatementIndex() ties back in. It doesn't promise one, so
+            when more than shortlist_size statements tie the two can
+            now and then keep different ones of them.
+        '''
+        shared = Counter()
+        for token in tokenize(words):
+            token_id = self.token_id(token)
+            if token_id is not None:
+                shared.update(self.posting_statements[self.posting_offsets[token_id]:self.posting_offsets[token_id + 1]])
+        best = heapq.nsmallest(self.shortlist_size, shared.items(), key=lambda item: (-item[1], -item[0]))
+        return [(self.text(number), count) for number, count in best]
+
+    def close(self):
+        return None
+
+
+def read_corpus(database, shortlist_size=50, report=None):
+    '''
+    read_corpus(database, shortlist_size, report)
+
+    Parameters
+    ----------
+        param1 : database
+            The chatterbot database to read. It's opened read only.
+
+        param2 : shortlist_size
+            See MemoryCorpus().
+
+        param3 : report
+            An optional function that's called with a line of progress
+            text after every step.
+
+    Returns
+    -------
+        A MemoryCorpus() of everything in statement and response.
+
+    Notes
+    -----
+        Responses are read with a pair that's in the table more than
+        once summed into one, in the order of the first row of every
+        pair, then put in order of their statement with a counting
+        sort so no list of tuples is ever built.
+    '''
+    report = report or (lambda line: None)
+    started = time.monotonic()
+    connection = sqlite3.connect('file:' + os.path.abspath(database) + '?mode=ro', uri=True)
+    try:
+        texts = [sys.intern(row[0]) for row in connection.execute('SELECT text FROM statement ORDER BY id')]
+        numbers = dict((words, number) for number, words in enumerate(texts))
+        report('Read ' + str(len(texts)) + ' statements in ' + str(round(time.monotonic() - started, 1)) + 's')
+        prompts, statements, occurrences = array('I'), array('I'), array('I')
+        counts = array('I', [0]) * len(texts)
+        for prompt, statement_text, occurrence in connection.execute(
+                'SELECT text, statement_text, SUM(occurrence) FROM response '
+                'GROUP BY text, statement_text ORDER BY MIN(id)'):
+            prompt, statement = numbers.get(prompt), numbers.get(statement_text)
+            if prompt is None or statement is None:
+                continue
+            prompts.append(prompt)
+            statements.append(statement)
+            occurrences.append(occurrence)
+            counts[prompt] += 1
+    finally:
+        connection.close()
+    response_offsets = offsets_from_counts(counts)
+    position = array('I', response_offsets)
+    response_statements = array('I', [0]) * len(prompts)
+    response_occurrences = array('I', [0]) * len(prompts)
+    for prompt, statement, occurrence in zip(prompts, statements, occurrences):
+        response_statements[position[prompt]] = statement
+        response_occurrences[position[prompt]] = occurrence
+        position[prompt] += 1
+    del prompts, statements, occurrences, position
+    report('Read ' + str(len(response_statements)) + ' responses in ' + str(round(time.monotonic() - started, 1)) + 's')
+
+    postings = {}
+    for number in range(len(texts)):
+        if response_offsets[number + 1] > response_offsets[number]:
+            for token in tokenize(texts[number]):
+                postings.setdefault(token, array('I')).append(number)
+    tokens = sorted(postings)
+    posting_offsets = offsets_from_counts([len(postings[token]) for token in tokens])
+    posting_statements = array('I')
+    for token in tokens:
+        posting_statements.extend(postings.pop(token))
+    report('Indexed ' + str(len(tokens)) + ' tokens in ' + str(round(time.monotonic() - started, 1)) + 's')
+    return MemoryCorpus(texts, tokens, response_offsets, response_statements, response_occurrences,
+                        posting_offsets, posting_statements, shortlist_size)
+
+
+def database_stamp(database):
+    '''
+    database_stamp(database)
+
+    Returns
+    -------
+        The size and modification time of database and of its write
+        ahead log, where a change sits until it's checkpointed. A
+        snapshot keeps the stamp of the database it was written from
+        so a database that's changed since can be told apart. An empty
+        log is the same as none, just opening the database makes one.
+    '''
+    stamp = {}
+    for key, path in (('database', database), ('wal', database + '-wal')):
+        if os.path.isfile(path) and os.path.getsize(path) > 0:
+            status = os.stat(path)
+            stamp[key + '_size'] = status.st_size
+            stamp[key + '_mtime'] = status.st_mtime_ns
+        else:
+            stamp[key + '_size'] = stamp[key + '_mtime'] = None
+    return stamp
+
+
+def write_snapshot(corpus, path, database=None):
+    '''
+    write_snapshot(corpus, path, database)
+
+    Parameters
+    ----------
+        param1 : corpus
+            The MemoryCorpus() from read_corpus().
+
+        param2 : path
+            Where the snapshot goes. It's written next to it first and
+            moved into place, so a running chatbot never maps half a
+            file.
+
+        param3 : database
+            The database corpus was read from, its stamp goes in the
+            snapshot. See database_stamp().
+
+    Returns
+    -------
+        The metadata that was written.
+
+    Notes
+    -----
+        A header, a table of where every section starts and how long
+        it is, then the sections, each one starting on an 8 byte
+        boundary. The arrays are written exactly as they are in memory
+        so SnapshotCorpus() can use them where they sit in the file.
+        The texts and tokens are utf-8 one after the other with an
+        array of where each one starts, plus text_order, the statement
+        numbers in the order of their text, to look texts up by.
+    '''
+    texts = [words.encode('utf-8') for words in corpus.texts]
+    tokens = [token.encode('utf-8') for token in corpus.tokens]
+    meta = {'statements': corpus.statement_count,
+            'responses': len(corpus.response_statements),
+            'tokens': len(tokens),
+            'created': time.strftime('%Y-%m-%d %H:%M:%S')}
+    if database is not None:
+        meta['database'] = os.path.abspath(database)
+        meta.update(database_stamp(database))
+    sections = {
+        'meta': json.dumps(meta, sort_keys=True).encode('utf-8'),
+        'text_offsets': array('Q', itertools.accumulate(itertools.chain([0], (len(words) for words in texts)))),
+        'text_data': b''.join(texts),
+        'text_order': array('I', sorted(range(len(texts)), key=texts.__getitem__)),
+        'response_offsets': corpus.response_offsets,
+        'response_statements': corpus.response_statements,
+        'response_occurrences': corpus.response_occurrences,
+        'token_offsets': array('Q', itertools.accumulate(itertools.chain([0], (len(token) for token in tokens)))),
+        'token_data': b''.join(tokens),
+        'posting_offsets': corpus.posting_offsets,
+        'posting_statements': corpus.posting_statements,
+    }
+    blobs = [(name, bytes(sections[name]) if typecode == 'B' else sections[name].tobytes()) for name, typecode in SECTIONS]
+    offset = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    for name, blob in blobs:
+        offset += -offset % ALIGNMENT
+        table.append(SECTION.pack(name.encode('ascii'), offset, len(blob)))
+        offset += len(blob)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as snapshot:
+        snapshot.write(HEADER.pack(MAGIC, SNAPSHOT_VERSION, BYTE_ORDER_MARK, len(SECTIONS)))
+        snapshot.write(b''.join(table))
+        for name, blob in blobs:
+            snapshot.write(b'\x00' * (-snapshot.tell() % ALIGNMENT))
+            snapshot.write(blob)
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+    os.replace(temporary, path)
+    return meta
+
+
+class SnapshotCorpus(MemoryCorpus):
+    '''
+    SnapshotCorpus(MemoryCorpus):
+
+    Parameters
+    ----------
+        param1 : path
+            A snapshot from write_snapshot().
+
+        param2 : shortlist_size
+            See MemoryCorpus().
+
+    Attributes
+    ----------
+        self.meta
+            The metadata write_snapshot() stored.
+
+    Exceptions
+    ----------
+        ValueError
+            Raised if path isn't a snapshot, is from another version,
+            or was written on a machine with the other byte order.
+
+    Notes
+    -----
+        Opening a snapshot reads the header and nothing else. The file
+        is mapped with mmap and every array is a memoryview cast over
+        its section, so the operating system pages in what's used as
+        it's used and start up takes the same few milliseconds however
+        big the corpus is. Every process that maps the same snapshot
+        shares the same pages, which suits 'python Sentience.py batch'.
+
+        Texts and tokens are decoded when they're asked for rather than
+        kept as python strings, and looked up with a binary search over
+        text_order and the sorted tokens rather than a dictionary that
+        would have to be built first.
+    '''
+
+    def __init__(self, path, shortlist_size=50):
+        self.path = path
+        self.shortlist_size = shortlist_size
+        self.__file = open(path, 'rb')
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.__file.close()
+            raise
+        self.__views = []
+        try:
+            self.__read_sections()
+        except BaseException:
+            self.close()
+            raise
+        self.texts = None
+        self.tokens = None
+        self.statement_count = len(self.text_order)
+
+    def text(self, number):
+        return str(self.text_data[self.text_offsets[number]:self.text_offsets[number + 1]], 'utf-8')
+
+    def number(self, words):
+        target = words.encode('utf-8')
+        low, high = 0, len(self.text_order)
+        while low < high:
+            middle = (low + high) // 2
+            number = self.text_order[middle]
+            found = bytes(self.text_data[self.text_offsets[number]:self.text_offsets[number + 1]])
+            if found == target:
+                return number
+            if found < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def token_id(self, token):
+        target = token.encode('utf-8')
+        low, high = 0, len(self.token_offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            found = bytes(self.token_data[self.token_offsets[middle]:self.token_offsets[middle + 1]])
+            if found == target:
+                return middle
+            if found < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self):
+        for view in reversed(self.__views):
+            view.release()
+        self.__views = []
+        if not self.__map.closed:
+            self.__map.close()
+        self.__file.close()
+
+    def __read_sections(self):
+        if len(self.__map) < HEADER.size:
+            raise ValueError(self.path + ' is not a corpus snapshot.')
+        magic, version, byte_order, count = HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC:
+            raise ValueError(self.path + ' is not a corpus snapshot.')
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(self.path + ' is snapshot version ' + str(version) + ', this is version ' + str(SNAPSHOT_VERSION) + '. Run "python Sentience.py snapshot build" again.')
+        if byte_order != BYTE_ORDER_MARK:
+            raise ValueError(self.path + ' was written on a machine with the other byte order. Run "python Sentience.py snapshot build" again.')
+        typecodes = dict(SECTIONS)
+        whole = memoryview(self.__map)
+        self.__views.append(whole)
+        for number in range(count):
+            name, offset, length = SECTION.unpack_from(self.__map, HEADER.size + number * SECTION.size)
+            name = name.rstrip(b'\x00').decode('ascii')
+            if name not in typecodes or offset + length > len(self.__map):
+                raise ValueError(self.path + ' is damaged, section ' + name + ' is not where it should be.')
+            view = whole[offset:offset + length]
+            self.__views.append(view)
+            if typecodes[name] != 'B':
+                view = view.cast(typecodes[name])
+                self.__views.append(view)
+            setattr(self, name, view)
+        missing = [name for name, typecode in SECTIONS if not hasattr(self, name)]
+        if len(missing) > 0:
+            raise ValueError(self.path + ' is damaged, it has no ' + ', '.join(missing) + ' section.')
+        self.meta = json.loads(str(self.meta, 'utf-8'))
+
+
+def open_corpus(database, snapshot=None, shortlist_size=50, logger=None):
+    '''
+    open_corpus(database, snapshot, shortlist_size, logger)
+
+    Returns
+    -------
+        A SnapshotCorpus() of snapshot if it's there and was written
+        from database as database is now, otherwise a MemoryCorpus()
+        read from database. A snapshot that's out of date is logged
+        and left alone.
+    '''
+    if snapshot and os.path.isfile(snapshot):
+        corpus = SnapshotCorpus(snapshot, shortlist_size)
+        stale = os.path.isfile(database) and any(corpus.meta.get(key) != value for key, value in database_stamp(database).items())
+        if not stale:
+            return corpus
+        corpus.close()
+        if logger is not None:
+            logger.warning('MemoryCorpus: ' + snapshot + ' is older than ' + database + ', reading the database instead. Run "python Sentience.py snapshot build" to bring it up to date.')
+    return read_corpus(database, shortlist_size)
+
+
+class MemoryStorageAdapter(StorageAdapter):
+    '''
+    MemoryStorageAdapter(StorageAdapter):
+
+    Parameters
+    ----------
+        param1 : **kwargs
+            The keyword arguments ChatBot() passes to its storage
+            adapter. database is the corpus, memory_snapshot an
+            optional snapshot of it and index_shortlist_size how many
+            candidates the index hands IndexedBestMatch.
+
+    Attributes
+    ----------
+        self.corpus
+            The MemoryCorpus() or SnapshotCorpus() everything is
+            answered from.
+
+        self.statement_index
+            self.corpus again, it stands in for the StatementIndex()
+            of IndexedSQLStorageAdapter.
+
+    Members
+    -------
+        def count(self), def find(self, statement_text),
+        def get_random(self), def get_response_statements(self)
+            The same as SQLStorageAdapter. The statements that come
+            back only have the responses filter() needs to pick from,
+            not their tags or extra_data.
+
+        def filter(self, **kwargs)
+            Only filter(in_response_to__contains=text), the one
+            BestMatch uses.
+
+        def create_conversation(self), def get_latest_response(self, conversation_id)
+            Conversations are numbered in memory and never have
+            anything in them.
+
+        def update(self, statement), def add_to_conversation(self, ...),
+        def remove(self, statement_text), def drop(self)
+            Raise AdapterMethodNotImplementedError, nothing is ever
+            written.
+
+        def close(self)
+            Unmaps the snapshot.
+
+    Notes
+    -----
+        For a chatbot that never learns, Ie, a kiosk, everything
+        get_response() asks the storage adapter for comes out of memory
+        and there isn't a single SQL query per turn. It needs
+        read_only=True, which CapricaBot.build_chatbot() passes along
+        with it.
+    '''
+
+    def __init__(self, **kwargs):
+        super(MemoryStorageAdapter, self).__init__(**kwargs)
+        self.read_only = True
+        self.adapter_supports_queries = False
+        database = self.kwargs.get('database')
+        started = time.monotonic()
+        self.corpus = open_corpus(database, self.kwargs.get('memory_snapshot'), self.kwargs.get('index_shortlist_size', 50), self.logger)
+        self.statement_index = self.corpus
+        self.__conversations = itertools.count(1)
+        self.logger.info('MemoryStorageAdapter: ' + str(self.corpus.statement_count) + ' statements from ' +
+                         getattr(self.corpus, 'path', database) + ' in ' + str(round(time.monotonic() - started, 3)) + 's')
+
+    def count(self):
+        return self.corpus.statement_count
+
+    def find(self, statement_text):
+        number = self.corpus.number(statement_text)
+        if number is None:
+            return None
+        return Statement(self.corpus.text(number))
+
+    def filter(self, **kwargs):
+        if list(kwargs) != ['in_response_to__contains']:
+            raise self.AdapterMethodNotImplementedError('MemoryStorageAdapter only supports filter(in_response_to__contains=text).')
+        words = kwargs['in_response_to__contains']
+        return [Statement(statement_text, in_response_to=[Response(words, occurrence=occurrence)])
+                for statement_text, occurrence in self.corpus.responses(words)]
+
+    def get_response_statements(self):
+        return [Statement(self.corpus.text(number)) for number in self.corpus.indexed()]
+
+    def get_random(self):
+        if self.corpus.statement_count < 1:
+            raise self.EmptyDatabaseException()
+        return Statement(self.corpus.text(random.randrange(0, self.corpus.statement_count)))
+
+    def create_conversation(self):
+        return next(self.__conversations)
+
+    def get_latest_response(self, conversation_id):
+        return None
+
+    def update(self, statement):
+        raise self.AdapterMethodNotImplementedError('MemoryStorageAdapter is read only.')
+
+    def add_to_conversation(self, conversation_id, statement, response):
+        raise self.AdapterMethodNotImplementedError('MemoryStorageAdapter is read only.')
+
+    def remove(self, statement_text):
+        raise self.AdapterMethodNotImplementedError('MemoryStorageAdapter is read only.')
+
+    def drop(self):
+        raise self.AdapterMethodNotImplementedError('MemoryStorageAdapter is read only.')
+
+    def close(self):
+        self.corpus.close()
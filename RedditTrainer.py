@@ -0,0 +1,383 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import pickle
+import re
+import sqlite3
+import tempfile
+import time
+from StatementIndex import tokenize
+from StorageProfile import PROFILES, apply_pragmas
+
+
+DUMP_PATTERN = re.compile(r'RC_(\d{4})-(\d{2})')
+
+SKIPPED_BODIES = frozenset(['', '[deleted]', '[removed]'])
+
+STAGING_SCHEMA = (
+    'CREATE TABLE comment (id TEXT NOT NULL, parent TEXT, body TEXT NOT NULL, created REAL)',
+)
+
+INCOMING_SCHEMA = (
+    'CREATE TEMP TABLE IF NOT EXISTS incoming ('
+    'text TEXT NOT NULL, '
+    'statement_text TEXT NOT NULL, '
+    'occurrence INTEGER NOT NULL, '
+    'created_at TEXT, '
+    'PRIMARY KEY (text, statement_text))',
+)
+
+# The bulk profile, but with a fixed page cache and no memory map so the
+# memory we use doesn't grow with the size of the corpus.
+TARGET_PRAGMAS = dict(PROFILES['bulk'], mmap_size='0', cache_size='-65536', temp_store='FILE')
+
+SHARD_SCHEMA = (
+    'CREATE TABLE shard.pair ('
+    'text TEXT NOT NULL, '
+    'statement_text TEXT NOT NULL, '
+    'occurrence INTEGER NOT NULL, '
+    'created_at TEXT)',
+)
+
+# Parent and reply pairs, the same pair said more than once in a month is
+# one row with its count. MIN(created) keeps the first time it was said.
+JOIN_QUERY = (
+    "SELECT parent.body, child.body, COUNT(*), datetime(MIN(child.created), 'unixepoch') "
+    'FROM comment AS child JOIN comment AS parent ON parent.id = child.parent '
+    'GROUP BY parent.body, child.body')
+
+
+def dump_month(path):
+    '''
+    dump_month(path)
+
+    Returns
+    -------
+        'YYYY-MM' out of a name like RC_2015-01.bz2, or None if the
+        name isn't one of those.
+    '''
+    match = DUMP_PATTERN.search(os.path.basename(path))
+    if match is None:
+        return None
+    return match.group(1) + '-' + match.group(2)
+
+
+def open_dump(path):
+    '''
+    open_dump(path)
+
+    Returns
+    -------
+        The dump opened as text for reading. .bz2, .xz, .gz and, if the
+        zstandard package is installed, .zst are decompressed as they're
+        read. Anything else is read as it is.
+
+    Exceptions
+    ----------
+        ImportError
+            Raised for a .zst dump when zstandard isn't installed.
+    '''
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.xz'):
+        return lzma.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.zst'):
+        import io
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('Reading ' + path + ' needs the zstandard package, pip install zstandard')
+        # The newer dumps are compressed with a long window.
+        reader = zstandard.ZstdDecompressor(max_window_size=2 ** 31).stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def clean_body(body):
+    '''
+    clean_body(body)
+
+    Returns
+    -------
+        The comment text on one line, with runs of white space
+        collapsed, or '' for the comments that were deleted or
+        removed.
+    '''
+    body = ' '.join(str(body or '').split())
+    if body in SKIPPED_BODIES:
+        return ''
+    return body.replace('&gt;', '>').replace('&lt;', '<').replace('&amp;', '&')
+
+
+def read_comments(lines, min_score=1, max_length=400):
+    '''
+    read_comments(lines, min_score, max_length)
+
+    Parameters
+    ----------
+        param1 : lines
+            The dump, one JSON comment per line. See open_dump().
+
+        param2 : min_score
+            Comments scored lower than this are left out.
+
+        param3 : max_length
+            So are comments longer than this. Statement text is a
+            VARCHAR(400) in the chatterbot schema.
+
+    Returns
+    -------
+        A generator of (id, parent id, body, created_utc) for every
+        comment that's kept. The parent id is None when the comment
+        replies to the submission rather than another comment, there's
+        no text to pair it with. Lines that aren't JSON are skipped.
+    '''
+    for line in lines:
+        try:
+            comment = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(comment, dict):
+            continue
+        body = clean_body(comment.get('body'))
+        if not body or len(body) > max_length:
+            continue
+        try:
+            if int(comment.get('score') or 0) < min_score:
+                continue
+            created = float(comment.get('created_utc') or 0)
+        except (TypeError, ValueError):
+            continue
+        parent = str(comment.get('parent_id') or '')
+        yield str(comment.get('id')), parent[3:] if parent.startswith('t1_') else None, body, created
+
+
+def create_corpus(database):
+    '''
+    create_corpus(database)
+
+    Notes
+    -----
+        Creates the chatterbot tables in database if they aren't there,
+        from chatterbot's own models, so a database we fill is the same
+        as one chatterbot made.
+    '''
+    from sqlalchemy import create_engine
+    from chatterbot.ext.sqlalchemy_app.models import Base
+
+    engine = create_engine('sqlite:///' + database)
+    try:
+        Base.metadata.create_all(engine)
+    finally:
+        engine.dispose()
+
+
+class RedditTrainer(object):
+    '''
+    RedditTrainer(object):
+
+    Parameters
+    ----------
+        param1 : database
+            The chatterbot database the pairs are added to. It's
+            created if it doesn't exist.
+
+        param2 : batch_size
+            Rows per transaction, both in the staging database and in
+            database.
+
+        param3 : min_score, param4 : max_length
+            See read_comments().
+
+        param5 : staging_dir
+            Where the temporary staging database goes. Defaults to the
+            folder database is in, since it's about as big as the
+            uncompressed comments that are kept.
+
+        param6 : report
+            An optional function that's called with a line of progress
+            text every now and then.
+
+    Members
+    -------
+        def train(self, path)
+            Adds every parent and reply pair in the dump at path to
+            database. Returns a dictionary of counts.
+
+        def shard(self, path, shard)
+            Writes the parent and reply pairs in the dump at path to a
+            new database at shard instead, one row in its pair table
+            for every distinct pair with how many times it was said.
+            See CorpusIngest.py.
+
+    Notes
+    -----
+        ChatterBotCorpusTrainer reads its whole corpus into memory and
+        adds it a statement at a time through the storage adapter, a
+        handful of queries and a commit for every one. A month of
+        reddit is tens of millions of comments, so that doesn't work.
+
+        This reads the dump a line at a time and never holds more than
+        batch_size rows. The comments are first written to a staging
+        sqlite database next to the corpus, with no journal since it's
+        thrown away anyway, and their id is indexed once at the end.
+        The join of every comment to its parent is then done by sqlite
+        on disk, with whatever page cache we give it, and streamed out
+        already grouped into batches. Every batch goes into database in
+        one transaction. New pairs are inserted, pairs that are already
+        there get their occurrence added to, the same as chatterbot's
+        learning does. If the statement_token index exists the new
+        statements are indexed too. An ann index has to be brought up
+        to date with 'python Sentience.py index add' afterwards.
+
+        The order of the dump doesn't matter, a reply that comes
+        before its parent is still paired with it.
+    '''
+
+    def __init__(self, database, batch_size=50000, min_score=1, max_length=400, staging_dir=None, report=None):
+        self.database = database
+        self.batch_size = max(1, int(batch_size))
+        self.min_score = min_score
+        self.max_length = max_length
+        self.staging_dir = staging_dir or os.path.dirname(os.path.abspath(database))
+        self.report = report or (lambda line: None)
+        self.extra_data = pickle.dumps({})
+
+    def train(self, path):
+        return self.__staged(path, self.__load)
+
+    def shard(self, path, shard):
+        return self.__staged(path, lambda staging: self.__write_shard(staging, shard))
+
+    def __staged(self, path, load):
+        started = time.monotonic()
+        handle, staging = tempfile.mkstemp(prefix='RedditTrainer-', suffix='.db', dir=self.staging_dir)
+        os.close(handle)
+        try:
+            comments = self.__stage(path, staging)
+            self.report(path + ': ' + str(comments) + ' comments staged in ' + str(round(time.monotonic() - started, 1)) + 's')
+            counts = load(staging)
+        finally:
+            for suffix in ('', '-journal', '-wal', '-shm'):
+                if os.path.exists(staging + suffix):
+                    os.remove(staging + suffix)
+        counts['comments'] = comments
+        counts['seconds'] = round(time.monotonic() - started, 3)
+        self.report(path + ': ' + ', '.join(str(counts[key]) + ' ' + key.replace('_', ' ') for key in ('pairs', 'new_responses', 'new_statements') if key in counts) + ' in ' + str(counts['seconds']) + 's')
+        return counts
+
+    def __stage(self, path, staging):
+        connection = sqlite3.connect(staging, isolation_level=None)
+        try:
+            connection.execute('PRAGMA journal_mode = OFF')
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.execute('PRAGMA cache_size = -65536')
+            connection.execute('PRAGMA temp_store = FILE')
+            for statement in STAGING_SCHEMA:
+                connection.execute(statement)
+            comments = 0
+            batch = []
+            with open_dump(path) as lines:
+                for row in read_comments(lines, self.min_score, self.max_length):
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        comments += self.__insert_comments(connection, batch)
+                        batch = []
+                        if comments % (self.batch_size * 20) == 0:
+                            self.report(path + ': ' + str(comments) + ' comments read')
+            comments += self.__insert_comments(connection, batch)
+            connection.execute('CREATE INDEX ix_comment_id ON comment (id)')
+            return comments
+        finally:
+            connection.close()
+
+    def __insert_comments(self, connection, batch):
+        connection.execute('BEGIN')
+        connection.executemany('INSERT INTO comment (id, parent, body, created) VALUES (?, ?, ?, ?)', batch)
+        connection.execute('COMMIT')
+        return len(batch)
+
+    def __write_shard(self, staging, shard):
+        for suffix in ('', '-journal', '-wal', '-shm'):
+            if os.path.exists(shard + suffix):
+                os.remove(shard + suffix)
+        connection = sqlite3.connect(staging, isolation_level=None)
+        try:
+            connection.execute('PRAGMA cache_size = -65536')
+            connection.execute('PRAGMA temp_store = FILE')
+            connection.execute('ATTACH DATABASE ? AS shard', (shard,))
+            connection.execute('PRAGMA shard.journal_mode = OFF')
+            connection.execute('PRAGMA shard.synchronous = OFF')
+            for statement in SHARD_SCHEMA:
+                connection.execute(statement)
+            connection.execute('INSERT INTO shard.pair (text, statement_text, occurrence, created_at) ' + JOIN_QUERY)
+            return {'pairs': connection.execute('SELECT COUNT(*) FROM shard.pair').fetchone()[0]}
+        finally:
+            connection.close()
+
+    def __load(self, staging):
+        create_corpus(self.database)
+        source = sqlite3.connect(staging)
+        target = sqlite3.connect(self.database, isolation_level=None)
+        counts = {'pairs': 0, 'new_responses': 0, 'new_statements': 0}
+        try:
+            source.execute('PRAGMA cache_size = -65536')
+            source.execute('PRAGMA temp_store = FILE')
+            apply_pragmas(target, TARGET_PRAGMAS)
+            # The pairs are matched against response.text, and migrate()
+            # is what makes that an indexed lookup.
+            from CorpusSchema import migrate
+            migrate(self.database, 0)
+            for statement in INCOMING_SCHEMA:
+                target.execute(statement)
+            indexed = target.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'statement_token'").fetchone() is not None
+            cursor = source.execute(JOIN_QUERY)
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if len(rows) <= 0:
+                    break
+                self.__merge(target, rows, indexed, counts)
+                if counts['pairs'] % (self.batch_size * 20) == 0:
+                    self.report(self.database + ': ' + str(counts['pairs']) + ' pairs written')
+        finally:
+            source.close()
+            target.close()
+        return counts
+
+    def __merge(self, target, rows, indexed, counts):
+        target.execute('BEGIN IMMEDIATE')
+        try:
+            target.executemany('INSERT INTO incoming (text, statement_text, occurrence, created_at) VALUES (?, ?, ?, ?)', rows)
+            before = target.total_changes
+            target.execute('INSERT OR IGNORE INTO statement (text, extra_data) SELECT text, ? FROM incoming', (self.extra_data,))
+            target.execute('INSERT OR IGNORE INTO statement (text, extra_data) SELECT statement_text, ? FROM incoming', (self.extra_data,))
+            counts['new_statements'] += target.total_changes - before
+            target.execute(
+                'UPDATE response SET occurrence = occurrence + ('
+                'SELECT incoming.occurrence FROM incoming '
+                'WHERE incoming.text = response.text AND incoming.statement_text = response.statement_text) '
+                'WHERE response.text IN (SELECT text FROM incoming) AND EXISTS ('
+                'SELECT 1 FROM incoming '
+                'WHERE incoming.text = response.text AND incoming.statement_text = response.statement_text)')
+            before = target.total_changes
+            target.execute(
+                'INSERT INTO response (text, created_at, occurrence, statement_text) '
+                'SELECT text, created_at, occurrence, statement_text FROM incoming WHERE NOT EXISTS ('
+                'SELECT 1 FROM response '
+                'WHERE response.text = incoming.text AND response.statement_text = incoming.statement_text)')
+            counts['new_responses'] += target.total_changes - before
+            if indexed:
+                postings = [(token, statement_id)
+                            for statement_id, text in target.execute('SELECT id, text FROM statement WHERE text IN (SELECT text FROM incoming)')
+                            for token in tokenize(text)]
+                target.executemany('INSERT OR IGNORE INTO statement_token (token, statement_id) VALUES (?, ?)', postings)
+            target.execute('DELETE FROM incoming')
+            target.execute('COMMIT')
+        except BaseException:
+            target.execute('ROLLBACK')
+            raise
+        counts['pairs'] += len(rows)
@@ -0,0 +1,234 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from chatterbot.conversation import Statement
+
+
+# Only ?, ! and . at the very end are dropped. Anything else, an operator
+# or a digit, can change the answer, "what is 7 * 3" isn't "what is 7 - 3".
+TRAILING_PATTERN = re.compile(r'[?!.\s]+$')
+
+
+def normalize(words):
+    '''
+    normalize(words)
+
+    Returns
+    -------
+        words in lower case with runs of white space collapsed and the
+        ?, ! and . at the end taken off, so "Hi!", "hi" and " HI " all
+        share one cache entry. Nothing else is touched.
+
+    Notes
+    -----
+        'python -m doctest ResponseCache.py' checks these.
+
+        >>> normalize(' Hi! ') == normalize('hi')
+        True
+        >>> normalize('what is 7 * 3') == normalize('what is 7 - 3')
+        False
+        >>> normalize('What is 7 * 3?')
+        'what is 7 * 3'
+        >>> normalize('?!')
+        '?!'
+    '''
+    lowered = ' '.join(str(words).lower().split())
+    normalized = TRAILING_PATTERN.sub('', lowered)
+    if len(normalized) > 0:
+        return normalized
+    return lowered
+
+
+class ResponseCache(object):
+    '''
+    ResponseCache(object):
+
+    Parameters
+    ----------
+        param1 : max_size
+            The most entries we keep. When we're full the least
+            recently used entry is thrown away. 0 turns the cache off.
+
+        param2 : ttl
+            How many seconds an entry is good for.
+
+        param3 : logger
+            Where the hit and miss counters are reported. SentienceScreen
+            passes the kivy Logger so they end up in the kivy log file.
+
+        param4 : log_every
+            The counters are logged once every log_every lookups.
+
+    Attributes
+    ----------
+        self.hits, self.misses, self.evictions, self.expirations,
+        self.invalidations
+            Counters for everything that happens to the cache.
+
+    Members
+    -------
+        def get_response(self, chatbot, words)
+            Returns the chatbots response to words, from the cache if
+            we have it.
+
+        def attach(self, chatbot)
+            Registers self.invalidate() with the chatbots storage
+            adapter so entries are dropped when learning changes them.
+
+        def invalidate(self, texts)
+            Removes every entry whose response was picked from the
+            responses of one of the statements in texts.
+
+        def stats(self)
+            Returns the counters as a dictionary.
+
+    Notes
+    -----
+        Only responses that came from a BestMatch style adapter and
+        carry closest_match_text are cached. Answers from the time and
+        math adapters change from one call to the next, and a random
+        response isn't worth remembering.
+    '''
+
+    def __init__(self, max_size=256, ttl=600, logger=None, log_every=100):
+        self.max_size = int(max_size)
+        self.ttl = float(ttl)
+        self.logger = logger or logging.getLogger(__name__)
+        self.log_every = int(log_every)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.__entries = OrderedDict()
+        self.__keys_by_match = {}
+        self.__lock = threading.Lock()
+
+    def attach(self, chatbot):
+        listeners = getattr(chatbot.storage, 'update_listeners', None)
+        if listeners is not None:
+            listeners.append(self.invalidate)
+
+    def get(self, words):
+        '''
+        get(self, words)
+
+        Returns
+        -------
+            The cached (text, confidence) for words, or None if we
+            don't have a live entry for it.
+        '''
+        if self.max_size <= 0:
+            return None
+        key = normalize(words)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[3] <= time.monotonic():
+                self.__remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+            lookups = self.hits + self.misses
+        if self.log_every > 0 and lookups % self.log_every == 0:
+            self.log_stats()
+        if entry is None:
+            return None
+        return entry[0], entry[1]
+
+    def put(self, words, response):
+        match = getattr(response, 'closest_match_text', None)
+        if self.max_size <= 0 or match is None:
+            return None
+        key = normalize(words)
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+            self.__entries[key] = (response.text, response.confidence, match, time.monotonic() + self.ttl)
+            self.__keys_by_match.setdefault(match, set()).add(key)
+            while len(self.__entries) > self.max_size:
+                self.__remove(next(iter(self.__entries)))
+                self.evictions += 1
+
+    def invalidate(self, texts):
+        with self.__lock:
+            for match in texts:
+                for key in list(self.__keys_by_match.get(match, ())):
+                    self.__remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__keys_by_match.clear()
+
+    def stats(self):
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {'size': len(self.__entries),
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_rate': round(self.hits / float(lookups), 3) if lookups else 0.0,
+                    'evictions': self.evictions,
+                    'expirations': self.expirations,
+                    'invalidations': self.invalidations}
+
+    def log_stats(self):
+        stats = self.stats()
+        self.logger.info('ResponseCache: ' + ' '.join(key + '=' + str(stats[key]) for key in sorted(stats)))
+
+    def get_response(self, chatbot, words):
+        '''
+        get_response(self, chatbot, words)
+
+        Parameters
+        ----------
+            param1 : chatbot
+                Our ChatBot() object.
+
+            param2 : words
+                The users statement.
+
+        Returns
+        -------
+            The response Statement.
+
+        Notes
+        -----
+            On a hit we skip the search for the closest statement,
+            which is the slow part, but we still do the same learning
+            that ChatBot.get_response() does. Otherwise repeating a
+            greeting would stop teaching the chatbot anything.
+        '''
+        cached = self.get(words)
+        if cached is None:
+            response = chatbot.get_response(words)
+            self.put(words, response)
+            return response
+
+        response = Statement(cached[0])
+        response.confidence = cached[1]
+        if not chatbot.read_only:
+            if not chatbot.default_conversation_id:
+                chatbot.default_conversation_id = chatbot.storage.create_conversation()
+            conversation_id = chatbot.default_conversation_id
+            input_statement = chatbot.input.process_input_statement(words)
+            for preprocessor in chatbot.preprocessors:
+                input_statement = preprocessor(chatbot, input_statement)
+            previous_statement = chatbot.storage.get_latest_response(conversation_id)
+            chatbot.learn_response(input_statement, previous_statement)
+            chatbot.storage.add_to_conversation(conversation_id, input_statement, response)
+        return response
+
+    def __remove(self, key):
+        entry = self.__entries.pop(key)
+        keys = self.__keys_by_match.get(entry[2])
+        if keys is not None:
+            keys.discard(key)
+            if len(keys) <= 0:
+                del self.__keys_by_match[entry[2]]
@@ -0,0 +1,177 @@
+import logging
+import threading
+from collections import deque
+
+
+class ResponseWorker(object):
+    '''
+    ResponseWorker(object):
+
+    Parameters
+    ----------
+        param1 : max_depth
+            The most jobs that can be waiting at once. When the queue
+            is full the oldest waiting job is dropped to make room,
+            by the time we'd get to it the user has moved on anyway.
+
+        param2 : logger
+            Where dropped jobs and errors are reported.
+
+        param3 : name
+            The name of the worker thread.
+
+        param4 : on_idle
+            An optional function that's called on the worker thread
+            every time it finishes a job and nothing else is waiting.
+
+        param5 : on_drop
+            An optional function that's called with (function, args)
+            of every job that's dropped because the queue is full, so
+            the user can be told their message was never answered.
+
+        param6 : log_every
+            stats() is logged once every log_every jobs. 0 never logs
+            it.
+
+    Attributes
+    ----------
+        self.processed, self.dropped, self.coalesced
+            How many jobs were run, thrown away because the queue was
+            full, and skipped because the same job was already waiting.
+
+        self.peak
+            The most jobs that were ever waiting or running at once.
+
+    Members
+    -------
+        def submit(self, function, *args, coalesce=False)
+            Queues function(*args) to run on the worker thread. With
+            coalesce=True it's skipped if the same job is already
+            waiting, which is only right for jobs where a second copy
+            does nothing the first won't, never for a users message.
+
+        def depth(self)
+            Returns how many jobs are waiting or running.
+
+        def stats(self)
+            Returns the counters, the depth and the peak depth as a
+            dictionary.
+
+        def log_stats(self)
+            Logs stats() on one line.
+
+        def stop(self, timeout)
+            Lets the jobs that are waiting finish and ends the thread.
+
+    Notes
+    -----
+        There is exactly one worker thread, so jobs run one at a time
+        in the order they were submitted. Everything that touches the
+        ChatBot goes through here, because neither the ChatBot nor its
+        sqlite session are safe to use from two threads at once.
+    '''
+
+    def __init__(self, max_depth=8, logger=None, name='response_worker', on_idle=None, on_drop=None, log_every=100):
+        self.max_depth = max(1, int(max_depth))
+        self.logger = logger or logging.getLogger(__name__)
+        self.on_idle = on_idle
+        self.on_drop = on_drop
+        self.log_every = int(log_every)
+        self.peak = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.__jobs = deque()
+        self.__running = False
+        self.__stopping = False
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(name=name, target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def submit(self, function, *args, coalesce=False):
+        '''
+        submit(self, function, *args, coalesce=False)
+
+        Returns
+        -------
+            False if coalesce is set and the same job is already
+            waiting, or the worker has been stopped, otherwise True.
+
+        Notes
+        -----
+            on_drop is called after the lock is let go, on the thread
+            that submitted the job.
+        '''
+        job = (function, args)
+        dropped = []
+        with self.__condition:
+            if self.__stopping:
+                return False
+            if coalesce and job in self.__jobs:
+                self.coalesced += 1
+                return False
+            while len(self.__jobs) >= self.max_depth:
+                stale = self.__jobs.popleft()
+                self.dropped += 1
+                dropped.append(stale)
+                self.logger.warning('ResponseWorker: queue full, dropped ' + getattr(stale[0], '__name__', str(stale[0])) + str(stale[1]))
+            self.__jobs.append(job)
+            self.peak = max(self.peak, len(self.__jobs) + (1 if self.__running else 0))
+            self.__condition.notify()
+        if self.on_drop is not None:
+            for stale in dropped:
+                try:
+                    self.on_drop(*stale)
+                except Exception as error:
+                    self.logger.error('ResponseWorker: on_drop ' + type(error).__name__ + ': ' + str(error))
+        return True
+
+    def depth(self):
+        with self.__condition:
+            return len(self.__jobs) + (1 if self.__running else 0)
+
+    def stats(self):
+        with self.__condition:
+            return {'depth': len(self.__jobs) + (1 if self.__running else 0),
+                    'peak': self.peak,
+                    'processed': self.processed,
+                    'dropped': self.dropped,
+                    'coalesced': self.coalesced}
+
+    def log_stats(self):
+        stats = self.stats()
+        self.logger.info('ResponseWorker: ' + ' '.join(key + '=' + str(stats[key]) for key in sorted(stats)))
+
+    def stop(self, timeout=None):
+        with self.__condition:
+            self.__stopping = True
+            self.__condition.notify()
+        self.__thread.join(timeout)
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while len(self.__jobs) <= 0 and not self.__stopping:
+                    self.__condition.wait()
+                if len(self.__jobs) <= 0:
+                    return None
+                function, args = self.__jobs.popleft()
+                self.__running = True
+            try:
+                function(*args)
+            except Exception as error:
+                self.logger.error('ResponseWorker: ' + type(error).__name__ + ': ' + str(error))
+            finally:
+                with self.__condition:
+                    self.__running = False
+                    self.processed += 1
+                    processed = self.processed
+                    idle = len(self.__jobs) <= 0
+            if self.log_every > 0 and processed % self.log_every == 0:
+                self.log_stats()
+            if idle and self.on_idle is not None:
+                try:
+                    self.on_idle()
+                except Exception as error:
+                    self.logger.error('ResponseWorker: on_idle ' + type(error).__name__ + ': ' + str(error))
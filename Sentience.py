@@ -4,11 +4,17 @@ import subprocess
 import datetime
 import time
 import threading
+from SentienceCLI import COMMANDS, main
+# Command line tools and --headless run before kivy and the audio libraries
+# are imported.
+if __name__ == '__main__' and len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+    sys.exit(main(sys.argv[1:]))
+if __name__ == '__main__' and len(sys.argv) > 1 and sys.argv[1] == '--headless':
+    from SentienceHeadless import main as headless_main
+    sys.exit(headless_main(sys.argv[2:]))
 import speech_recognition as sr
 import pyttsx3
-from chatterbot import ChatBot
 import shutil
-import cProfile
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
@@ -27,6 +33,21 @@ import kivy.utils
 from kivy.config import ConfigParser
 from kivy.uix.settings import SettingsWithSidebar
 from SettingsMenu import my_settings
+from SentienceConfig import DEFAULTS, load_config
+from CapricaBot import build_chatbot
+from TimeMatch import warm_adapters
+from CorpusSchema import migrate
+from ResponseCache import ResponseCache
+from ResponseWorker import ResponseWorker
+from UIDispatcher import UIDispatcher
+from LogWriter import LogWriter
+from Transcript import Transcript
+from ConversationExport import ConversationExport
+from ConversationStore import ConversationStore
+from SentiencePaths import get_paths
+from SessionProfiler import SessionProfiler, profiling_mode
+from LatencyMetrics import LatencyMetrics
+from kivy.logger import Logger
 
 
 
@@ -200,10 +221,23 @@ class SentienceScreen(Screen):
             That the energy_threshold is what enables us to searate
             between ambient noise and the users intended voice commands.
 
-        self.master_log
-            This is a string variable that I use to store all of the
+        self.transcript
+            This is a Transcript() that I use to store all of the
             conversation that takes place between the user and the chat
-            bot.
+            bot. Each turn is kept as (speaker, timestamp, text) and the
+            oldest turns are spilled to Transcript.spill once there are
+            more than [transcript] window of them.
+
+        self.conversation_export
+            A ConversationExport() that remembers how much of
+            self.transcript has already been written to each users
+            conversation file, so write_logs only appends what's new.
+
+        self.conversation_store
+            A ConversationStore() that saves every turn of
+            self.transcript to Conversations.db as well, with the
+            session, the username, who said it and when. That's what
+            'python Sentience.py conversations' searches.
 
         self.voice_enabled
             If self.voice_enabled is set to True then the user is able
@@ -440,7 +474,7 @@ class SentienceScreen(Screen):
         def write_logs(self)
             This function is caleld when the user clicks the "Write Logs"
             button on the menu bar which is represented by a pencil
-            image. It creates and writes the contents of self.master_log
+            image. It creates and writes the contents of self.transcript
             to a text file which is either
             "Users input username + _Conversations"
             .txt or simply "Username_Conversations".txt.
@@ -509,21 +543,21 @@ class SentienceScreen(Screen):
             ensure that it ended when _time == 0 instead of counting
             down beyond that into negative numbers.
 
-        def get_caprica_response(self):
+        def get_caprica_response(self, words):
             This function is used to generate a response from the
             user. It combines all but the voice input/output
             responses. Basically, when you enter text into the
             user_input TextInput this function is called after
             the user hits the enter key. It then begins the
             process of the chatbot generating a response. It
-            also runs as an independent thread.
+            runs on the response worker thread.
 
         def get_caprica_voice_thread(self, words):
             This function is called when the users has activated the
             voice option, then recorded their voice. Once that
             recording process is completed this function is called.
             This function then generates the chatbots response. It
-            also runs as an independent thread.
+            runs on the response worker thread.
 
         def start_get_response_thread(self):
             We call this function after the user types some text
@@ -537,10 +571,17 @@ class SentienceScreen(Screen):
             We call this function after the voice option has been
             activated, and the user has hit the record button. Once
             the record button has been clicked, the user can begin
-            speaking into their microphone. Once done speaking
-            we create and run the self.get_caprica_voice_thread().
+            speaking into their microphone. It queues
+            self.get_user_voice_thread() on the response worker
+            so the window keeps drawing while we listen, decode,
+            answer and speak.
             # TODO: Fix notification text.
 
+        def get_user_voice_thread(self):
+            This function runs on the response worker. It records
+            the user, transcribes what they said and hands it to
+            self.get_caprica_voice_thread(words).
+
         def _is_thread_stopped(self):
             We call this function to check if there are
             any active threads running.
@@ -556,6 +597,12 @@ class SentienceScreen(Screen):
             This function is called to return the current
             text contained in the user_input TextInput widget.
 
+        def get_chatbot_response(self, words):
+            This function is called to get the chatbots response
+            to words as a string. It goes through
+            self.response_cache so repeated statements are
+            answered without searching the corpus again.
+
         def open_delete_file_dialog(self):
             This function is called when the users clicks on the
             delete file button which is located under the settings
@@ -584,7 +631,7 @@ class SentienceScreen(Screen):
         def display_user_conversation(self):
             This function is called when the user clicks on
             the display conversation button. It outputs the
-            contents of self.master_log into the view_port
+            contents of self.transcript into the view_port
             Widget.
 
         def increase_chatbot_voume(self, vol):
@@ -641,6 +688,11 @@ class SentienceScreen(Screen):
             SentienceScreen().__append_file(self, world, path) Note: The
             "World" param is a typo and needs to be changed to "word/words"
 
+        def __show_conversation(self, words):
+            Sets the text of the view_port TextInput widget on the
+            next frame. Worker threads use this instead of setting
+            self.ids.view_port.text themselves.
+
         def __set_thinking_text(self, bool):
             This function is called to change the text and the
             color of the text of the notification_widget TextInput
@@ -688,6 +740,15 @@ class SentienceScreen(Screen):
                 inctance of the pointer and call the bound function
                 when it's appropriate.
 
+            self.ui
+                self.ui is our UIDispatcher() from UIDispatcher.py.
+                Every change we make to the view_port, user_input
+                and notification_widget TextInput widgets goes
+                through self.ui.set(widget, property, value) instead
+                of setting the property directly. That makes it safe
+                to do from the response worker thread, and all the
+                changes made before the next frame are drawn at once.
+
             self.tooltip_open
                 self.tooltip_open is a member of the SentienceScreen()
                 class. We use this as a flag to determine whether or
@@ -742,13 +803,14 @@ class SentienceScreen(Screen):
                 dynamically set it once for linux operating
                 systems.
 
-            self.master_log
-                self.master_log is a member of the SentienceScreen()
-                class. It's a string variable that we use to store
+            self.transcript
+                self.transcript is a member of the SentienceScreen()
+                class. It's a Transcript() that we use to store
                 the users conversation with the chatbot. Every time
                 that the user and the chatbot say something. Their
-                responses are added to this string. We use this
-                string to write data to files.
+                responses are appended to it as a turn. It is only
+                turned back into text when we display it or write
+                it to a file.
 
             self.voice_enabled
                 self.voice_enabled is a member of the SentienceScreen()
@@ -901,11 +963,94 @@ class SentienceScreen(Screen):
                 self.mic object. Which then allows us to manipulate
                 the users microphone if they have one.
 
-            ChatBot()
+            load_config()
+                This comes from SentienceConfig.py. It reads
+                sentience.ini before the kivy App() has loaded it,
+                so that we can use the [corpus] section to set up
+                the chatbot. The result is kept in
+                self.sentience_config.
+
+            LatencyMetrics(path, interval, logger)
+                This comes from LatencyMetrics.py. listen,
+                recognize_sphinx, get_response, append_file and
+                caprica_speak are each timed with
+                self.metrics.span(stage). Every [metrics] interval
+                seconds the p50/p95/p99 of every stage is written to
+                Latency.json in the data folder, and typing
+                'show latency' in the settings panel shows them in
+                the view_port.
+
+            get_paths(config)
+                This comes from SentiencePaths.py. It works out the
+                folder we keep our files in once, from
+                $SENTIENCE_DATA_DIR, [paths] data_dir, or
+                $XDG_DATA_HOME, and builds the path of every log file
+                in it. The result is kept in self.paths and
+                self.paths.error_log etc. are used everywhere instead
+                of putting the path together from os.getlogin() every
+                time a line is logged.
+
+            LogWriter(flush_bytes, flush_interval, fsync, logger)
+                This comes from LogWriter.py. Everything
+                self.__append_file() writes goes through it. The
+                [logging] section of sentience.ini sets how much
+                text and how many seconds it collects before writing,
+                and when the files are fsynced.
+
+            migrate(database, time_budget, report)
+                This comes from CorpusSchema.py. Before the chatbot
+                opens the database we add any indexes it's missing,
+                Ie, on response.statement_text. The schema version is
+                kept in the database so this only does work once.
+                [corpus] migration_time_budget caps how long it can
+                hold up the window on a big corpus.
+
+            build_chatbot(config)
                 Here we setup the ChatBot. We do wo when we decalre
-                and instantiate our self.chatbot object. We create and
-                supply the required filters and adapters which dictate
-                how this chatbot will learn.
+                and instantiate our self.chatbot object. The
+                function lives in CapricaBot.py and supplies the
+                required filters and adapters which dictate how
+                this chatbot will learn. The [corpus] matcher
+                setting picks how the closest known statement is
+                found. By default it's the token index from
+                StatementIndex.py, so a response doesn't have to
+                compare the users input against every statement
+                we know.
+
+            warm_adapters(self.chatbot)
+                This comes from TimeMatch.py. The time adapter loads
+                nltk the first time it's needed, which is a second
+                and a half. We start that on a background thread
+                now so the first "what time is it" doesn't wait on
+                it.
+
+            ResponseCache(size, ttl, logger, log_every)
+                This comes from ResponseCache.py. We keep the
+                responses to the statements the user has already
+                said so that saying "hello" again doesn't search
+                the corpus all over. The [cache] section of
+                sentience.ini sets its size and how many seconds
+                an entry lives. Its hit and miss counters go to
+                the kivy log.
+
+            self.response_cache.attach(self.chatbot)
+                This lets the cache forget a response as soon as
+                the chatbot learns something new about the
+                statement it was picked for.
+
+            ResponseWorker(queue_size, logger)
+                This comes from ResponseWorker.py. It's the one
+                thread that talks to self.chatbot. Every message the
+                user sends is queued on it and answered in order.
+                [worker] queue_size in sentience.ini caps how many
+                messages can wait, past that the oldest waiting one
+                is dropped and self.__message_dropped() tells the
+                user which one. Its depth, peak depth and counters
+                are logged every [worker] log_every jobs, and
+                self.metrics.gauge() adds them to Latency.json and
+                the 'show latency' readout. When the last message has been
+                answered it calls self.__currently_thinking(False),
+                which is what turns '...Thinking...' back off.
 
             self.set_gender()
                 This is a member of the SentienceScreen() class. We
@@ -967,6 +1112,7 @@ class SentienceScreen(Screen):
 
         super(SentienceScreen, self).__init__(**kwargs)
 
+        self.ui = UIDispatcher()
         Window.bind(mouse_pos=self.on_mouse_pos)
         self.__is_thinking = False
         self.tooltip_open = False
@@ -978,19 +1124,27 @@ class SentienceScreen(Screen):
             self.engine = pyttsx3.init()
         self.record = sr.Recognizer()
         self.mic = sr.Microphone()
-        self.chatbot = ChatBot('Caprica',
-                               storage_adapter='chatterbot.storage.SQLStorageAdapter',
-                               logic_adapters=['chatterbot.logic.BestMatch', 'chatterbot.logic.TimeLogicAdapter', 'chatterbot.logic.MathematicalEvaluation'],
-                               input_adapter='chatterbot.input.VariableInputTypeAdapter',
-                               output_adapter='chatterbot.output.OutputAdapter',
-                               filters=["chatterbot.filters.RepetitiveResponseFilter"],
-                               database='RC_2001-06.db',
-                               trainer='chatterbot.trainers.ChatterBotCorpusTrainer')
+        self.sentience_config = load_config()
+        self.paths = get_paths(self.sentience_config)
+        self.metrics = LatencyMetrics(self.sentience_config.get('metrics', 'file') or self.paths.latency, self.sentience_config.getfloat('metrics', 'interval'), Logger)
+        self.metrics.start()
+        self.log_writer = LogWriter(self.sentience_config.getint('logging', 'flush_bytes'), self.sentience_config.getfloat('logging', 'flush_interval'), self.sentience_config.get('logging', 'fsync'), Logger)
+        self.create_dir(self.paths.data_dir)
+        migrate(self.sentience_config.get('corpus', 'database'), self.sentience_config.getfloat('corpus', 'migration_time_budget'), lambda line: Logger.info('Sentience: ' + line))
+        self.chatbot = build_chatbot(self.sentience_config)
+        warm_adapters(self.chatbot)
+        self.response_cache = ResponseCache(self.sentience_config.getint('cache', 'size'), self.sentience_config.getfloat('cache', 'ttl'), Logger, self.sentience_config.getint('cache', 'log_every'))
+        self.response_cache.attach(self.chatbot)
+        self.response_worker = ResponseWorker(self.sentience_config.getint('worker', 'queue_size'), Logger, on_idle=lambda: self.__currently_thinking(False), on_drop=self.__message_dropped, log_every=self.sentience_config.getint('worker', 'log_every'))
+        self.metrics.gauge('response_worker', self.response_worker.stats)
         self.set_gender()
         self.set_speech_rate()
         self.audio_threshold = 400
         self.record.dynamic_energy_threshold = False
-        self.master_log = str()
+        self.transcript = Transcript(self.paths.transcript_spill, self.sentience_config.getint('transcript', 'window'), self.sentience_config.getint('transcript', 'chunk_size'))
+        self.conversation_export = ConversationExport(self.sentience_config.getboolean('export', 'compress'))
+        self.conversation_store = ConversationStore(self.sentience_config.get('conversations', 'database') or self.paths.conversations, logger=Logger)
+        self.conversation_store.attach(self.transcript, lambda: self.username)
         self.voice_enabled = False
         self.voice_disabled = True
         self.user_input = str()
@@ -1000,12 +1154,6 @@ class SentienceScreen(Screen):
         self.username = str()
         if len(self.username) <= 0:
             self.username = 'User'
-        if sys.platform.startswith('linux'):
-            self.create_dir('/home/' + str(os.getlogin()) + '/.SentienceFiles/')
-        elif sys.platform.startswith('win'):
-            self.create_dir('C://SentienceFiles//')
-        elif sys.platform == 'darwin':
-            self.create_dir('/home/' + str(os.getlogin()) + '/.SentienceFiles/')
         self.engine.connect('started-utterance', self.caprica_speak)
         self.engine.connect('finished-utterance', self.onEnd)
         self.current_conversation = str()
@@ -1016,9 +1164,11 @@ class SentienceScreen(Screen):
     def display_user_conversation(self):
         '''
             When called this function displays the contents of
-            self.master_log inside the view_port TextInput Widget.
+            self.transcript inside the view_port TextInput Widget.
+            Only the turns still held in memory are shown, the older
+            ones are in the spill file and the conversation log.
         '''
-        self.ids.view_port.text = self.master_log
+        self.ui.set(self.ids.view_port, 'text', self.transcript.render(self.transcript.window_start()))
 
 
 
@@ -1036,7 +1186,7 @@ class SentienceScreen(Screen):
             volume = self.engine.getProperty('volume')
             self.engine.setProperty('volume', volume + vol)
         elif int(vol) < 0 or int(vol) > 1:
-            self.ids.view_port.text = 'Value must be between 0-1.'
+            self.ui.set(self.ids.view_port, 'text', 'Value must be between 0-1.')
 
 
 
@@ -1049,7 +1199,7 @@ class SentienceScreen(Screen):
             volume = self.engine.getProperty('volume')
             self.engine.setProperty('volume', volume - vol)
         elif int(vol) < 0 or int(vol) > 1:
-            self.ids.view_port.text = 'Value must be between 0-1.'
+            self.ui.set(self.ids.view_port, 'text', 'Value must be between 0-1.')
 
 
 
@@ -1089,7 +1239,7 @@ class SentienceScreen(Screen):
                 TextInput Widget that returns its current string to
                 self.user_input. Or self.get_caprica_voice_response()
 
-            self.master_log
+            self.transcript
                 Stores the contents of self.ids.user_input TextInput
                 string along with some other data.
 
@@ -1170,40 +1320,31 @@ class SentienceScreen(Screen):
             if sys.platform.startswith('linux'):
                 if self.audio_disabled:
                     self.user_input = self.ids.user_input.text
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.user_input, '/home/' + str(os.getlogin()) + '/.SentienceFiles/User_Statements.txt')
-                    self.master_log += '\n' + self.username + ': ' + self.user_input
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.user_input, self.paths.user_statements)
+                    self.transcript.append(self.username, self.user_input)
                     return self.get_caprica_text_response()
                 elif self.audio_enabled:
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.ids.user_input.text, '/home/' + str(os.getlogin()) + '/.SentienceFiles/User_Statements.txt')
-                    self.master_log += '\n' + self.username + ': ' + self.ids.user_input.text
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.ids.user_input.text, self.paths.user_statements)
+                    self.transcript.append(self.username, self.ids.user_input.text)
                     self.get_caprica_voice_response(self.ids.user_input.text)
             elif sys.platform.startswith('win'):
                 if self.audio_disabled:
                     self.user_input = self.ids.user_input.text
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.user_input, 'C://SentienceFiles//User_Statements.txt')
-                    self.master_log += '\n' + self.username + ': ' + self.ids.user_input.text
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.user_input, self.paths.user_statements)
+                    self.transcript.append(self.username, self.ids.user_input.text)
                     return self.get_caprica_text_response()
                 elif self.audio_enabled:
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.ids.user_input.text, 'C://SentienceFiles//User_Statements.txt')
-                    self.master_log += '\n' + self.username + ': ' + self.ids.user_input.text
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.ids.user_input.text, self.paths.user_statements)
+                    self.transcript.append(self.username, self.ids.user_input.text)
                     self.get_caprica_voice_response(self.ids.user_input.text)
         except OSError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_text_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_text_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_text_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_text_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_text_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_text_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileNotFoundError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_text_response ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_text_response ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_text_response ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -1254,7 +1395,7 @@ class SentienceScreen(Screen):
                 temp is used to store the response from the chat bot
                 temporarily.
 
-            self.master_log
+            self.transcript
                 The string 'Caprica: ' and the value contained in temp are
                 added to the end of the string with a new line
                 character.
@@ -1357,42 +1498,30 @@ class SentienceScreen(Screen):
             if sys.platform.startswith('linux'):
                 if len(self.username) <= 0:
                     self.username = 'User'
-                temp = str(self.chatbot.get_response(self.user_input))
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, '/home/' + str(os.getlogin()) + '/.SentienceFiles/Caprica_Statements.txt')
-                self.master_log += '\nCaprica: ' + temp
-                self.ids.view_port.text = self.username + ': ' + self.user_input + '\nCaprica: ' + temp
-                self.ids.user_input.text = ''
+                temp = self.get_chatbot_response(self.user_input)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, self.paths.caprica_statements)
+                self.transcript.append('Caprica', temp)
+                self.ui.set(self.ids.view_port, 'text', self.username + ': ' + self.user_input + '\nCaprica: ' + temp)
+                self.ui.set(self.ids.user_input, 'text', '')
             elif sys.platform == 'win32':
                 if len(self.username) <= 0:
                     self.username = 'User'
-                temp = str(self.chatbot.get_response(self.user_input))
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, 'C://SentienceFiles//Caprica_Statements.txt')
-                self.ids.view_port.text = self.username + ': ' + self.user_input + '\nCaprica: ' + temp
-                self.master_log += '\nCaprica: ' + temp
-                self.ids.user_input.text = ''
+                temp = self.get_chatbot_response(self.user_input)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, self.paths.caprica_statements)
+                self.ui.set(self.ids.view_port, 'text', self.username + ': ' + self.user_input + '\nCaprica: ' + temp)
+                self.transcript.append('Caprica', temp)
+                self.ui.set(self.ids.user_input, 'text', '')
         except OSError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_caprica_text_response ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -1448,10 +1577,10 @@ class SentienceScreen(Screen):
 				will then transcribe the audio file and store the
 				returned string in the temp variable.
 
-	        self.master_log
-                A new line character, the users username and the string
-				stored in the temp variable are then appended to the
-				self.master_log string.
+	        self.transcript
+                The users username and the string
+				stored in the temp variable are then appended to
+				self.transcript as a turn.
 
         Members
         -------
@@ -1570,7 +1699,7 @@ class SentienceScreen(Screen):
 			new line character to the User_Statements.txt file.
 
             Next we append a new line character, the users Username,
-			and the contents of temp to the self.master_log string.
+			and the contents of temp to the self.transcript.
 
             Finally, we pass the temp variable to
             self.get_caprica_voice_response(str(temp)) which then
@@ -1580,61 +1709,47 @@ class SentienceScreen(Screen):
         try:
             if sys.platform.startswith('linux'):
                 if self.voice_disabled:
-                    self.ids.view_port.text = 'Please activate the voice option by clicking on the red microphone button'
+                    self.ui.set(self.ids.view_port, 'text', 'Please activate the voice option by clicking on the red microphone button')
                     return None
                 with self.mic as source:
-                    audio = self.record.listen(source)
-                temp = self.record.recognize_sphinx(audio)
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, '/home/' + str(os.getlogin()) + '/.SentienceFiles/User_Statements.txt')
-                self.master_log += '\n' + self.username + ': ' + temp
+                    with self.metrics.span('listen'):
+                        audio = self.record.listen(source)
+                with self.metrics.span('recognize_sphinx'):
+                    temp = self.record.recognize_sphinx(audio)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, self.paths.user_statements)
+                self.transcript.append(self.username, temp)
 
                 self.get_caprica_voice_response(str(temp))
             elif sys.platform.startswith('win'):
                 if self.voice_disabled:
-                    self.ids.view_port.text = 'Please activate the voice option by clicking on the red microphone button'
+                    self.ui.set(self.ids.view_port, 'text', 'Please activate the voice option by clicking on the red microphone button')
                     return None
                 with self.mic as source:
-                    audio = self.record.listen(source)
-                temp = self.record.recognize_sphinx(audio)
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, 'C://SentienceFiles//User_Statements.txt')
-                self.master_log += '\n' + self.username + ': ' + temp
+                    with self.metrics.span('listen'):
+                        audio = self.record.listen(source)
+                with self.metrics.span('recognize_sphinx'):
+                    temp = self.record.recognize_sphinx(audio)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, self.paths.user_statements)
+                self.transcript.append(self.username, temp)
                 self.get_caprica_voice_response(str(temp))
         except self.mic.UknownValueError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nspeech_recognition.Recognizer.UnknownValueError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nspeech_recognition.Recognizer.UnknownValueError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nspeech_recognition.Recognizer.UnknownValueError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             self.caprica_speak("UnknowValueError: " + str(a) + " I'm sorry, I didn't understand. Can you please repeat what you just said?")
             self.get_user_voice_response()
         except self.record.RequestError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nspeech_recognition.Recognizer.RequestError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nspeech_recognition.Recognizer.RequestError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nspeech_recognition.Recognizer.RequestError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return self.record.recognize_sphinx(audio)
         except OSError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as e:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as f:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -1662,10 +1777,10 @@ class SentienceScreen(Screen):
 		            to the temp variable where it's stored as a string
 		            for later manipulation.
 
-	            self.master_log
+	            self.transcript
                     A new line character plus the string 'Caprica: ' and
 					the chat bots response are appended to the end of
-					the self.master_log string variable.
+					the self.transcript.
 
             Members
             -------
@@ -1759,7 +1874,7 @@ class SentienceScreen(Screen):
 
                 We next append the string 'Caprica: ' along with a new
 				line character and the contents of the temp variable to
-				the end of the self.master_log string variable.
+				the end of the self.transcript.
 
                 Finally we call self.caprica_speak(temp) and pass the
 				temp variable to it. So that the text to speech software
@@ -1768,41 +1883,41 @@ class SentienceScreen(Screen):
         '''
         try:
             if sys.platform.startswith('linux'):
-                temp = str(self.chatbot.get_response(words))
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, '/home/' + str(os.getlogin()) + '/.SentienceFiles/Caprica_Statements.txt')
-                self.master_log += '\nCaprica: ' + temp
-                self.ids.view_port.text = self.username + ': ' + words + '\nCaprica: ' + temp #
+                temp = self.get_chatbot_response(words)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, self.paths.caprica_statements)
+                self.transcript.append('Caprica', temp)
+                self.ui.set(self.ids.view_port, 'text', self.username + ': ' + words + '\nCaprica: ' + temp) #
                 self.caprica_speak(temp)
 
             elif sys.platform.startswith('win'):
-                temp = str(self.chatbot.get_response(words))
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp,'C://SentienceFiles//Caprica_Statements.txt')
-                self.master_log += '\nCaprica: ' + temp
-                self.ids.view_port.text = self.username + ': ' + words + '\nCaprica: ' + temp #
+                temp = self.get_chatbot_response(words)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp,self.paths.caprica_statements)
+                self.transcript.append('Caprica', temp)
+                self.ui.set(self.ids.view_port, 'text', self.username + ': ' + words + '\nCaprica: ' + temp) #
                 self.caprica_speak(temp)
         except OSError as a:
             if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_vaprica_voice_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
+                self.__append_file('\n' + 'Function: get_vaprica_voice_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+                self.__append_file('\n' + 'Function: get_caprica_voice_response ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
                 return None
         except IOError as b:
             if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_vaprica_voice_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
+                self.__append_file('\n' + 'Function: get_vaprica_voice_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+                self.__append_file('\n' + 'Function: get_caprica_voice_response ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
                 return None
         except RuntimeError as c:
             if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_vaprica_voice_response ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
+                self.__append_file('\n' + 'Function: get_vaprica_voice_response ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_response ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+                self.__append_file('\n' + 'Function: get_caprica_voice_response ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
                 return None
         except ValueError as d:
             if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_vaprica_voice_response ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
+                self.__append_file('\n' + 'Function: get_vaprica_voice_response ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_response ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+                self.__append_file('\n' + 'Function: get_caprica_voice_response ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
                 return None
 
 
@@ -1921,28 +2036,16 @@ class SentienceScreen(Screen):
                 voices = self.engine.getProperty('voices')
                 self.engine.setProperty('voice', voices[0].id)
         except OSError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_gender ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_gender ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_gender ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_gender ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_gender ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_gender ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_gender ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_gender ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_gender ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_gender ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_gender ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_gender ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -2051,28 +2154,19 @@ class SentienceScreen(Screen):
                 rate = self.engine.getProperty('rate')
                 self.engine.setProperty('rate', rate-40)
         except OSError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_speech_rate ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_speech_rate ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as c:
             if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
+                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nRunetimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nRunetimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_speech_rate ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_speech_rate ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -2187,41 +2281,30 @@ class SentienceScreen(Screen):
             ensuring that the string(s) sent to self.caprica_speak()
             are all read.
 
-            Finally, we clear the user_input TextInput Widget
-            resetting its hint_text property as well.
+            We don't clear the user_input TextInput Widget here any
+            more. It's cleared when a message is queued, and by the
+            time we're speaking the user may already be typing the
+            next one.
         '''
         try:
-            if sys.platform.startswith('linux'):
-                self.engine.say(str(words))
-                self.engine.startLoop()
-                self.ids.user_input.text = ''
-            if sys.platform.startswith('win'):
-                self.engine.say(str(words))
-                self.engine.startLoop()
-                self.ids.user_input.text = ''
+            with self.metrics.span('caprica_speak'):
+                if sys.platform.startswith('linux'):
+                    self.engine.say(str(words))
+                    self.engine.startLoop()
+                if sys.platform.startswith('win'):
+                    self.engine.say(str(words))
+                    self.engine.startLoop()
         except OSError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: caprica_speak ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: caprica_speak ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: caprica_speak ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: caprica_speak ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: caprica_speak ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: caprica_speak ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: caprica_speak ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: caprica_speak ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: caprica_speak ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: caprica_speak ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: caprica_speak ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: caprica_speak ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -2311,33 +2394,18 @@ class SentienceScreen(Screen):
                 self.engine.startLoop() function.
         '''
         try:
-            if sys.platform.startswith('linux'):
-                self.engine.endLoop()
-            elif sys.platform.startswith('win'):
-                self.engine.endLoop()
+            self.engine.endLoop()
         except OSError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: onEnd ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: onEnd ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: onEnd ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: onEnd ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: onEnd ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: onEnd ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: onEnd ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: onEnd ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: onEnd ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: onEnd ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: onEnd ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: onEnd ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -2416,7 +2484,22 @@ class SentienceScreen(Screen):
             Which also has the effect of resetting the hint_text
             property.
         '''
-        self.ids.view_port.text = ''
+        self.ui.set(self.ids.view_port, 'text', '')
+
+
+
+    def show_latency(self):
+        '''
+        show_latency(self)
+
+        Notes
+        -----
+            Shows how long every stage of a turn has taken so far,
+            from self.metrics.readout(), in the view_port. It's
+            called when 'show latency' is typed into the settings
+            panel.
+        '''
+        self.ui.set(self.ids.view_port, 'text', self.metrics.readout())
 
 
 
@@ -2519,39 +2602,21 @@ class SentienceScreen(Screen):
             personal greeting to the user.
         '''
         try:
-            if sys.platform.startswith('linux'):
-                if len(self.username) > 0:
-                    self.caprica_speak('Hello ' + self.username)
-                elif len(self.username) <= 0:
-                    self.username = 'User'
-            elif sys.platform.startswith('win'):
-                if len(self.username) > 0:
-                    self.caprica_speak('Hello ' + self.username)
-                elif len(self.username) <= 0:
-                    self.username = 'User'
+            if len(self.username) > 0:
+                self.caprica_speak('Hello ' + self.username)
+            elif len(self.username) <= 0:
+                self.username = 'User'
         except OSError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: create_user_profile ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: create_user_profile ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: create_user_profile ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: create_user_profile ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: create_user_profile ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: create_user_profile ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: create_user_profile ' + '\nRunetimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: create_user_profile ' + '\nRunetimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: create_user_profile ' + '\nRunetimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: create_user_profile ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: create_user_profile ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: create_user_profile ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -2690,55 +2755,29 @@ class SentienceScreen(Screen):
             feature.
         '''
         try:
-            if sys.platform.startswith('linux'):
-                if self.audio_disabled:
-                    self.audio_enabled = True
-                    self.audio_disabled = False
-                    self.ids.user_input.opacity = 1
-                    self.ids.view_port.opacity = 1
-                    self.caprica_speak('Capricas audio mode is now enabled. Type into the text box begin your conversation.')
-                elif self.audio_enabled:
-                    self.audio_enabled = False
-                    self.audio_disabled = True
-                    self.ids.user_input.opacity = 1
-                    self.ids.view_port.opacity = 1
-                    self.caprica_speak('Capricas audio mode is now disabled. Type into the text box begin your conversation.')
-            elif sys.platform.startswith('win'):
-                if self.audio_disabled:
-                    self.audio_enabled = True
-                    self.audio_disabled = False
-                    self.ids.user_input.opacity = 1
-                    self.ids.view_port.opacity = 1
-                    self.caprica_speak('Capricas audio mode is now enabled. Type into the text box begin your conversation.')
-                elif self.audio_enabled:
-                    self.audio_enabled = False
-                    self.audio_disabled = True
-                    self.ids.user_input.opacity = 1
-                    self.ids.view_port.opacity = 1
-                    self.caprica_speak('Capricas audio mode is now disabled. Type into the text box begin your conversation.')
+            if self.audio_disabled:
+                self.audio_enabled = True
+                self.audio_disabled = False
+                self.ui.set(self.ids.user_input, 'opacity', 1)
+                self.ui.set(self.ids.view_port, 'opacity', 1)
+                self.caprica_speak('Capricas audio mode is now enabled. Type into the text box begin your conversation.')
+            elif self.audio_enabled:
+                self.audio_enabled = False
+                self.audio_disabled = True
+                self.ui.set(self.ids.user_input, 'opacity', 1)
+                self.ui.set(self.ids.view_port, 'opacity', 1)
+                self.caprica_speak('Capricas audio mode is now disabled. Type into the text box begin your conversation.')
         except OSError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_audio ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -2971,7 +3010,7 @@ class SentienceScreen(Screen):
                 if self.voice_disabled:
                     self.voice_enabled = True
                     self.voice_disabled = False
-                    self.ids.user_input.opacity = 0
+                    self.ui.set(self.ids.user_input, 'opacity', 0)
                     self.caprica_speak("Hello friend. Please observe a moment of silence so that I may adjust your microphone to ignore any potential interference in our communication. I will instruct you when I'm done.")
                     with self.mic as source:
                         self.record.adjust_for_ambient_noise(source)
@@ -2981,63 +3020,45 @@ class SentienceScreen(Screen):
                 elif self.voice_enabled:
                     self.voice_enabled = False
                     self.voice_disabled = True
-                    self.ids.user_input.opacity = 1
-                    self.ids.view_port.opacity = 1
+                    self.ui.set(self.ids.user_input, 'opacity', 1)
+                    self.ui.set(self.ids.view_port, 'opacity', 1)
                     self.caprica_speak('User voice has been disabled. Type your response into the text box to begin your conversation.')
             if sys.platform.startswith('win'):
                 if self.voice_disabled:
                     self.voice_enabled = True
                     self.voice_disabled = False
-                    self.ids.user_input.opacity = 0
+                    self.ui.set(self.ids.user_input, 'opacity', 0)
                     self.record.energy_threshold = 1000
                     self.caprica_speak('User voice mode is now enabled. Click the button labeled record and then Speak into your microphone to begin your conversation.')
                 elif self.voice_enabled:
                     self.voice_enabled = False
                     self.voice_disabled = True
-                    self.ids.user_input.opacity = 1
-                    self.ids.view_port.opacity = 1
+                    self.ui.set(self.ids.user_input, 'opacity', 1)
+                    self.ui.set(self.ids.view_port, 'opacity', 1)
                     self.caprica_speak('User voice has been disabled. Type your response into the text box to begin your conversation.')
         except sr.UnknownValueError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nspeech_recognition.Recognizer.UnknownValueError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nspeech_recognition.Recognizer.UnknownValueError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nspeech_recognition.Recognizer.UnknownValueError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except sr.RequestError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nspeech_recognition.Recognizer.RequestError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nspeech_recognition.Recognizer.RequestError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nspeech_recognition.Recognizer.RequestError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except OSError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as e:
             if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
+                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nRunetimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nRunetimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as f:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ImportError as g:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nImportError: ' + str(g) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nImportError: ' + str(g) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: set_enable_disable_voice ' + '\nImportError: ' + str(g) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -3257,7 +3278,7 @@ class SentienceScreen(Screen):
                 # lpr = subprocess.Popen('/usr/bin/lpr', stdin = subprocess.PIPE)
                 # lpr.stdin.write(str.encode(temp))
                 os.startfile('lp "temp"')
-                self.ids.view_port.text = 'Printing will begin when program closes due to the GIL \nBlocking true multithreading.'
+                self.ui.set(self.ids.view_port, 'text', 'Printing will begin when program closes due to the GIL \nBlocking true multithreading.')
             elif sys.platform.startswith('win'):
                 # temp = str(path) + str(filename)
                 # import win32api
@@ -3265,40 +3286,22 @@ class SentienceScreen(Screen):
                 # win32api.ShellExecute(0, "printto", temp, '"%s"' % win32print.GetDefaultPrinter(), ".", 0)
                 os.startfile(str.encode(temp), 'print')
         except OSError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: print_files ' + '\nOSError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: print_files ' + '\nIOError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: print_files ' + '\nRuntimeError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: print_files ' + '\nValueError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileNotFoundError as e:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nFileNotFoundError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nFileNotFoundError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: print_files ' + '\nFileNotFoundError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except NameError as f:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nNameError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: print_files ' + '\nNameError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: print_files ' + '\nNameError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -3337,7 +3340,7 @@ class SentienceScreen(Screen):
 
             Members
             -------
-                os.mkdir()
+                os.makedirs()
                     This function is called to access the systems native
                     directory creation process. On linux the command is
                     simply mkdir. Whereas on windows you're accessing
@@ -3412,41 +3415,22 @@ class SentienceScreen(Screen):
             which then creates those text files.
         '''
         try:
-            if sys.platform.startswith('linux'):
-                if os.path.isdir(path):
-                    pass
-                elif not os.path.isdir(path):
-                    os.mkdir(path)
-                    self.__create_files(path)
-            elif sys.platform.startswith('win'):
-                if os.path.isdir(path):
-                    pass
-                elif not os.path.isdir(path):
-                    os.mkdir(path)
-                    self.__create_files(path)
+            if os.path.isdir(path):
+                pass
+            elif not os.path.isdir(path):
+                os.makedirs(path)
+                self.__create_files(path)
         except IOError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: create_dir ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: create_dir ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: create_dir ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except OSError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: create_dir ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: create_dir ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: create_dir ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileNotFoundError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: create_dir ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: create_dir ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: create_dir ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileExistsError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: create_dir ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: create_dir ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: create_dir ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -3568,61 +3552,32 @@ class SentienceScreen(Screen):
                               responses as they relate to each other.
         '''
         try:
-            if sys.platform.startswith('linux'):
-                if os.path.isfile(path + 'User_Statements.txt'):
+            if os.path.isfile(path + 'User_Statements.txt'):
+                pass
+            elif not os.path.isfile(path + 'User_Statements.txt'):
+                with open(path + 'User_Statements.txt', 'w') as out:
                     pass
-                elif not os.path.isfile(path + 'User_Statements.txt'):
-                    with open(path + 'User_Statements.txt', 'w') as out:
-                        pass
-                if os.path.isfile(path + 'Caprica_Statements.txt'):
+            if os.path.isfile(path + 'Caprica_Statements.txt'):
+                pass
+            elif not os.path.isfile(path + 'Caprica_Statements.txt'):
+                with open(path + 'Caprica_Statements.txt', 'w') as out:
                     pass
-                elif not os.path.isfile(path + 'Caprica_Statements.txt'):
-                    with open(path + 'Caprica_Statements.txt', 'w') as out:
-                        pass
-                if os.path.isfile(path + 'Error Logs.txt'):
+            if os.path.isfile(path + 'Error Logs.txt'):
+                pass
+            elif not os.path.isfile(path + 'Error Logs.txt'):
+                with open(path + 'Error Logs.txt', 'w') as out:
                     pass
-                elif not os.path.isfile(path + 'Error Logs.txt'):
-                    with open(path + 'Error Logs.txt', 'w') as out:
-                        pass
-            elif sys.platform.startswith('win'):
-                if os.path.isfile(path + 'User_Statements.txt'):
-                    pass
-                elif not os.path.isfile(path + 'User_Statements.txt'):
-                    with open(path + 'User_Statements.txt', 'w') as out:
-                        pass
-                if os.path.isfile(path + 'Caprica_Statements.txt'):
-                    pass
-                elif not os.path.isfile(path + 'Caprica_Statements.txt'):
-                    with open(path + 'Caprica_Statements.txt', 'w') as out:
-                        pass
-                if os.path.isfile(path + 'Error Logs.txt'):
-                    pass
-                elif not os.path.isfile(path + 'Error Logs.txt'):
-                    with open(path + 'Error Logs.txt', 'w') as out:
-                        pass
         except IOError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: __create_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: __create_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: __create_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except OSError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: __create_files ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: __create_files ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: __create_files ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileNotFoundError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: __create_files ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: __create_files ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: __create_files ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileExistsError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: __create_files ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: __create_files ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: __create_files ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -3654,84 +3609,19 @@ class SentienceScreen(Screen):
                 self.__create_files(self, path).
 
 
-        Attributes
-        ----------
-            path
-                The path variable here is a reference
-                to the absolute file path of a specific
-                file. This function is called every time a
-                response is entered by the user and generated
-                by the chat bot. The response are then appended
-                to User_Statements, Caprica_Statements respectively.
-
         Members
         -------
-            os.path.isfile('path to file')
-                We call this function to ensure that
-                the files we're attempting to manipulate
-                already exist. If os.path.isfile() == True
-                then the file exists and the data stored in
-                the words variable is appended to the end of
-                the file. If os.path.isfile() == False then
-                the file does not exist and we re-call the
-                function self.__create_files(self, path).
-
-        Private Members
-        ---------------
-           self.__create_files(self, path)
-               This function is called only if one
-               of the files required files has been deleted.
-               This function will then write the file to
-               the disk.
-
+            self.log_writer.write(path, words)
+                Queues words to be appended to the file at path.
+                The LogWriter() thread writes them out once enough
+                text has built up or flush_interval seconds have
+                gone by, whichever comes first. It creates the file
+                if it has been deleted.
 
         Returns
         -------
             return None
 
-        Exceptions
-        ----------
-            OSError
-                The OSError can occur due to numerous reasons.
-                What I'm primarily concerned with here however
-                is import statements, incompatible Operating
-                systems, and bad system calls. The exception
-                if it occurs is handled and logged in an error
-                log text file.
-
-            IOError
-                The IOError can occur due to many reasons.
-                My primary concern is file manipulation. The
-                improper opening/closing/writing to files. If
-                the exception occurs it's handled and logged; in
-                an error log text file.
-
-            RunTimeError
-                The RunTimeError error here is checking to make sure
-                that the chat bot doesn't die. Essentially I just need
-                to make sure that it completes and executes the python
-                text to speech functions in a manner that doesn't cause
-                a fatal exception. If something does occur the exception
-                will be handled and logged to an error log text file.
-
-            ValueError
-                Ensures that values passed to the chat bot are
-                appropriate. And if for some reason one isn't the
-                exception will be handled and logged to an error log
-                text file.
-
-            FileNotFoundError
-                This can occur in a variety of ways however my primary
-                concern is that file path the user selected is broken.
-                Resulting in an File Not Found error. If this occurs
-                it's handled and logged to an error file text log.
-
-            NameError
-                Again this can occur in a variety of ways but the
-                primary concern is that the conversion to bytes does
-                not take place or breaks some how due to wacky Unicode
-                characters. In which case the exception is handled and
-                logged to an error log text file.
         Notes
         -----
             This function is called every time the user or
@@ -3741,44 +3631,14 @@ class SentienceScreen(Screen):
             1: User response: User_Statements.txt
 
             2: Chat bot response: Caprica_Statements
+
+            It used to check the file existed, then open, append and
+            close it, twice a turn, on the response thread. Now it
+            only adds the text to a list and returns, so it can't
+            fail and it doesn't cost a turn anything.
         '''
-        try:
-            if sys.platform.startswith('linux'):
-                if os.path.isfile(path):
-                    with open(path, 'a') as ap:
-                        ap.write(words)
-                elif not os.path.isfile(path):
-                    self.__create_files(path)
-            elif sys.platform.startswith('win'):
-                if os.path.isfile(path):
-                    with open(path, 'a') as ap:
-                        ap.write(words)
-                elif not os.path.isfile(path):
-                    self.__create_files(path)
-        except IOError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: __append_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: __append_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
-            return None
-        except OSError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: __append_files ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: __append_files ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
-            return None
-        except FileNotFoundError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: __append_files ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: __append_files ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
-            return None
-        except FileExistsError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: __append_files ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: __append_files ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
-            return None
+        with self.metrics.span('append_file'):
+            self.log_writer.write(path, words)
 
 
 
@@ -3788,7 +3648,7 @@ class SentienceScreen(Screen):
             This function is called when the user clicks the
             'Write Logs' button that's located on the menu bar.
             It's represented by the pencil. The purpose of this
-            function is to write the contents of self.master_log
+            function is to write the contents of self.transcript
             and self.__user_profile to a text file named after
             the current user.
 
@@ -3800,8 +3660,8 @@ class SentienceScreen(Screen):
 
         Attributes
         ----------
-            self.master_log
-                We write the contents of self.master_log to a text
+            self.transcript
+                We write the contents of self.transcript to a text
                 file named after the current user. We also write
                 the contents of self.__user_profile to the text file.
 
@@ -3898,7 +3758,7 @@ class SentienceScreen(Screen):
             This function is called when the user clicks the
             'Write Logs' button that's located on the menu bar.
             It's represented by the pencil. The purpose of this
-            function is to write the contents of self.master_log
+            function is to write the contents of self.transcript
             and self.__user_profile to a text file named after
             the current user.
 
@@ -3920,51 +3780,36 @@ class SentienceScreen(Screen):
 
             After that we create a new file naemd after the current
             user self.username + '_Conversation.txt'. We then write
-            the contents of self.__user_profile and self.master_log
+            the contents of self.__user_profile and self.transcript
             to that file.
+
+            Only the first write of a conversation writes the profile
+            and everything said so far. After that
+            self.conversation_export only appends the turns that were
+            said since the last time, so writing the logs doesn't get
+            slower the longer the conversation goes on. With
+            [export] compress = 1 the file is
+            self.username + '_Conversation.txt.gz' instead.
         '''
         try:
-            if sys.platform.startswith('linux'):
-                if not os.path.isdir('/home/' + str(os.getlogin()) + '/.SentienceFiles/'):
-                    self.create_dir('/home/' + str(os.getlogin()) + '/.SentienceFiles/')
-                    if not os.path.isfile('/home/' + str(os.getlogin()) + '/.SentienceFiles/Caprica_Statements.txt'):
-                        self.__create_files('/home/' + str(os.getlogin()) + '/.SentienceFiles/')
-                else:
-                    temp = '/home/' + str(os.getlogin()) + '/.SentienceFiles/' + self.username + '_Conversation.txt'
-                    with open(temp, 'w') as out:
-                        out.write('Username: ' + str(self.user_profile[1]) + '\nAge: ' + str(self.user_profile[2]) + '\nSex: ' + str(self.user_profile[3]) + '\n' + self.master_log)
-            elif sys.platform.startswith('win'):
-                if not os.path.isdir('C://SentienceFiles//'):
-                    self.create_dir('C://SentienceFiles//')
-                    if not os.path.isfile('C://SentienceFiles//Caprica_Statements.txt'):
-                        self.__create_files('C://SentienceFiles//')
-                else:
-                    temp = 'C://SentienceFiles//' + self.username + '_Conversation.txt'
-                    with open(temp, 'w') as out:
-                        out.write('Username: ' + str(self.user_profile[1]) + '\nAge: ' + str(self.user_profile[2]) + '\nSex: ' + str(self.user_profile[3]) + '\n' + self.master_log)
+            if not os.path.isdir(self.paths.data_dir):
+                self.create_dir(self.paths.data_dir)
+                if not os.path.isfile(self.paths.caprica_statements):
+                    self.__create_files(self.paths.data_dir)
+            else:
+                temp = self.paths.conversation(self.username)
+                self.conversation_export.export(temp, 'Username: ' + str(self.user_profile[1]) + '\nAge: ' + str(self.user_profile[2]) + '\nSex: ' + str(self.user_profile[3]) + '\n', self.transcript)
         except IOError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: write_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: write_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: write_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except OSError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: write_files ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: write_files ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: write_files ' + '\nOSError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileNotFoundError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: write_files ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: write_files ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: write_files ' + '\nFileNotFoundError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileExistsError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: write_files ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: write_files ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: write_files ' + '\nFileExistsError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -4203,10 +4048,10 @@ class SentienceScreen(Screen):
             self.tooltip_open = True
             self.tooltip.pos = pos
             self.set_tooltip_text('Record')
-            self.ids.view_port.text = ("This is the record button. "
-                                      "Click this button to speak with your"
-                                      " microphone, after you enable the voice"
-                                      " option.")
+            self.ui.set(self.ids.view_port, 'text', ("This is the record button. "
+                                                    "Click this button to speak with your"
+                                                    " microphone, after you enable the voice"
+                                                    " option."))
             self.display_tooltip()
 
 
@@ -4384,9 +4229,9 @@ class SentienceScreen(Screen):
 		'''
         self.tooltip_open = False
         if len(self.current_conversation) > 0:
-            self.ids.view_port.text = self.current_conversation
+            self.ui.set(self.ids.view_port, 'text', self.current_conversation)
         elif len(self.current_conversation) <=0:
-            self.ids.view_port.text = ''
+            self.ui.set(self.ids.view_port, 'text', '')
         Window.remove_widget(self.tooltip)
 
 
@@ -4566,11 +4411,11 @@ class SentienceScreen(Screen):
             timeformat = '{:02d}:{:02d}'.format(mins, secs)
             time.sleep(1)
             _time -= 1
-            self.ids.notification_widget.foreground_color = kivy.utils.get_color_from_hex('FF0000')
-            self.ids.notification_widget.text = '..Thinking..'
+            self.ui.set(self.ids.notification_widget, 'foreground_color', kivy.utils.get_color_from_hex('FF0000'))
+            self.ui.set(self.ids.notification_widget, 'text', '..Thinking..')
         if self.check_timer(_time):
-            self.ids.notification_widget.text = '...Inactive...'
-            self.ids.notification_widget.foreground_color = kivy.utils.get_color_from_hex('00FFFF')
+            self.ui.set(self.ids.notification_widget, 'text', '...Inactive...')
+            self.ui.set(self.ids.notification_widget, 'foreground_color', kivy.utils.get_color_from_hex('00FFFF'))
 
 
 
@@ -4722,9 +4567,17 @@ class SentienceScreen(Screen):
 
 
 
-    def get_caprica_response(self):
+    def get_caprica_response(self, words):
         '''
-        get_caprica_response(self)
+        get_caprica_response(self, words)
+
+        Parameters
+        ----------
+            param1 : words
+                The text the user entered. It's read out of the
+                user_input TextInput widget when the message is
+                queued, the widget may hold something newer by the
+                time the response worker gets to it.
 
 		Attributes
 		----------
@@ -4759,8 +4612,8 @@ class SentienceScreen(Screen):
 				self.get_caprica_response() function except when
 				the user has enabled the voice option and makes use
 				of the voice option.
-			self.master_log
-			    This is a string variable which as its name states
+			self.transcript
+			    This is a Transcript() which
 				contains a master log of the conversation. In other
 				words, it stores both the users text and the chatbots
 				text in order as it's entered. This is done so that we
@@ -4775,7 +4628,7 @@ class SentienceScreen(Screen):
 				is provided. This is used in various ways: We set
 				the view_port TextInput Widget conversation log
 				with User: my statement. We append this data to the
-				self.master_log string. We append this data to the
+				self.transcript. We append this data to the
 				User_statement.txt file.
 			self.audio_disabled
 			    This is a boolean variable which we use to check whether
@@ -4892,25 +4745,15 @@ class SentienceScreen(Screen):
 			    This function simply starts the new thread
 				that was created. That is to say this function
 				starts the my_thread thread.
-			self.get_user_text()
-			    This function is used to return the text
-				contained in self.ids.user_input.text in
-				the form of a string.
 			datetime.datetime.now().strftime()
 			    This function is called to return the current time
 				in the form of a string. We use this to write the
 				current time to a text file if an error occurs.
 				This only executes if an error occurs.
-			os.getlogin()
-			    This function is called to return the users
-				system username. We use this function to create
-				and manipulate text files. Think about it this way.
-				On linux /home/user/folder is a filepath.
-				The user portion of that refers to the users
-				logged in username. Without the current users
-				system username we can't write text files because we
-				don't know the full path to any safe locations for us
-				to write this data.
+			self.paths
+			    The SentiencePaths() of the folder we keep our text
+				files in. It's worked out once when the program
+				starts, so every path we write to is already built.
 			sys.platform.startswith('platform')
 			    This function is called to check the user computers
 				operating system. It checks a specific version number
@@ -4933,7 +4776,7 @@ class SentienceScreen(Screen):
 				to return the users string to the chatbot so that it
 				can formulate an appropriate response for the user.
 				As well as returning it to the appending of
-				self.master_log, self.__append_file(dat, path) etc.
+				self.transcript, self.__append_file(dat, path) etc.
 			self.ids.user_input.focus
 			    This function sets the current focus of the
 				users mouse to user_input TextInput widget.
@@ -5037,105 +4880,83 @@ class SentienceScreen(Screen):
         try:
             if sys.platform.startswith('linux'):
                 if self.audio_disabled:
-                    response = str(self.chatbot.get_response(self.get_user_text()))
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.get_user_text(), '/home/' + str(os.getlogin()) + '/.SentienceFiles/User_Statements.txt')
-                    self.master_log += '\n' + self.username + ': ' + self.get_user_text()
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + response, '/home/' + str(os.getlogin()) + '/.SentienceFiles/Caprica_Statements.txt')
-                    self.master_log += '\nCaprica: ' + response
-                    self.ids.view_port.text = self.username + ': ' + self.get_user_text() + '\nCaprica: ' + response
-                    self.ids.user_input.text = ''
-                    self.ids.user_input.focus = True
-                    time.sleep(1)
-                    self.__currently_thinking(False)
+                    response = self.get_chatbot_response(words)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + words, self.paths.user_statements)
+                    self.transcript.append(self.username, words)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + response, self.paths.caprica_statements)
+                    self.transcript.append('Caprica', response)
+                    self.ui.set(self.ids.view_port, 'text', self.username + ': ' + words + '\nCaprica: ' + response)
+                    self.ui.set(self.ids.user_input, 'focus', True)
                 elif self.audio_enabled:
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.get_user_text(), '/home/' + str(os.getlogin()) + '/.SentienceFiles/User_Statements.txt')
-                    self.master_log += '\n' + self.username + ': ' + self.get_user_text()
-                    response = str(self.chatbot.get_response(self.get_user_text()))
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + response, '/home/' + str(os.getlogin()) + '/.SentienceFiles/Caprica_Statements.txt')
-                    self.master_log += '\nCaprica: ' + response
-                    self.ids.view_port.text = self.username + ': ' + self.get_user_text() + '\nCaprica: ' + response
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + words, self.paths.user_statements)
+                    self.transcript.append(self.username, words)
+                    response = self.get_chatbot_response(words)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + response, self.paths.caprica_statements)
+                    self.transcript.append('Caprica', response)
+                    self.ui.set(self.ids.view_port, 'text', self.username + ': ' + words + '\nCaprica: ' + response)
                     self.caprica_speak(response)
-                    self.ids.user_input.focus = True
-                    time.sleep(1)
-                    self.__currently_thinking(False)
+                    self.ui.set(self.ids.user_input, 'focus', True)
                 elif self.voice_disabled:
-                    self.ids.view_port.text = 'Please activate the voice option by clicking on the red microphone button'
+                    self.ui.set(self.ids.view_port, 'text', 'Please activate the voice option by clicking on the red microphone button')
                     return None
                 elif self.voice_enabled:
                     with self.mic as source:
-                        audio = self.record.listen(source)
-                    statement = self.record.recognize_sphinx(audio)
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + statement, '/home/' + str(os.getlogin()) + '/.SentienceFiles/User_Statements.txt')
-                    self.master_log += '\n' + self.username + ': ' + str(statement)
-                    temp = str(self.chatbot.get_response(statement))
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, '/home/' + str(os.getlogin()) + '/.SentienceFiles/Caprica_Statements.txt')
-                    self.master_log += '\nCaprica: ' + temp
-                    self.ids.view_port.text = self.username + ': ' + str(statement) + '\nCaprica: ' + str(temp)
+                        with self.metrics.span('listen'):
+                            audio = self.record.listen(source)
+                    with self.metrics.span('recognize_sphinx'):
+                        statement = self.record.recognize_sphinx(audio)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + statement, self.paths.user_statements)
+                    self.transcript.append(self.username, str(statement))
+                    temp = self.get_chatbot_response(statement)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, self.paths.caprica_statements)
+                    self.transcript.append('Caprica', temp)
+                    self.ui.set(self.ids.view_port, 'text', self.username + ': ' + str(statement) + '\nCaprica: ' + str(temp))
                     self.caprica_speak(temp)
-                    time.sleep(1)
-                    self.__currently_thinking(False)
             elif sys.platform.startswith('win'):
                 if self.audio_disabled:
-                    response = self.chatbot.get_response(self.get_user_text())
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + ' ' + self.get_user_text(),"C://SentienceFiles//User_Statements.txt")
-                    self.master_log += '\n' + self.username + ': ' + self.get_user_text()
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + ' ' + str(response),"C://SentienceFiles//Caprica_Statements.txt")
-                    self.master_log += '\nCaprica: ' + str(response)
-                    self.ids.view_port.text = self.username + ': ' + self.get_user_text() + '\nCaprica: ' + str(response)
-                    self.ids.user_input.text = ''
-                    self.ids.user_input.focus = True
-                    time.sleep(1)
-                    self.__currently_thinking(False)
+                    response = self.get_chatbot_response(words)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + ' ' + words, self.paths.user_statements)
+                    self.transcript.append(self.username, words)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + ' ' + str(response), self.paths.caprica_statements)
+                    self.transcript.append('Caprica', str(response))
+                    self.ui.set(self.ids.view_port, 'text', self.username + ': ' + words + '\nCaprica: ' + str(response))
+                    self.ui.set(self.ids.user_input, 'focus', True)
                 elif self.audio_enabled:
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + self.get_user_text(), 'C://SentienceFiles//User_Statements.txt')
-                    self.master_log += '\n' + self.username + ': ' + self.get_user_text()
-                    response = self.chatbot.get_response(self.get_user_text())
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + str(response), 'C://SentienceFiles//Caprica_Statements.txt')
-                    self.master_log += '\nCaprica: ' + str(response)
-                    self.ids.view_port.text = self.username + ': ' + self.get_user_text() + '\nCaprica: ' + str(response)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + words, self.paths.user_statements)
+                    self.transcript.append(self.username, words)
+                    response = self.get_chatbot_response(words)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + str(response), self.paths.caprica_statements)
+                    self.transcript.append('Caprica', str(response))
+                    self.ui.set(self.ids.view_port, 'text', self.username + ': ' + words + '\nCaprica: ' + str(response))
                     self.caprica_speak(str(response))
-                    self.ids.user_input.focus = True
-                    time.sleep(1)
-                    self.__currently_thinking(False)
+                    self.ui.set(self.ids.user_input, 'focus', True)
                 elif self.voice_disabled:
-                    self.ids.view_port.text = 'Please activate the voice option by clicking on the red microphone button'
+                    self.ui.set(self.ids.view_port, 'text', 'Please activate the voice option by clicking on the red microphone button')
                     return None
                 elif self.voice_enabled:
                     with self.mic as source:
-                        audio = self.record.listen(source)
-                    statement = self.record.recognize_sphinx(audio)
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + statement, 'C://SentienceFiles//User_Statements.txt')
-                    self.master_log += '\n' + self.username + ': ' + statement
-                    temp = self.chatbot.get_response(statement)
-                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + str(temp), 'C://SentienceFiles//Caprica_Statements.txt')
-                    self.master_log += '\nCaprica: ' + str(temp)
-                    self.ids.view_port.text = self.username + ': ' + statement + '\nCaprica: ' + str(temp)
+                        with self.metrics.span('listen'):
+                            audio = self.record.listen(source)
+                    with self.metrics.span('recognize_sphinx'):
+                        statement = self.record.recognize_sphinx(audio)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + statement, self.paths.user_statements)
+                    self.transcript.append(self.username, statement)
+                    temp = self.get_chatbot_response(statement)
+                    self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + str(temp), self.paths.caprica_statements)
+                    self.transcript.append('Caprica', str(temp))
+                    self.ui.set(self.ids.view_port, 'text', self.username + ': ' + statement + '\nCaprica: ' + str(temp))
                     self.caprica_speak(str(temp))
-                    time.sleep(1)
-                    self.__currently_thinking(False)
         except OSError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as e:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as f:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_user_voice_response ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -5158,8 +4979,8 @@ class SentienceScreen(Screen):
                 store the generated response of the chatbot. This
                 variable will then be written to varios files and
                 displayed in the view_port TextInput widget.
-            self.master_log
-                self.master_log is a string variable wich contains a
+            self.transcript
+                self.transcript is a Transcript() which contains a
                 master conversation log. This log includes the text
                 sent by the user and the responses generated by
                 the chatbot as they appear.
@@ -5178,14 +4999,6 @@ class SentienceScreen(Screen):
                 access the users systems text to speech software
                 to verbally speak the passed string. This function
                 is a member of SentienceScreen().
-            time.sleep(integer)
-                We call time.sleep(1) to force the program to
-                sleep for one second. This ensures that certain
-                functions are called by forcing the Kivy.clock() to
-                appropriately execute events in the correct order
-                in the frame. It also prevents the program from hanging
-                by trying to execute things to fast. This function is a
-                member of the class time.
             sys.platform.startswith(string)
                 We call this function to determine the users operating
                 system. If the user is running a windows system then
@@ -5206,13 +5019,10 @@ class SentienceScreen(Screen):
                 We format it to ourput in
                 year, month, day, hours, minutes seconds. This is
                 returned as a string directly to our write method.
-            os.getlogin()
-                This function is a member of the os class. We call
-                this function to return the current users system user
-                name. We do this so that we can succesfully write files
-                to the users system. On linux the filesystem has the
-                users name as part of it's non root path. We need this
-                name to access the location where we want to write to.
+            self.paths
+                The SentiencePaths() of the folder we keep our text
+                files in. self.paths.error_log and the others are
+                worked out once when the program starts.
         Private Members
         ---------------
             self.__append_file(string, path)
@@ -5284,54 +5094,124 @@ class SentienceScreen(Screen):
             call self.caprica_speak(words) to actually verbally
             communicate the chat bots response to the user.
 
-            We next interupt the thread and put the program to sleep
-            for one second by calling time.sleep(1). We finally
-            call self.__currently_thinking(False) to reset the
-            banner text to '...Thinking...' with a blue foreground.
+            The response worker resets the banner text to
+            '...Inactive...' once this returns. The view_port text is
+            changed on the next frame through self.ui, since we
+            aren't on the kivy thread.
 
         '''
         try:
             if sys.platform.startswith('linux'):
-                temp = str(self.chatbot.get_response(words))
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, '/home/' + str(os.getlogin()) + '/.SentienceFiles/Caprica_Statements.txt')
-                self.master_log += '\nCaprica: ' + temp
-                self.ids.view_port.text = self.username + ': ' + str(words) + '\nCaprica: ' + str(temp)
+                temp = self.get_chatbot_response(words)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + temp, self.paths.caprica_statements)
+                self.transcript.append('Caprica', temp)
+                self.__show_conversation(self.username + ': ' + str(words) + '\nCaprica: ' + str(temp))
                 self.caprica_speak(temp)
-                time.sleep(1)
-                self.__currently_thinking(False)
             elif sys.platform.startswith('win'):
-                temp = str(self.chatbot.get_response(words))
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + str(temp), 'C://SentienceFiles//Caprica_Statements.txt')
-                self.master_log += '\nCaprica: ' + str(temp)
-                self.ids.view_port.text = self.username + ': ' + str(words) + '\nCaprica: ' + str(temp)
+                temp = self.get_chatbot_response(words)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + str(temp), self.paths.caprica_statements)
+                self.transcript.append('Caprica', str(temp))
+                self.__show_conversation(self.username + ': ' + str(words) + '\nCaprica: ' + str(temp))
                 self.caprica_speak(str(temp))
-                time.sleep(1)
-                self.__currently_thinking(False)
         except OSError as c:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_thread ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_thread ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_caprica_voice_thread ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except IOError as d:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_thread  ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_thread  ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_caprica_voice_thread  ' + '\nIOError: ' + str(d) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except RuntimeError as e:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_thread  ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_thread  ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: get_caprica_voice_thread  ' + '\nRuntimeError: ' + str(e) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except ValueError as f:
+            self.__append_file('\n' + 'Function: get_caprica_voice_thread  ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
+            return None
+
+
+
+    def get_user_voice_thread(self):
+        '''
+        get_user_voice_thread(self)
+
+        Parameters
+        ----------
+            param1 : self
+                Denotes this as being a member of SentienceScreen().
+        Attributes
+        ----------
+            audio
+                The recording returned by self.record.listen(source).
+            statement
+                The string that self.record.recognize_sphinx(audio)
+                transcribed from the recording.
+        Members
+        -------
+            self.record.listen(source)
+                Records from the users microphone until they stop
+                talking.
+            self.record.recognize_sphinx(audio)
+                Transcribes the recording into a string.
+            self.get_caprica_voice_thread(statement)
+                Generates, shows and speaks the chatbots response.
+        Private Members
+        ---------------
+            self.__append_file(string, path)
+                Appends the users statement to the User_Statements
+                text file.
+            self.__show_conversation(string)
+                Puts a string in the view_port TextInput widget on
+                the next frame.
+        Exceptions
+        ----------
+            sr.UnknownValueError
+                Sphinx couldn't make out any words. We log it and ask
+                the user to try again.
+            sr.RequestError
+                Sphinx isn't installed properly. It's logged to the
+                error log text file.
+            OSError
+                Usually the microphone couldn't be opened. It's
+                logged to the error log text file.
+        Returns
+        -------
+            None
+        Notes
+        -----
+            start_voice_response_thread() queues this on the response
+            worker. Listening, decoding, finding a response and
+            speaking it all take seconds, and none of them happen on
+            the kivy thread any more, so the window keeps drawing the
+            whole time. Anything we want to show is handed back to
+            the kivy thread through self.ui.
+        '''
+        try:
             if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_thread  ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
+                with self.mic as source:
+                    with self.metrics.span('listen'):
+                        audio = self.record.listen(source)
+                with self.metrics.span('recognize_sphinx'):
+                    statement = self.record.recognize_sphinx(audio)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + statement, self.paths.user_statements)
+                self.transcript.append(self.username, str(statement))
+                self.get_caprica_voice_thread(statement)
             elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: get_caprica_voice_thread  ' + '\nValueError: ' + str(f) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+                with self.mic as source:
+                    with self.metrics.span('listen'):
+                        audio = self.record.listen(source)
+                with self.metrics.span('recognize_sphinx'):
+                    statement = self.record.recognize_sphinx(audio)
+                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + str(statement), self.paths.user_statements)
+                self.transcript.append(self.username, str(statement))
+                self.get_caprica_voice_thread(statement)
+        except sr.UnknownValueError as a:
+            self.__append_file('\n' + 'Function: get_user_voice_thread ' + '\nspeech_recognition.Recognizer.UnknownValueError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
+            self.__show_conversation("I'm sorry, I didn't understand. Can you please click record and say that again?")
+            return None
+        except sr.RequestError as b:
+            self.__append_file('\n' + 'Function: get_user_voice_thread ' + '\nspeech_recognition.Recognizer.RequestError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
+            return None
+        except OSError as c:
+            self.__append_file('\n' + 'Function: get_user_voice_thread ' + '\nOSError: ' + str(c) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
-
 
 
     def start_get_response_thread(self):
@@ -5368,23 +5248,14 @@ class SentienceScreen(Screen):
                 we change the text color to blue. This tells the user
                 that the chatbot has generated a response and that
                 the user can once again speak to it.
-			Threading.Thread(target = event, args = (tuple)).start()
-                threading.Thread() is called to create a new thread.
-                This is used to run the acquisition of the a response
-                from the chatbot to the user. We pass the
-				function self.get_caprica_response to this as its event
-				and because self.get_caprica_response doesn't require
-				any arguements we omit the "args" parameter that we
-				saw in the threading code. We then call start() to
-				actually run the thread.
-            Time.sleep(time_interval)
-                We call this function to force the program to "sleep",
-                for 1 second. This executes the two lines above
-                Time.sleep(1) before it creates and starts the thread.
-                We do this to prevent hanging issues caused by the
-                threading event and to ensure that the proper text
-                and color of the text is set; and more importantly,
-                so that the user can see this text.
+            self.response_worker.submit(event, *args)
+                We queue self.get_caprica_response(words) on the
+                response worker. The worker is a single thread that
+                answers one message at a time in the order they
+                were sent, so typing fast can no longer run two
+                chatbot lookups at once. We read the users text and
+                clear the user_input TextInput widget here, before
+                the message is queued.
             kivy.utils.get_color_from_hex('Hex string')
                 This is a kivy function. It's a member of kivy.utilsself.
                 We call this function to convert a hexadecimal string
@@ -5398,11 +5269,6 @@ class SentienceScreen(Screen):
                 windows 10 or ubuntu? By using .startswith('') we
                 simply detect the operating system and are able
                 to be truly cross platform.
-            time.sleep()
-                This is a member of the Time class(). We call this
-                function to force the program to sleep for one second.
-                To ensure that the notification_widget TextInput
-                text property reflects the current state of the program.
 		Private Members
 		---------------
 		    self.__set_thinking_text
@@ -5419,33 +5285,29 @@ class SentienceScreen(Screen):
 		Notes
 		-----
 		    This function is called when the user sends a response to
-			the chatbot. We use this to start self.get_caprica_response
-			as a new thread to improve performance.
-
-            We first detect the operating system, then set the text
-            of self.notification_widget to be appropriate, we then
-            change the color to reflect the text as mentioned
-            above. We then force the program to sleep for one second
-            to ensure those changes take effect. We finally create and
-            run a new thread which then starts the
-            self.get_caprica_response() function.
+			the chatbot. We use this to queue self.get_caprica_response
+			on the response worker thread to improve performance.
+
+            We first set the text of self.notification_widget to
+            be appropriate, we then change the color to reflect the
+            text as mentioned above. We finally queue self.get_caprica_response(words) on
+            self.response_worker. If the user sends messages faster
+            than we can answer them they wait their turn, and once
+            [worker] queue_size are waiting the oldest is dropped
+            and self.__message_dropped() says so in the view_port.
+            Sending the same text twice gets two answers.
+            There's no need to wait for the banner to change, the
+            worker turns it back off once it has nothing left to
+            answer.
         '''
-        if sys.platform.startswith('linux'):
-            if len(self.get_user_text()) <= 1:
-                self.ids.view_port.text = 'Please enter at least two characters. Like Hi'
-                self.ids.user_input.text = ''
-            elif len(self.get_user_text()) > 1:
-                self.__currently_thinking(True)
-                time.sleep(1)
-                threading.Thread(name = 'linux_thread', target = self.get_caprica_response).start()
-        elif sys.platform.startswith('win'):
-            if len(self.get_user_text()) <= 1:
-                self.ids.view_port.text = 'Please enter at least two characters. Like Hi'
-                self.ids.user_input.text = ''
-            elif len(self.get_user_text()) > 1:
-                self.__currently_thinking(True)
-                time.sleep(1)
-                threading.Thread(name = 'windows_thread', target = self.get_caprica_response).start()
+        words = self.get_user_text()
+        if len(words) <= 1:
+            self.ui.set(self.ids.view_port, 'text', 'Please enter at least two characters. Like Hi')
+            self.ui.set(self.ids.user_input, 'text', '')
+        elif len(words) > 1:
+            self.__currently_thinking(True)
+            self.ui.set(self.ids.user_input, 'text', '')
+            self.response_worker.submit(self.get_caprica_response, words)
 
 
 
@@ -5506,8 +5368,8 @@ class SentienceScreen(Screen):
                 self.recognize_sphinx(audio). Which is then
                 transcribed from audio data and returned as
                 a string and stored in the statement variable.
-            self.master_log
-                self.master_log is a member of the SentienceScreen()
+            self.transcript
+                self.transcript is a member of the SentienceScreen()
                 class. This variable is used to store the full
                 conversation between the chatbot and the user. This
                 variable is later used to write data to a file.
@@ -5543,16 +5405,13 @@ class SentienceScreen(Screen):
                 collected via the users microphone. This audio
                 data is transcribed into a string and returned and
                 stored in the statement variable.
-            threading.Thread(*args)
-                This is a member of the threading() class. We use
-                this to declare, instantiate and run our thread all at
-                once. The thread is given a name based on the users
-                operating system. Ie, if it's linux, it's named
-                'linux_thread' and if it's windows it's named
-                'windows_thread'. We then pass it the target event
-                which is self.get_caprica_voice_thread(statement).
-                We finally call the start() function of the
-                threading class to actually start the new thread.
+            self.response_worker.submit(self.get_user_voice_thread, coalesce=True)
+                We queue self.get_user_voice_thread() on the response
+                worker. Everything from opening the microphone to
+                speaking the answer happens there, in the same order
+                as any typed messages that were sent before it. A
+                second click while one is still waiting would only
+                open the microphone twice, so it's coalesced.
             datetime.datetime.now().strftime(string)
                 This is a member of the datetime() class.
                 We use this function to return the current local time
@@ -5564,14 +5423,6 @@ class SentienceScreen(Screen):
                 thread. That is to say this is the new thread. We
                 pass it the users transcribed verbal statement which
                 is stored in the string variable statement.
-            time.sleep(integer)
-                This is a member of the time() class. We call
-                this function to put the program to sleep for one
-                second. We do this to ensure that the thread is
-                not executed until after the text, and the color of
-                the text in the self.notification_widget TextInput
-                widget have been changed to reflect the programs
-                current status.
         Private Members
         ---------------
             self.__append_file(string, path)
@@ -5609,58 +5460,23 @@ class SentienceScreen(Screen):
             activate this option.
 
             Once the voice mode is activated and the record user
-            button has been clicked. We open the users mirophone
-            and pipe the audio input into source which is passed
-            to the listen() function and stored in its audio form.
-
-            When the microphone stops picking up audio input
-            listen() function terminates and returns the audio
-            to the local variable named audio.
-
-            We then pass the audio variable into the function
-            recognize_sphinx() which transcribes it into a string.
-            Returns that string to be stored in the local variable
-            named statement.
-
-            We then append the users response to the chatbot as well
-            as the date and time this response occured to the
-            User_Statement text file. We then add this response to
-            the end of the master_log string. Along with the users
-            username.
-
-            We then set the current status of the chatbot, Ie,
-            thinking or inactive. Which is then reflected in
-            the notification_widget text property. We then call
-            time.sleep() and give it a one second interval to
-            ensure that the above does occur before the thread
-            is setup and run.
+            button has been clicked. We set the current status of
+            the chatbot to thinking, which is reflected in the
+            notification_widget text property, and queue
+            self.get_user_voice_thread() on the response worker.
+
+            That's all that happens on the kivy thread. Listening,
+            recognize_sphinx(), finding the response and speaking
+            it used to all run right here, which froze the window
+            for the whole turn. See self.get_user_voice_thread()
+            for the rest.
         '''
-        if sys.platform.startswith('linux'):
-            if self.voice_disabled:
-                self.ids.view_port.text = 'Please activate the voice option by clicking on the red microphone button'
-                return None
-            elif self.voice_enabled:
-                with self.mic as source:
-                    audio = self.record.listen(source)
-                statement = self.record.recognize_sphinx(audio)
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + statement, '/home/' + str(os.getlogin()) + '/.SentienceFiles/User_Statements.txt')
-                self.master_log += '\n' + self.username + ': ' + str(statement)
-                self.__currently_thinking(True)
-                time.sleep(1)
-                threading.Thread(name = 'linux_thread', target = self.get_caprica_voice_thread(statement)).start()
-        elif sys.platform.startswith('win'):
-            if self.voice_disabled:
-                self.ids.view_port.text = 'Please activate the voice option by clicking on the red microphone button'
-                return None
-            elif self.voice_enabled:
-                with self.mic as source:
-                    audio = self.record.listen(source)
-                statement = self.record.recognize_sphinx(audio)
-                self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + str(statement), 'C://SentienceFiles//User_Statements.txt')
-                self.master_log += '\n' + self.username + ': ' + str(statement)
-                self.__currently_thinking(True)
-                time.sleep(1)
-                threading.Thread(name = 'windows_thread', target = self.get_caprica_voice_thread(statement)).start()
+        if self.voice_disabled:
+            self.ui.set(self.ids.view_port, 'text', 'Please activate the voice option by clicking on the red microphone button')
+            return None
+        elif self.voice_enabled:
+            self.__currently_thinking(True)
+            self.response_worker.submit(self.get_user_voice_thread, coalesce=True)
 
 
 
@@ -5674,6 +5490,30 @@ class SentienceScreen(Screen):
 
 
 
+    def get_chatbot_response(self, words):
+        '''
+        get_chatbot_response(self, words)
+
+        Parameters
+        ----------
+            param1 : words
+                The users statement.
+
+        Returns
+        -------
+            The chatbots response as a string.
+
+        Notes
+        -----
+            Every response we hand to the user comes through here
+            rather than self.chatbot.get_response(words), so that
+            the response cache sits in front of all of them.
+        '''
+        with self.metrics.span('get_response'):
+            return str(self.response_cache.get_response(self.chatbot, words))
+
+
+
     def open_delete_file_dialog(self):
         '''
         open_delete_file_dialog(self)
@@ -5884,23 +5724,18 @@ class SentienceScreen(Screen):
         try:
             temp = str(filename)
             temp = temp[2:-2]
+            self.log_writer.release()
             if os.path.isfile(temp):
                 print(temp + ' Has been deleted')
                 os.remove(temp)
-                self.ids.view_port.text = str(temp) + ' File has been deleted.'
+                self.ui.set(self.ids.view_port, 'text', str(temp) + ' File has been deleted.')
             elif not os.path.isfile(temp):
                 print(temp + ' Either does not exist or was already deleted.')
         except IOError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: delet_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: delete_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: delete_files ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileNotFoundError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: delet_files ' + '\nFileNotFoundError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: delete_files ' + '\nFileNotFoundError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: delete_files ' + '\nFileNotFoundError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
@@ -5995,6 +5830,14 @@ class SentienceScreen(Screen):
                 path of the directory (folder) that we're going to
                 delete.
 
+                The latency metrics are stopped before the folder is
+                deleted. Otherwise on_stop() would write Latency.json
+                one last time and bring the folder back with it. The
+                conversation store is closed and the transcript
+                cleared, which removes its spill file, for the same
+                reason. An open Conversations.db and its WAL can't be
+                deleted on windows at all.
+
                 We then call shutil.rmtree() to make access of the
                 systems native api to delete the directory. Once deleted
                 we display a message which includes the full directory
@@ -6005,31 +5848,40 @@ class SentienceScreen(Screen):
                 log.
         '''
         try:
-            if sys.platform.startswith('linux'):
-                temp = '/home/' + str(os.getlogin()) + '/.SentienceFiles/'
-                shutil.rmtree(temp, ignore_errors=True)
-                self.ids.view_port.text = temp + ' and all of its contents have been deleted'
-                App.get_running_app().stop()
-            elif sys.platform.startswith('win'):
-                temp = 'C://SentienceFiles//'
-                shutil.rmtree(temp, ignore_errors=True)
-                self.ids.view_port.text = temp + ' and all of its contents have been deleted'
-                App.get_running_app().stop()
+            self.log_writer.release()
+            self.metrics.stop()
+            self.conversation_store.close()
+            self.transcript.clear()
+            temp = self.paths.data_dir
+            shutil.rmtree(temp, ignore_errors=True)
+            self.ui.set(self.ids.view_port, 'text', temp + ' and all of its contents have been deleted')
+            App.get_running_app().stop()
         except IOError as a:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: delet_all ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: delete_all ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: delete_all ' + '\nIOError: ' + str(a) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
         except FileNotFoundError as b:
-            if sys.platform.startswith('linux'):
-                self.__append_file('\n' + 'Function: delete_all ' + '\nFileNotFoundError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), '/home/' + str(os.getlogin()) + '/.SentienceFiles/Error Logs.txt')
-            elif sys.platform.startswith('win'):
-                self.__append_file('\n' + 'Function: delete_all ' + '\nFileNotFoundError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), 'C://SentienceFiles//Error Logs.txt')
+            self.__append_file('\n' + 'Function: delete_all ' + '\nFileNotFoundError: ' + str(b) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
             return None
 
 
 
+    def __show_conversation(self, words):
+        '''
+        __show_conversation(self, words)
+
+        Parameters
+        ----------
+            param1 : words
+                The string to put in the view_port TextInput widget.
+
+        Notes
+        -----
+            Safe to call from any thread, the change goes through
+            self.ui and is drawn on the next frame.
+        '''
+        self.ui.set(self.ids.view_port, 'text', words)
+
+
     def __set_thinking_text(self, bool):
         '''
         __Set_thinking_text(self, bool)
@@ -6103,11 +5955,30 @@ class SentienceScreen(Screen):
             If the program is inactive then the text is made blue.
         '''
         if bool == True:
-            self.ids.notification_widget.text = '...Thinking...'
-            self.ids.notification_widget.foreground_color = kivy.utils.get_color_from_hex('FF0000')
+            self.ui.set(self.ids.notification_widget, 'text', '...Thinking...')
+            self.ui.set(self.ids.notification_widget, 'foreground_color', kivy.utils.get_color_from_hex('FF0000'))
         elif bool == False:
-            self.ids.notification_widget.text = '...Inactive...'
-            self.ids.notification_widget.foreground_color = kivy.utils.get_color_from_hex('00FFFF')
+            self.ui.set(self.ids.notification_widget, 'text', '...Inactive...')
+            self.ui.set(self.ids.notification_widget, 'foreground_color', kivy.utils.get_color_from_hex('00FFFF'))
+
+
+
+    def __message_dropped(self, function, args):
+        '''
+        __message_dropped(self, function, args)
+
+        Notes
+        -----
+            The response worker calls this for every job it throws
+            away because [worker] queue_size messages were already
+            waiting. A dropped message is never answered, so we say
+            so in the view_port rather than leave the user waiting
+            for a reply that isn't coming.
+        '''
+        if function == self.get_caprica_response and len(args) > 0:
+            self.ui.set(self.ids.view_port, 'text', 'Too many messages were waiting, "' + str(args[0]) + '" was dropped. Please send it again.')
+        else:
+            self.ui.set(self.ids.view_port, 'text', 'Too many messages were waiting, a voice message was dropped. Please try again.')
 
 
 
@@ -6163,13 +6034,18 @@ class SentienceScreen(Screen):
             self.__set_thinking_text(bool) to change the text field
             of the self.notification_widget to '...Inactive...' with
             a blue foreground color.
+
+            This gets called from the response worker thread, so the
+            widget itself is only changed on the next frame through
+            self.ui. Only the last text and color set before that
+            frame are drawn, so a quick True then False never leaves
+            it stuck on '...Thinking...'.
         '''
         if bool == True:
             self.__is_thinking = True
-            return self.__set_thinking_text(True)
         elif bool == False:
-            self.__is_thinking == False
-            return self.__set_thinking_text(False)
+            self.__is_thinking = False
+        self.__set_thinking_text(self.__is_thinking)
 
 
 
@@ -6349,6 +6225,7 @@ class SentienceApp(App):
         self.age_exists = self.config.get('settings_menu', 'create_age')
         self.clear_screen_status = self.config.get('settings_menu', 'clear_screen')
         self.file_creation_status = self.config.get('settings_menu', 'write_user_data')
+        self.show_latency_status = self.config.get('settings_menu', 'show_latency')
         self.load_settings()
         return root_widget
 
@@ -6430,6 +6307,9 @@ class SentienceApp(App):
         elif 'write file' or 'None' not in self.file_creation_status:
             self.config.set('settings_menu', 'write_user_data', 'None')
             self.config.write()
+        if 'None' not in self.show_latency_status:
+            self.config.set('settings_menu', 'show_latency', 'None')
+            self.config.write()
 
 
 
@@ -6454,8 +6334,11 @@ class SentienceApp(App):
                            'create_gender': None,
                            'create_age': None,
                            'clear_screen': None,
-                           'write_user_data': None
+                           'write_user_data': None,
+                           'show_latency': None
                            })
+        for section, values in DEFAULTS.items():
+            config.setdefaults(section, values)
 
 
 
@@ -6474,23 +6357,45 @@ class SentienceApp(App):
 
     def on_start(self):
         '''
-            This function creates a cProfiler() to help us
-            diagnose potential issues.
+            This function starts a SessionProfiler() to help us
+            diagnose potential issues. It's off unless the
+            [profiling] mode in sentience.ini or $SENTIENCE_PROFILE
+            is deterministic or sampling. While it's on, kill -USR1
+            writes what it has so far to a timestamped file in the
+            data folder, or [profiling] directory if that's set.
+
+            Every turn is answered on the response worker, not on
+            this thread, so profile_thread() is queued on it too.
+            In deterministic mode that starts a cProfile there,
+            otherwise it does nothing.
         '''
-        self.profiler = cProfile.Profile()
-        self.profiler.enable()
+        config = self.sentience.sentience_config
+        self.profiler = SessionProfiler(profiling_mode(config), config.get('profiling', 'directory') or self.sentience.paths.data_dir, config.getfloat('profiling', 'dump_interval'), config.getfloat('profiling', 'sample_interval'), Logger)
+        self.profiler.start()
+        self.sentience.response_worker.submit(self.profiler.profile_thread)
 
 
 
     def on_stop(self):
         '''
             When the program is exited the profiler is stopped
-            and the .profile file containing the data that's
-            been accumulated to help test the program is output
-            to a file named SentiencePRofile.profile
+            and, if profiling was turned on, what it recorded is
+            written to one last timestamped SentienceProfile file.
+
+            We also give the response worker a few seconds to
+            finish the messages that are still waiting so what
+            they taught the chatbot isn't lost, then write out
+            whatever the log writer still has buffered, commit
+            what the learning queue still has waiting, close
+            the conversation store and write the latency numbers
+            one last time.
         '''
-        self.profiler.disable()
-        self.profiler.dump_stats('SentienceProfile.profile')
+        self.sentience.response_worker.stop(5)
+        self.sentience.chatbot.storage.close()
+        self.sentience.log_writer.close()
+        self.sentience.conversation_store.close()
+        self.sentience.metrics.stop()
+        self.profiler.stop()
 
 
 
@@ -6508,14 +6413,14 @@ class SentienceApp(App):
             This function is called to set the first key of
             self.sentience.user_profile[1] dictionary to
             value. value is then stored in self.sentience.username
-            self.sentience.master_log string is then cleared to
+            self.sentience.transcript is then cleared to
             ensure a new user experience is created. We then create
             the user profile which basically just reads the users
             input username which is stored in value.
         '''
         self.sentience.user_profile[1] = value
         self.sentience.username = value
-        self.sentience.master_log = ''
+        self.sentience.transcript.clear()
         self.sentience.create_user_profile()
 
 
@@ -6526,11 +6431,11 @@ class SentienceApp(App):
             value when the users modifies the Gender setting in
             the settings menu. We store the gender in value in
             self.sentience.user_priofile[3]. We then clear the
-            self.sentience.master_log string to ensure a new
+            self.sentience.transcript to ensure a new
             experience has been created for the current user.
         '''
         self.sentience.user_profile[3] = value
-        self.sentience.master_log = ''
+        self.sentience.transcript.clear()
 
 
 
@@ -6540,11 +6445,11 @@ class SentienceApp(App):
             value when the users modifies the age setting in
             the settings menu. We store the gender in value in
             self.sentience.user_priofile[2]. We then clear the
-            self.sentience.master_log string to ensure a new
+            self.sentience.transcript to ensure a new
             experience has been created for the current user.
         '''
         self.sentience.user_profile[2] = value
-        self.sentience.master_log = ''
+        self.sentience.transcript.clear()
 
 
 
@@ -6595,6 +6500,10 @@ class SentienceApp(App):
                 self.set_age(value)
                 self.config.set('settings_menu', 'create_age', value)
                 self.config.write()
+            elif section == 'settings_menu' and key == 'show_latency' and 'show latency' in value:
+                self.sentience.show_latency()
+                self.config.set('settings_menu', 'show_latency', 'None')
+                self.config.write()
             elif section == 'settings_menu' and key == 'clear_screen' and 'yes' or 'Yes' in value:
                 self.sentience.clear_viewport()
                 self.config.set('settings_menu', 'clear_screen', 'None')
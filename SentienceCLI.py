@@ -0,0 +1,342 @@
+import argparse
+import os
+from SentienceConfig import load_config
+
+
+COMMANDS = ('index', 'migrate', 'conversations', 'batch', 'train', 'ingest', 'shard', 'snapshot')
+
+
+def index_command(arguments):
+    '''
+    index_command(arguments)
+
+    Notes
+    -----
+        'index build' embeds every response statement in the database
+        and writes a new approximate nearest neighbour index next to
+        it. 'index add' appends the response statements that aren't
+        in the index yet. 'index info' prints the index metadata.
+        Set matcher = ann in the [corpus] section of sentience.ini to
+        have the chatbot use the index.
+    '''
+    from AnnIndex import AnnIndex, add_to_index, build_index, default_index_path
+
+    path = arguments.path or default_index_path(arguments.database)
+    if arguments.action == 'build':
+        build_index(arguments.database, path, dimensions=arguments.dimensions, lists=arguments.lists, report=print)
+    elif arguments.action == 'add':
+        if not AnnIndex(path).exists():
+            print('There is no index at ' + path + '. Run "python Sentience.py index build" first.')
+            return 1
+        add_to_index(arguments.database, path, report=print)
+    elif arguments.action == 'info':
+        if not AnnIndex(path).exists():
+            print('There is no index at ' + path)
+            return 1
+        for key, value in sorted(AnnIndex(path).load().meta.items()):
+            print(key + ': ' + str(value))
+    return 0
+
+
+def migrate_command(arguments):
+    '''
+    migrate_command(arguments)
+
+    Notes
+    -----
+        Runs the same schema migration SentienceScreen does at start
+        up, but with whatever time budget is given. 0 lets it take as
+        long as the indexes need.
+    '''
+    from CorpusSchema import SCHEMA_VERSION, migrate
+
+    version = migrate(arguments.database, arguments.time_budget, report=print)
+    if version is None:
+        print(arguments.database + ' has no chatterbot tables to migrate.')
+        return 1
+    print('Schema version ' + str(version) + ' of ' + str(SCHEMA_VERSION))
+    return 0 if version == SCHEMA_VERSION else 1
+
+
+def conversations_command(arguments):
+    '''
+    conversations_command(arguments)
+
+    Notes
+    -----
+        'conversations search QUERY' prints the saved turns that have
+        every word of QUERY, for example 'pass*' or 'what's up?'. With
+        --raw QUERY is an fts5 query, for example '"shall not pass"'.
+        'conversations history' prints the last --limit turns of
+        --user and 'conversations sessions' lists every session.
+    '''
+    import datetime
+    import sqlite3
+    from ConversationStore import ConversationStore
+    from SentiencePaths import get_paths
+
+    path = arguments.database or get_paths(load_config()).conversations
+    if not os.path.isfile(path):
+        print('There are no saved conversations at ' + path)
+        return 1
+    store = ConversationStore(path)
+    try:
+        if arguments.action == 'sessions':
+            for session, first, last, turns in store.sessions(arguments.user):
+                print(session + '  ' + datetime.datetime.fromtimestamp(first).strftime('%Y-%m-%d %H:%M:%S') + ' - ' + datetime.datetime.fromtimestamp(last).strftime('%Y-%m-%d %H:%M:%S') + '  ' + str(turns) + ' turns')
+            return 0
+        if arguments.action == 'search':
+            if arguments.query is None:
+                print('conversations search needs a query.')
+                return 1
+            try:
+                turns = store.search(arguments.query, arguments.user, arguments.limit, arguments.raw)
+            except sqlite3.OperationalError as error:
+                print('That is not an fts5 query: ' + str(error) + '. Leave out --raw to search for the words as they are.')
+                return 1
+        else:
+            if arguments.user is None:
+                print('conversations history needs --user.')
+                return 1
+            turns = store.history(arguments.user, arguments.limit)
+        for turn in turns:
+            print(datetime.datetime.fromtimestamp(turn.timestamp).strftime('%Y-%m-%d %H:%M:%S') + ' [' + turn.user + '] ' + turn.speaker + ': ' + turn.text)
+    finally:
+        store.close()
+    return 0
+
+
+def batch_command(arguments):
+    '''
+    batch_command(arguments)
+
+    Notes
+    -----
+        'batch FILE' answers every line of FILE, User_Statements.txt
+        or any other text file, with --workers processes and writes
+        one JSON object per line to --output: the line number, the
+        input, the response, its confidence and how long it took.
+        The chatbots are read only, so the replay doesn't teach the
+        corpus anything. A statement the chatbot fails on gets an error
+        field instead of a response. The totals are printed to stderr.
+
+    Returns
+    -------
+        0 if every statement was answered, 1 if any of them got an
+        error or the workers couldn't start.
+    '''
+    import sys
+    from BatchResponses import answer_file
+
+    report = lambda line: print(line, file=sys.stderr)
+    try:
+        with open(arguments.file) as lines:
+            if arguments.output == '-':
+                totals = answer_file(lines, sys.stdout, arguments.workers, arguments.database, arguments.matcher, arguments.chunk_size, report)
+            else:
+                with open(arguments.output, 'w') as output:
+                    totals = answer_file(lines, output, arguments.workers, arguments.database, arguments.matcher, arguments.chunk_size, report)
+    except (ValueError, RuntimeError) as error:
+        print(str(error), file=sys.stderr)
+        return 1
+    if totals['errors'] > 0:
+        print(str(totals['errors']) + ' of ' + str(totals['answered']) + ' statements got an error instead of a response.', file=sys.stderr)
+        return 1
+    return 0
+
+
+def train_command(arguments):
+    '''
+    train_command(arguments)
+
+    Notes
+    -----
+        'train RC_2015-01.bz2 ...' adds every comment and the comment
+        it replied to in each reddit dump to the corpus database as a
+        statement and response pair. The dumps are read as a stream,
+        compressed or not, so they can be as big as they like.
+    '''
+    from RedditTrainer import RedditTrainer
+
+    trainer = RedditTrainer(arguments.database, arguments.batch_size, arguments.min_score, arguments.max_length, arguments.staging_dir, report=print)
+    for path in arguments.dumps:
+        trainer.train(path)
+    return 0
+
+
+def ingest_command(arguments):
+    '''
+    ingest_command(arguments)
+
+    Notes
+    -----
+        'ingest RC_2015-01.bz2 RC_2015-02.bz2 ...' does what train does
+        for several months at once. Every month is read into its own
+        shard database by its own worker process, then the shards are
+        merged into the corpus and its indexes are built once.
+    '''
+    from CorpusIngest import ingest
+
+    ingest(arguments.dumps, arguments.database, arguments.workers, arguments.shard_dir, arguments.keep_shards,
+           arguments.batch_size, arguments.min_score, arguments.max_length, report=print)
+    return 0
+
+
+def shard_command(arguments):
+    '''
+    shard_command(arguments)
+
+    Notes
+    -----
+        'shard split --count N --directory DIR' writes the corpus
+        database out again as N shards, split on the hash of the
+        normalized prompt text. Point [corpus] shards at DIR/*.db and
+        [corpus] database at a database for the chatbot to learn in.
+        'shard info' lists the shards [corpus] shards points at.
+    '''
+    from ShardedStorage import Shard, expand_shards, split_corpus
+    from StorageProfile import profile_pragmas
+
+    if arguments.action == 'split':
+        split_corpus(arguments.database, arguments.count, arguments.directory, report=print)
+        print('Set shards = ' + os.path.join(arguments.directory, '*.db') + ' in the [corpus] section of sentience.ini to use them.')
+        return 0
+    config = load_config()
+    paths = expand_shards(config.get('corpus', 'shards'), config.get('corpus', 'database'))
+    if len(paths) <= 0:
+        print('[corpus] shards in sentience.ini is empty.')
+        return 1
+    for path in paths:
+        shard = Shard(path, profile_pragmas(config))
+        print(path + ': ' + str(shard.statement_count) + ' statements')
+        shard.close()
+    return 0
+
+
+def snapshot_command(arguments):
+    '''
+    snapshot_command(arguments)
+
+    Notes
+    -----
+        'snapshot build' reads the corpus database into memory and
+        writes it out as a snapshot the chatbot maps in at start up
+        with [corpus] in_memory = 1. Build it again whenever the
+        database changes, an out of date snapshot is ignored.
+        'snapshot info' prints what's in a snapshot.
+    '''
+    import time
+    from MemoryCorpus import SnapshotCorpus, default_snapshot_path, read_corpus, write_snapshot
+
+    path = arguments.path or default_snapshot_path(arguments.database)
+    if arguments.action == 'build':
+        started = time.monotonic()
+        corpus = read_corpus(arguments.database, report=print)
+        write_snapshot(corpus, path, arguments.database)
+        print('Wrote ' + path + ', ' + str(os.path.getsize(path)) + ' bytes in ' + str(round(time.monotonic() - started, 1)) + 's')
+        print('Set in_memory = 1 in the [corpus] section of sentience.ini to use it.')
+        return 0
+    if not os.path.isfile(path):
+        print('There is no snapshot at ' + path)
+        return 1
+    corpus = SnapshotCorpus(path)
+    for key, value in sorted(corpus.meta.items()):
+        print(key + ': ' + str(value))
+    corpus.close()
+    return 0
+
+
+def build_parser(config):
+    parser = argparse.ArgumentParser(prog='Sentience.py', description='Sentience command line tools. Run without a command to start the chatbot window.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    index = commands.add_parser('index', help='Build or update the approximate nearest neighbour statement index.')
+    index.add_argument('action', choices=['build', 'add', 'info'])
+    index.add_argument('--database', default=config.get('corpus', 'database'), help='The corpus database. Defaults to [corpus] database in sentience.ini.')
+    index.add_argument('--path', default=None, help='Where to keep the index. Defaults to the database path plus .ann')
+    index.add_argument('--dimensions', type=int, default=128, help='Length of the statement vectors (build only).')
+    index.add_argument('--lists', type=int, default=None, help='Number of buckets (build only). Defaults to the square root of the statement count.')
+    index.set_defaults(func=index_command)
+
+    migrate = commands.add_parser('migrate', help='Bring the corpus database up to the current schema version.')
+    migrate.add_argument('--database', default=config.get('corpus', 'database'), help='The corpus database. Defaults to [corpus] database in sentience.ini.')
+    migrate.add_argument('--time-budget', type=float, default=0, help='Give up after this many seconds. Defaults to 0, no limit.')
+    migrate.set_defaults(func=migrate_command)
+
+    conversations = commands.add_parser('conversations', help='Search the saved conversations or show a users history.')
+    conversations.add_argument('action', choices=['search', 'history', 'sessions'])
+    conversations.add_argument('query', nargs='?', default=None, help='The words to search for (search only).')
+    conversations.add_argument('--raw', action='store_true', help='Treat the query as fts5 syntax, for phrases, OR and NEAR (search only).')
+    conversations.add_argument('--user', default=None, help='Only this username. Required for history.')
+    conversations.add_argument('--limit', type=int, default=50, help='The most turns to print.')
+    conversations.add_argument('--database', default=config.get('conversations', 'database'), help='Defaults to [conversations] database in sentience.ini, or Conversations.db in the data folder.')
+    conversations.set_defaults(func=conversations_command)
+
+    batch = commands.add_parser('batch', help='Answer every line of a file with a pool of worker processes and write the results as JSON lines.')
+    batch.add_argument('file', help='The statements, one per line. User_Statements.txt timestamps are ignored.')
+    batch.add_argument('--output', default='-', help='Where the JSON lines go. Defaults to -, stdout.')
+    batch.add_argument('--workers', type=int, default=None, help='Worker processes. Defaults to one per core.')
+    batch.add_argument('--chunk-size', type=int, default=8, help='Statements handed to a worker at a time.')
+    batch.add_argument('--database', default=None, help='The corpus database. Defaults to [corpus] database in sentience.ini.')
+    batch.add_argument('--matcher', default=None, help='The matcher to use. Defaults to [corpus] matcher in sentience.ini.')
+    batch.set_defaults(func=batch_command)
+
+    train = commands.add_parser('train', help='Train the corpus on reddit comment dumps, RC_YYYY-MM.bz2, .xz, .gz, .zst or plain JSON lines.')
+    train.add_argument('dumps', nargs='+', help='The dump files, trained in the order given.')
+    train.add_argument('--database', default=config.get('corpus', 'database'), help='The corpus database. Defaults to [corpus] database in sentience.ini.')
+    train.add_argument('--batch-size', type=int, default=50000, help='Rows per transaction.')
+    train.add_argument('--min-score', type=int, default=1, help='Leave out comments scored lower than this.')
+    train.add_argument('--max-length', type=int, default=400, help='Leave out comments longer than this.')
+    train.add_argument('--staging-dir', default=None, help='Where the temporary staging database goes. Defaults to the folder of the database.')
+    train.set_defaults(func=train_command)
+
+    ingest = commands.add_parser('ingest', help='Read several months of reddit dumps in parallel and merge them into the corpus.')
+    ingest.add_argument('dumps', nargs='+', help='The dump files, one month each.')
+    ingest.add_argument('--database', default=config.get('corpus', 'database'), help='The corpus database. Defaults to [corpus] database in sentience.ini.')
+    ingest.add_argument('--workers', type=int, default=None, help='Months read at once. Defaults to one per core.')
+    ingest.add_argument('--shard-dir', default=None, help='Where the month shards are written. Defaults to the folder of the database.')
+    ingest.add_argument('--keep-shards', action='store_true', help="Don't delete the shards after the merge.")
+    ingest.add_argument('--batch-size', type=int, default=50000, help='Rows per transaction.')
+    ingest.add_argument('--min-score', type=int, default=1, help='Leave out comments scored lower than this.')
+    ingest.add_argument('--max-length', type=int, default=400, help='Leave out comments longer than this.')
+    ingest.set_defaults(func=ingest_command)
+
+    shard = commands.add_parser('shard', help='Split the corpus into shard databases or list the shards in use.')
+    shard.add_argument('action', choices=['split', 'info'])
+    shard.add_argument('--database', default=config.get('corpus', 'database'), help='The corpus database to split. Defaults to [corpus] database in sentience.ini.')
+    shard.add_argument('--count', type=int, default=4, help='How many shards to split it into (split only).')
+    shard.add_argument('--directory', default='shards', help='Where the shards are written (split only).')
+    shard.set_defaults(func=shard_command)
+
+    snapshot = commands.add_parser('snapshot', help='Write the corpus out as a snapshot for [corpus] in_memory, or show what a snapshot holds.')
+    snapshot.add_argument('action', choices=['build', 'info'])
+    snapshot.add_argument('--database', default=config.get('corpus', 'database'), help='The corpus database. Defaults to [corpus] database in sentience.ini.')
+    snapshot.add_argument('--path', default=config.get('corpus', 'snapshot') or None, help='Where the snapshot goes. Defaults to [corpus] snapshot in sentience.ini, or the database path plus .snapshot')
+    snapshot.set_defaults(func=snapshot_command)
+    return parser
+
+
+def main(argv=None):
+    '''
+    main(argv)
+
+    Parameters
+    ----------
+        param1 : argv
+            The command line arguments, without the program name.
+
+    Returns
+    -------
+        The exit status for sys.exit().
+
+    Notes
+    -----
+        Sentience.py hands its arguments to this before it imports
+        kivy or any of the audio libraries when the first argument is
+        one of COMMANDS. That way the tools run on machines that don't
+        have a display or a microphone.
+    '''
+    config = load_config()
+    arguments = build_parser(config).parse_args(argv)
+    return arguments.func(arguments)
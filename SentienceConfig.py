@@ -0,0 +1,99 @@
+import os
+import configparser
+
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sentience.ini')
+
+DEFAULTS = {
+    'paths': {
+        'data_dir': '',
+    },
+    'corpus': {
+        'database': 'RC_2001-06.db',
+        'matcher': 'index',
+        'shortlist_size': '50',
+        'ann_candidates': '20',
+        'ann_probes': '8',
+        'migration_time_budget': '30',
+        'shards': '',
+        'shard_threads': '4',
+        'in_memory': '0',
+        'snapshot': '',
+    },
+    'storage': {
+        'profile': 'fast',
+        'journal_mode': '',
+        'synchronous': '',
+        'mmap_size': '',
+        'cache_size': '',
+        'temp_store': '',
+    },
+    'worker': {
+        'queue_size': '8',
+        'log_every': '100',
+    },
+    'logging': {
+        'flush_bytes': '65536',
+        'flush_interval': '1.0',
+        'fsync': 'batch',
+    },
+    'transcript': {
+        'window': '2000',
+        'chunk_size': '256',
+    },
+    'export': {
+        'compress': '0',
+    },
+    'conversations': {
+        'database': '',
+    },
+    'profiling': {
+        'mode': 'off',
+        'directory': '',
+        'dump_interval': '0',
+        'sample_interval': '0.005',
+    },
+    'metrics': {
+        'file': '',
+        'interval': '10',
+    },
+    'learning': {
+        'write_behind': '0',
+        'batch_size': '64',
+        'interval': '0.25',
+    },
+    'cache': {
+        'size': '256',
+        'ttl': '600',
+        'log_every': '100',
+    },
+}
+
+
+def load_config(path=CONFIG_FILE):
+    '''
+    load_config(path)
+
+    Parameters
+    ----------
+        param1 : path
+            The settings file to read. Defaults to the sentience.ini
+            that sits next to Sentience.py.
+
+    Returns
+    -------
+        A configparser.ConfigParser() holding DEFAULTS overridden by
+        whatever is in the settings file.
+
+    Notes
+    -----
+        SentienceApp reads sentience.ini through kivy, but it does that
+        after SentienceScreen() has already been built, and the command
+        line tools don't load kivy at all. Anything that's needed before
+        the window exists is read through here instead. Kivy keeps any
+        sections it doesn't know about when it writes the file back out.
+    '''
+    config = configparser.ConfigParser(interpolation=None)
+    config.read_dict(DEFAULTS)
+    config.read(path)
+    return config
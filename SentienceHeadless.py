@@ -0,0 +1,262 @@
+import argparse
+import datetime
+import logging
+import os
+import sys
+from SentienceConfig import load_config
+from SentiencePaths import get_paths
+
+
+COMMAND_HELP = '''Lines that start with a colon are commands:
+    :user NAME    talk as NAME, this starts a new conversation
+    :age AGE      set the age in the user profile
+    :sex SEX      set the sex in the user profile
+    :write        write the conversation to NAME_Conversation.txt
+    :latency      print how long every stage of a turn has taken
+    :cache        print the response cache counters
+    :help         print this
+    :quit         stop, the end of the input does the same'''
+
+
+class SentienceHeadless(object):
+    '''
+    SentienceHeadless(object):
+
+    Parameters
+    ----------
+        param1 : config
+            The configparser from SentienceConfig.load_config().
+
+        param2 : logger
+            Where everything SentienceScreen sends to the kivy Logger
+            goes instead.
+
+    Attributes
+    ----------
+        self.chatbot, self.response_cache, self.log_writer,
+        self.transcript, self.conversation_export,
+        self.conversation_store, self.metrics, self.profiler
+            Built from the same settings, and used the same way, as
+            the ones SentienceScreen and SentienceApp have.
+
+        self.username, self.user_profile
+            Who we're talking to. 'User' until :user says otherwise.
+
+    Members
+    -------
+        def respond(self, words)
+            Logs words, gets the chatbots response, logs that and
+            returns it as a string.
+
+        def command(self, line)
+            Runs one of the colon commands in COMMAND_HELP. Returns the
+            text to print, or None for :quit.
+
+        def run(self, lines, output, prompt)
+            Answers every line of lines on output until they run out
+            or one of them is :quit.
+
+        def set_username(self, value), def set_age(self, value),
+        def set_sex(self, value)
+            What the settings menu does for the window.
+
+        def write_logs(self)
+            Writes the conversation the way the Write Logs button does.
+
+        def close(self)
+            Stops everything the way SentienceApp.on_stop() does.
+
+    Notes
+    -----
+        Sentience.py builds the kivy window and opens pyttsx3 and the
+        microphone before it can answer anything, so it doesn't run on
+        a server or in a script. This is the same chatbot, the same
+        User_Statements.txt and Caprica_Statements.txt, the same
+        transcript, conversation store, latency numbers and profiler,
+        reading statements from stdin or a file and printing the
+        responses. Nothing from kivy or the audio libraries is
+        imported, the chatterbot imports are all that's left of the
+        start up.
+    '''
+
+    def __init__(self, config, logger=None):
+        from CapricaBot import build_chatbot
+        from ConversationExport import ConversationExport
+        from ConversationStore import ConversationStore
+        from CorpusSchema import migrate
+        from LatencyMetrics import LatencyMetrics
+        from LogWriter import LogWriter
+        from ResponseCache import ResponseCache
+        from SessionProfiler import SessionProfiler, profiling_mode
+        from Transcript import Transcript
+
+        self.sentience_config = config
+        self.logger = logger or logging.getLogger(__name__)
+        self.paths = get_paths(config)
+        self.metrics = LatencyMetrics(config.get('metrics', 'file') or self.paths.latency, config.getfloat('metrics', 'interval'), self.logger)
+        self.metrics.start()
+        self.log_writer = LogWriter(config.getint('logging', 'flush_bytes'), config.getfloat('logging', 'flush_interval'), config.get('logging', 'fsync'), self.logger)
+        if not os.path.isdir(self.paths.data_dir):
+            os.makedirs(self.paths.data_dir)
+        migrate(config.get('corpus', 'database'), config.getfloat('corpus', 'migration_time_budget'), lambda line: self.logger.info('Sentience: ' + line))
+        self.chatbot = build_chatbot(config)
+        self.response_cache = ResponseCache(config.getint('cache', 'size'), config.getfloat('cache', 'ttl'), self.logger, config.getint('cache', 'log_every'))
+        self.response_cache.attach(self.chatbot)
+        self.transcript = Transcript(self.paths.transcript_spill, config.getint('transcript', 'window'), config.getint('transcript', 'chunk_size'))
+        self.conversation_export = ConversationExport(config.getboolean('export', 'compress'))
+        self.conversation_store = ConversationStore(config.get('conversations', 'database') or self.paths.conversations, logger=self.logger)
+        self.conversation_store.attach(self.transcript, lambda: self.username)
+        self.user_profile = {1: 'Username', 2: 'Age', 3: 'Sex'}
+        self.username = 'User'
+        self.profiler = SessionProfiler(profiling_mode(config), config.get('profiling', 'directory') or self.paths.data_dir, config.getfloat('profiling', 'dump_interval'), config.getfloat('profiling', 'sample_interval'), self.logger)
+        self.profiler.start()
+
+    def respond(self, words):
+        try:
+            self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + words, self.paths.user_statements)
+            self.transcript.append(self.username, words)
+            with self.metrics.span('get_response'):
+                response = str(self.response_cache.get_response(self.chatbot, words))
+            self.__append_file('\n' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + response, self.paths.caprica_statements)
+            self.transcript.append('Caprica', response)
+            return response
+        except (OSError, RuntimeError, ValueError) as error:
+            self.__log_error('respond', error)
+            return ''
+
+    def command(self, line):
+        name, _, value = line[1:].strip().partition(' ')
+        value = value.strip()
+        if name in ('quit', 'exit', 'q'):
+            return None
+        if name == 'user' and value:
+            self.set_username(value)
+            return 'Talking to ' + value
+        if name == 'age' and value:
+            self.set_age(value)
+            return 'Age: ' + value
+        if name == 'sex' and value:
+            self.set_sex(value)
+            return 'Sex: ' + value
+        if name == 'write':
+            path = self.write_logs()
+            return 'Wrote ' + path if path else 'Could not write the logs, see ' + self.paths.error_log
+        if name == 'latency':
+            return self.metrics.readout()
+        if name == 'cache':
+            stats = self.response_cache.stats()
+            return ' '.join(key + '=' + str(stats[key]) for key in sorted(stats))
+        return COMMAND_HELP
+
+    def run(self, lines, output=sys.stdout, prompt=False):
+        while True:
+            if prompt:
+                output.write(self.username + ': ')
+                output.flush()
+            line = lines.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(':'):
+                reply = self.command(line)
+                if reply is None:
+                    break
+            elif prompt:
+                reply = 'Caprica: ' + self.respond(line)
+            else:
+                reply = self.respond(line)
+            output.write(reply + '\n')
+            output.flush()
+
+    def set_username(self, value):
+        self.user_profile[1] = value
+        self.username = value
+        self.transcript.clear()
+
+    def set_age(self, value):
+        self.user_profile[2] = value
+        self.transcript.clear()
+
+    def set_sex(self, value):
+        self.user_profile[3] = value
+        self.transcript.clear()
+
+    def write_logs(self):
+        path = self.paths.conversation(self.username)
+        try:
+            self.conversation_export.export(path, 'Username: ' + str(self.user_profile[1]) + '\nAge: ' + str(self.user_profile[2]) + '\nSex: ' + str(self.user_profile[3]) + '\n', self.transcript)
+        except (IOError, OSError) as error:
+            self.__log_error('write_logs', error)
+            return None
+        return path
+
+    def close(self):
+        self.chatbot.storage.close()
+        self.log_writer.close()
+        self.conversation_store.close()
+        self.metrics.stop()
+        self.profiler.stop()
+
+    def __append_file(self, words, path):
+        with self.metrics.span('append_file'):
+            self.log_writer.write(path, words)
+
+    def __log_error(self, function, error):
+        self.logger.error('Sentience: ' + function + ': ' + str(error))
+        self.__append_file('\n' + 'Function: ' + function + ' \n' + type(error).__name__ + ': ' + str(error) + '\nDate - Time:' + str(datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')), self.paths.error_log)
+
+
+def main(argv=None):
+    '''
+    main(argv)
+
+    Parameters
+    ----------
+        param1 : argv
+            The command line arguments after --headless.
+
+    Returns
+    -------
+        The exit status for sys.exit().
+
+    Notes
+    -----
+        python Sentience.py --headless talks on the terminal, with a
+        prompt. Anything piped in, or a file given with --input, is
+        answered one response per line and nothing else, so
+            python Sentience.py --headless < questions.txt > answers.txt
+        lines up questions and answers. See COMMAND_HELP for the colon
+        commands. Log messages go to stderr.
+    '''
+    parser = argparse.ArgumentParser(prog='Sentience.py --headless', description='Talk to Caprica without the window, on stdin and stdout or from a file.', epilog=COMMAND_HELP, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default=None, help='Read the statements from this file instead of stdin.')
+    parser.add_argument('--user', default=None, help='The username to talk as. Defaults to User.')
+    parser.add_argument('--age', default=None)
+    parser.add_argument('--sex', default=None)
+    parser.add_argument('--write-logs', action='store_true', help='Write NAME_Conversation.txt when the input ends.')
+    parser.add_argument('--verbose', action='store_true', help='Log at the info level instead of warnings only.')
+    arguments = parser.parse_args(argv)
+
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO if arguments.verbose else logging.WARNING, format='%(levelname)s %(message)s')
+    sentience = SentienceHeadless(load_config(), logging.getLogger('Sentience'))
+    try:
+        if arguments.user:
+            sentience.set_username(arguments.user)
+        if arguments.age:
+            sentience.set_age(arguments.age)
+        if arguments.sex:
+            sentience.set_sex(arguments.sex)
+        if arguments.input is not None:
+            with open(arguments.input) as lines:
+                sentience.run(lines)
+        else:
+            sentience.run(sys.stdin, prompt=sys.stdin.isatty())
+        if arguments.write_logs and sentience.write_logs() is None:
+            return 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sentience.close()
+    return 0
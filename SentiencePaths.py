@@ -0,0 +1,125 @@
+import os
+import sys
+import tempfile
+
+
+DATA_DIR_VARIABLE = 'SENTIENCE_DATA_DIR'
+
+_paths = None
+
+
+def resolve_data_dir(config=None):
+    '''
+    resolve_data_dir(config)
+
+    Parameters
+    ----------
+        param1 : config
+            The configparser from SentienceConfig.load_config(), or None
+            to only look at the environment.
+
+    Returns
+    -------
+        The folder the logs and the conversation store are kept in,
+        ending with a path separator. The first of these that's set
+        wins:
+            $SENTIENCE_DATA_DIR
+            [paths] data_dir in sentience.ini
+            C:\\SentienceFiles\\ on windows
+            ~/.SentienceFiles/ if it already exists
+            $XDG_DATA_HOME/SentienceFiles/
+            ~/.SentienceFiles/
+
+    Notes
+    -----
+        This used to be '/home/' + os.getlogin() + '/.SentienceFiles/'
+        everywhere. os.getlogin() asks for the user logged in on the
+        controlling terminal, which services and containers don't have,
+        so it raised OSError before anything could be logged. The home
+        folder comes from $HOME or the password database instead, and
+        if there's neither we use the temp folder rather than fail.
+    '''
+    directory = os.environ.get(DATA_DIR_VARIABLE, '')
+    if not directory and config is not None and config.has_option('paths', 'data_dir'):
+        directory = config.get('paths', 'data_dir')
+    if not directory and sys.platform.startswith('win'):
+        directory = 'C:\\SentienceFiles'
+    if not directory:
+        home = os.path.expanduser('~')
+        if home.startswith('~'):
+            home = tempfile.gettempdir()
+        legacy = os.path.join(home, '.SentienceFiles')
+        if os.path.isdir(legacy) or not os.environ.get('XDG_DATA_HOME'):
+            directory = legacy
+        else:
+            directory = os.path.join(os.environ['XDG_DATA_HOME'], 'SentienceFiles')
+    return os.path.join(os.path.expanduser(directory), '')
+
+
+class SentiencePaths(object):
+    '''
+    SentiencePaths(object):
+
+    Parameters
+    ----------
+        param1 : data_dir
+            The folder everything below is in.
+
+    Attributes
+    ----------
+        self.data_dir
+            The folder itself, ending with a path separator.
+
+        self.error_log
+            Error Logs.txt
+
+        self.user_statements
+            User_Statements.txt
+
+        self.caprica_statements
+            Caprica_Statements.txt
+
+        self.transcript_spill
+            Transcript.spill, where the Transcript() puts turns that no
+            longer fit in memory.
+
+        self.conversations
+            Conversations.db, the ConversationStore() database.
+
+        self.latency
+            Latency.json, where LatencyMetrics() writes how long every
+            stage of a turn takes.
+
+    Members
+    -------
+        def conversation(self, username)
+            Returns the path of username + '_Conversation.txt'.
+    '''
+
+    def __init__(self, data_dir):
+        self.data_dir = os.path.join(data_dir, '')
+        self.error_log = self.data_dir + 'Error Logs.txt'
+        self.user_statements = self.data_dir + 'User_Statements.txt'
+        self.caprica_statements = self.data_dir + 'Caprica_Statements.txt'
+        self.transcript_spill = self.data_dir + 'Transcript.spill'
+        self.conversations = self.data_dir + 'Conversations.db'
+        self.latency = self.data_dir + 'Latency.json'
+
+    def conversation(self, username):
+        return self.data_dir + str(username) + '_Conversation.txt'
+
+
+def get_paths(config=None):
+    '''
+    get_paths(config)
+
+    Returns
+    -------
+        The SentiencePaths() of resolve_data_dir(config). It's worked
+        out the first time this is called and the same one is returned
+        from then on.
+    '''
+    global _paths
+    if _paths is None:
+        _paths = SentiencePaths(resolve_data_dir(config))
+    return _paths
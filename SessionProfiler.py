@@ -0,0 +1,210 @@
+import cProfile
+import datetime
+import logging
+import marshal
+import os
+import pstats
+import signal
+import sys
+import threading
+from collections import Counter
+
+
+PROFILE_MODES = ('off', 'deterministic', 'sampling')
+
+MODE_VARIABLE = 'SENTIENCE_PROFILE'
+
+
+def profiling_mode(config):
+    '''
+    profiling_mode(config)
+
+    Returns
+    -------
+        $SENTIENCE_PROFILE if it's set, otherwise [profiling] mode.
+
+    Exceptions
+    ----------
+        ValueError
+            Raised if the mode isn't one of PROFILE_MODES.
+    '''
+    mode = os.environ.get(MODE_VARIABLE) or config.get('profiling', 'mode')
+    mode = mode.strip().lower()
+    if mode not in PROFILE_MODES:
+        raise ValueError('Unknown profiling mode ' + mode + '. Use one of ' + ', '.join(PROFILE_MODES))
+    return mode
+
+
+class SessionProfiler(object):
+    '''
+    SessionProfiler(object):
+
+    Parameters
+    ----------
+        param1 : mode
+            off           - nothing is recorded and nothing is written.
+            deterministic - cProfile on the thread that calls start(),
+                            the kivy thread, and on every thread that
+                            calls profile_thread(), the response worker.
+                            Every call is counted, which makes
+                            everything slower while it's on.
+            sampling      - a background thread looks at the stack of
+                            every thread sample_interval seconds apart
+                            and counts what it sees. That includes the
+                            response worker and costs next to nothing.
+
+        param2 : directory
+            Where the dumps are written.
+
+        param3 : dump_interval
+            Dump every this many seconds while running. 0 only dumps on
+            stop() and when the process gets SIGUSR1.
+
+        param4 : sample_interval
+            Seconds between samples in sampling mode.
+
+        param5 : logger
+            Where we say what was written.
+
+    Members
+    -------
+        def start(self)
+            Starts recording and, where there is one, installs the
+            SIGUSR1 handler. Has to be called from the main thread.
+
+        def profile_thread(self)
+            In deterministic mode starts a cProfile of the thread that
+            calls it as well. Does nothing in the other modes, sampling
+            already sees every thread.
+
+        def dump(self)
+            Writes what has been recorded so far to a new timestamped
+            file and returns its path. The cProfiles of every thread
+            are added together into the one file.
+
+        def stop(self)
+            Stops recording and writes a last dump.
+
+    Notes
+    -----
+        SentienceApp used to run cProfile for the whole session and
+        write SentienceProfile.profile into the working directory when
+        it closed. That slowed every call down whether anyone wanted
+        the numbers or not. Now it's off unless [profiling] mode or
+        $SENTIENCE_PROFILE says otherwise, and a running session can be
+        dumped with kill -USR1 <pid> without stopping it.
+
+        Deterministic dumps are SentienceProfile-<time>.profile, the
+        same pstats format as before. Sampling dumps are
+        SentienceProfile-<time>.folded, one 'frame;frame;frame count'
+        line per stack, outermost frame first, which flamegraph.pl and
+        speedscope read as they are.
+    '''
+
+    def __init__(self, mode='off', directory='.', dump_interval=0, sample_interval=0.005, logger=None):
+        if mode not in PROFILE_MODES:
+            raise ValueError('Unknown profiling mode ' + str(mode) + '. Use one of ' + ', '.join(PROFILE_MODES))
+        self.mode = mode
+        self.directory = directory
+        self.dump_interval = float(dump_interval)
+        self.sample_interval = max(0.001, float(sample_interval))
+        self.logger = logger or logging.getLogger(__name__)
+        self.__profilers = []
+        self.__samples = Counter()
+        self.__lock = threading.RLock()
+        self.__stopping = threading.Event()
+        self.__threads = []
+
+    def start(self):
+        if self.mode == 'off':
+            return None
+        if self.dump_interval > 0:
+            self.__start_thread('profile_dumper', self.__dump_periodically)
+        if self.mode == 'deterministic':
+            self.profile_thread()
+        else:
+            self.__start_thread('profile_sampler', self.__sample)
+        if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda number, frame: self.dump())
+        self.logger.info('SessionProfiler: ' + self.mode + ' profiling, dumps go to ' + self.directory)
+
+    def profile_thread(self):
+        if self.mode != 'deterministic' or self.__stopping.is_set():
+            return None
+        profiler = cProfile.Profile()
+        with self.__lock:
+            self.__profilers.append(profiler)
+        profiler.enable()
+        self.logger.info('SessionProfiler: profiling the ' + threading.current_thread().name + ' thread')
+
+    def dump(self):
+        if self.mode == 'off':
+            return None
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        if self.mode == 'deterministic':
+            path = os.path.join(self.directory, 'SentienceProfile-' + stamp + '.profile')
+            # dump_stats() would turn the profiler off, this is the same
+            # thing without that so a periodic dump doesn't end it.
+            with self.__lock:
+                stats = {}
+                for profiler in self.__profilers:
+                    profiler.snapshot_stats()
+                    for function, numbers in profiler.stats.items():
+                        stats[function] = pstats.add_func_stats(stats[function], numbers) if function in stats else numbers
+                with open(path, 'wb') as out:
+                    marshal.dump(stats, out)
+        else:
+            path = os.path.join(self.directory, 'SentienceProfile-' + stamp + '.folded')
+            with self.__lock:
+                samples = sorted(self.__samples.items(), key=lambda item: -item[1])
+            with open(path, 'w') as out:
+                out.write(''.join(stack + ' ' + str(count) + '\n' for stack, count in samples))
+        self.logger.info('SessionProfiler: wrote ' + path)
+        return path
+
+    def stop(self):
+        if self.mode == 'off':
+            return None
+        self.__stopping.set()
+        for thread in self.__threads:
+            thread.join(1.0)
+        with self.__lock:
+            for profiler in self.__profilers:
+                profiler.disable()
+        return self.dump()
+
+    def __start_thread(self, name, target):
+        thread = threading.Thread(name=name, target=target)
+        thread.daemon = True
+        thread.start()
+        self.__threads.append(thread)
+
+    def __sample(self):
+        ours = set(thread.ident for thread in self.__threads)
+        ours.add(threading.get_ident())
+        names = {}
+        while not self.__stopping.wait(self.sample_interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                if ident in ours:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(code.co_name + ' (' + os.path.basename(code.co_filename) + ':' + str(code.co_firstlineno) + ')')
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                stacks.append(';'.join(reversed(stack)))
+            with self.__lock:
+                self.__samples.update(stacks)
+
+    def __dump_periodically(self):
+        while not self.__stopping.wait(self.dump_interval):
+            try:
+                self.dump()
+            except (IOError, OSError) as error:
+                self.logger.error('SessionProfiler: could not dump: ' + str(error))
@@ -85,4 +85,11 @@ my_settings = json.dumps([
         "section": "settings_menu",
         "key": "write_user_data"
     },
+    {
+        "type": "string",
+        "title": "Show Latency",
+        "desc": "To see how long each part of a turn has been taking, listening, recognizing your voice, finding a response, logging it and speaking it, type 'show latency' into this box and click okay. The numbers are shown in the 'Conversation log' box in milliseconds. p50 is a typical turn, p95 and p99 are the slow ones. The same numbers are written to Latency.json every few seconds.",
+        "section": "settings_menu",
+        "key": "show_latency"
+    },
 ])
@@ -0,0 +1,362 @@
+import glob
+import os
+import sqlite3
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+from chatterbot.conversation import Response, Statement
+from ResponseCache import normalize
+from StatementIndex import IndexedSQLStorageAdapter, StatementIndex, tokenize
+from StorageProfile import open_engine
+
+
+def shard_for(words, count):
+    '''
+    shard_for(words, count)
+
+    Returns
+    -------
+        Which of count shards the statement words belongs in. It's a
+        crc32 of the normalized text rather than hash(), which is
+        different in every python process.
+    '''
+    return zlib.crc32(normalize(words).encode('utf-8')) % count
+
+
+def expand_shards(value, exclude=None):
+    '''
+    expand_shards(value, exclude)
+
+    Parameters
+    ----------
+        param1 : value
+            [corpus] shards, a comma separated list of database paths
+            and globs like shards/RC_*.db.
+
+        param2 : exclude
+            A path to leave out, the main database, so a glob that
+            happens to match it doesn't search it twice.
+
+    Returns
+    -------
+        The shard paths, globs expanded and sorted, every one once.
+    '''
+    paths = []
+    for part in str(value or '').split(','):
+        part = os.path.expanduser(part.strip())
+        if not part:
+            continue
+        for path in sorted(glob.glob(part)) if glob.has_magic(part) else [part]:
+            path = os.path.abspath(path)
+            if path not in paths and (exclude is None or path != os.path.abspath(exclude)):
+                paths.append(path)
+    return paths
+
+
+class Shard(object):
+    '''
+    Shard(object):
+
+    Parameters
+    ----------
+        param1 : path
+            A chatterbot database, a month from 'python Sentience.py
+            train' or one of the files 'python Sentience.py shard
+            split' wrote.
+
+        param2 : pragmas
+            The dictionary from StorageProfile.profile_pragmas().
+
+        param3 : shortlist_size
+            The most candidates scored_candidates() returns.
+
+    Attributes
+    ----------
+        self.statement_count
+            How many statements the shard has. Shards are only ever
+            read, so it's counted once.
+
+    Members
+    -------
+        def scored_candidates(self, words)
+            StatementIndex.scored_candidates() on this shard.
+
+        def responses(self, words)
+            Returns (response text, occurrence) for every response to
+            the statement words in this shard.
+
+        def close(self)
+            Closes the connections.
+
+    Notes
+    -----
+        A shard without a statement_token index is given one the first
+        time it's opened, that's the only time it's written to.
+    '''
+
+    def __init__(self, path, pragmas, shortlist_size=50):
+        if not os.path.isfile(path):
+            raise IOError('There is no shard at ' + path)
+        self.path = path
+        self.engine = open_engine('sqlite:///' + path, pragmas)
+        self.index = StatementIndex(self.engine, shortlist_size)
+        if not self.index.exists():
+            self.index.build()
+        with self.engine.connect() as connection:
+            self.statement_count = connection.execute(text('SELECT COUNT(*) FROM statement')).scalar()
+
+    def scored_candidates(self, words):
+        return self.index.scored_candidates(words)
+
+    def responses(self, words):
+        with self.engine.connect() as connection:
+            return connection.execute(text(
+                'SELECT statement_text, SUM(occurrence) FROM response '
+                'WHERE text = :text GROUP BY statement_text ORDER BY MIN(id)'), {'text': words}).fetchall()
+
+    def close(self):
+        self.engine.dispose()
+
+
+class ShardedStatementIndex(object):
+    '''
+    ShardedStatementIndex(object):
+
+    Parameters
+    ----------
+        param1 : primary
+            The StatementIndex() of the main database.
+
+        param2 : shards
+            The Shard() objects.
+
+        param3 : shortlist_size
+            The most candidates candidates() returns.
+
+        param4 : executor
+            The thread pool the shards are asked from.
+
+    Members
+    -------
+        def exists(self), def build(self), def add(self, texts)
+            The same as the main databases StatementIndex(), learning
+            only ever goes in the main database.
+
+        def candidates(self, words), def scored_candidates(self, words)
+            Every database is asked for its shortlist at the same time.
+            The shortlists are merged on the number of tokens each
+            statement shares with words, a statement that's in several
+            of them keeping its best, and the top shortlist_size are
+            returned.
+
+    Notes
+    -----
+        It stands in for the StatementIndex() of the storage adapter,
+        so IndexedBestMatch works on a sharded corpus unchanged.
+    '''
+
+    def __init__(self, primary, shards, shortlist_size, executor):
+        self.primary = primary
+        self.shards = shards
+        self.shortlist_size = shortlist_size
+        self.executor = executor
+
+    def exists(self):
+        return self.primary.exists()
+
+    def build(self):
+        return self.primary.build()
+
+    def add(self, texts):
+        return self.primary.add(texts)
+
+    def candidates(self, words):
+        return [match for match, shared in self.scored_candidates(words)]
+
+    def scored_candidates(self, words):
+        if len(tokenize(words)) <= 0:
+            return []
+        futures = [self.executor.submit(shard.scored_candidates, words) for shard in self.shards]
+        best = {}
+        for shortlist in [self.primary.scored_candidates(words)] + [future.result() for future in futures]:
+            for match, shared in shortlist:
+                if shared > best.get(match, 0):
+                    best[match] = shared
+        return sorted(best.items(), key=lambda item: -item[1])[:self.shortlist_size]
+
+
+class ShardedStorageAdapter(IndexedSQLStorageAdapter):
+    '''
+    ShardedStorageAdapter(IndexedSQLStorageAdapter):
+
+    Parameters
+    ----------
+        param1 : **kwargs
+            Everything IndexedSQLStorageAdapter takes, plus
+            shard_databases, the list of shard paths, and
+            shard_threads, how many shards are queried at once.
+
+    Attributes
+    ----------
+        self.shards
+            The Shard() objects.
+
+        self.statement_index
+            A ShardedStatementIndex() over the main database and every
+            shard.
+
+    Members
+    -------
+        def count(self)
+            Statements in the main database and every shard.
+
+        def filter(self, **kwargs)
+            filter(in_response_to__contains=text), which BestMatch uses
+            to find the responses to its closest match, asks every
+            shard as well as the main database and merges what they
+            return. Everything else only looks at the main database.
+
+        def close(self)
+            Stops the thread pool and closes the shards.
+
+    Notes
+    -----
+        One database doesn't scale to years of reddit. With [corpus]
+        shards set the corpus is the main database plus any number of
+        read only shard databases. A month trained with
+        'python Sentience.py train RC_2015-01.bz2 --database
+        shards/RC_2015-01.db' is added by putting it in [corpus]
+        shards, or in the folder a glob there points at, and nothing
+        else has to be rebuilt. 'python Sentience.py shard split'
+        spreads one big database over N shards by the hash of the
+        normalized prompt text instead.
+
+        Each query asks every shard at the same time from a thread
+        pool. sqlite lets go of the GIL while it runs a query, so the
+        shards really are searched in parallel and a query takes about
+        as long as the slowest shard rather than all of them added up.
+
+        Learning, conversations and get_random() stay in the main
+        database. Only the index matcher searches the shards, so
+        CapricaBot.build_chatbot() won't use them with any other.
+    '''
+
+    def __init__(self, **kwargs):
+        super(ShardedStorageAdapter, self).__init__(**kwargs)
+        shortlist_size = self.kwargs.get('index_shortlist_size', 50)
+        pragmas = self.kwargs.get('sqlite_pragmas') or {}
+        self.shards = [Shard(path, pragmas, shortlist_size) for path in self.kwargs.get('shard_databases', [])]
+        self.executor = ThreadPoolExecutor(max(1, int(self.kwargs.get('shard_threads', 4))), 'shard')
+        self.statement_index = ShardedStatementIndex(self.statement_index, self.shards, shortlist_size, self.executor)
+        self.logger.info('ShardedStorageAdapter: ' + str(len(self.shards)) + ' shards, ' + str(sum(shard.statement_count for shard in self.shards)) + ' statements')
+
+    def count(self):
+        return super(ShardedStorageAdapter, self).count() + sum(shard.statement_count for shard in self.shards)
+
+    def filter(self, **kwargs):
+        if list(kwargs) != ['in_response_to__contains'] or len(self.shards) <= 0:
+            return super(ShardedStorageAdapter, self).filter(**kwargs)
+        words = kwargs['in_response_to__contains']
+        futures = [self.executor.submit(shard.responses, words) for shard in self.shards]
+        merged = OrderedDict((statement.text, statement) for statement in super(ShardedStorageAdapter, self).filter(**kwargs))
+        for future in futures:
+            for statement_text, occurrence in future.result():
+                statement = merged.get(statement_text)
+                if statement is None:
+                    merged[statement_text] = Statement(statement_text, in_response_to=[Response(words, occurrence=occurrence)])
+                    continue
+                for response in statement.in_response_to:
+                    if response.text == words:
+                        response.occurrence += occurrence
+                        break
+                else:
+                    statement.in_response_to.append(Response(words, occurrence=occurrence))
+        return list(merged.values())
+
+    def close(self):
+        super(ShardedStorageAdapter, self).close()
+        self.executor.shutdown(wait=False)
+        for shard in self.shards:
+            shard.close()
+
+
+def split_corpus(database, count, directory, report=None):
+    '''
+    split_corpus(database, count, directory, report)
+
+    Parameters
+    ----------
+        param1 : database
+            The chatterbot database to split. It isn't changed.
+
+        param2 : count
+            How many shards to write.
+
+        param3 : directory
+            Where they go, as shard-0.db to shard-N.db.
+
+        param4 : report
+            An optional function that's called with a line of progress
+            text for every shard.
+
+    Returns
+    -------
+        The paths of the shards.
+
+    Notes
+    -----
+        Every response goes in the shard of shard_for() its prompt,
+        response.text, along with the statements on both sides of it.
+        That keeps everything BestMatch needs about a statement in one
+        shard: the statement is indexed there and all of its responses
+        are there. A statement that's on neither side of any response
+        goes in the shard of its own text. Tags and conversations
+        aren't copied, the main database keeps those.
+    '''
+    from CorpusSchema import migrate
+    from RedditTrainer import create_corpus
+
+    report = report or (lambda line: None)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    paths = []
+    connection = sqlite3.connect(database, isolation_level=None)
+    try:
+        connection.create_function('shard_for', 1, lambda words: shard_for(words, count), deterministic=True)
+        for number in range(count):
+            path = os.path.join(directory, 'shard-' + str(number) + '.db')
+            if os.path.exists(path):
+                os.remove(path)
+            create_corpus(path)
+            connection.execute('ATTACH DATABASE ? AS shard', (path,))
+            try:
+                connection.execute('BEGIN')
+                connection.execute(
+                    'INSERT INTO shard.response (text, created_at, occurrence, statement_text) '
+                    'SELECT text, created_at, occurrence, statement_text FROM main.response WHERE shard_for(text) = ?', (number,))
+                connection.execute(
+                    'INSERT INTO shard.statement (text, extra_data) '
+                    'SELECT text, extra_data FROM main.statement WHERE text IN ('
+                    'SELECT text FROM shard.response UNION SELECT statement_text FROM shard.response)')
+                connection.execute(
+                    'INSERT OR IGNORE INTO shard.statement (text, extra_data) '
+                    'SELECT text, extra_data FROM main.statement WHERE shard_for(text) = ? '
+                    'AND text NOT IN (SELECT text FROM main.response) '
+                    'AND text NOT IN (SELECT statement_text FROM main.response)', (number,))
+                connection.execute('COMMIT')
+            finally:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                connection.execute('DETACH DATABASE shard')
+            migrate(path, 0)
+            engine = open_engine('sqlite:///' + path, {})
+            try:
+                StatementIndex(engine).build()
+            finally:
+                engine.dispose()
+            paths.append(path)
+            report('Wrote ' + path)
+    finally:
+        connection.close()
+    return paths
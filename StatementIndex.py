@@ -0,0 +1,411 @@
+import re
+from sqlalchemy import text, bindparam
+from collections import OrderedDict
+from chatterbot.conversation import Statement
+from chatterbot.logic import BestMatch
+from chatterbot.storage import SQLStorageAdapter
+from sqlalchemy.orm import sessionmaker
+from StorageProfile import open_engine
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'do', 'for',
+    'if', 'in', 'is', 'it', 'of', 'on', 'or', 'so', 'the', 'to', 'was',
+    'with'
+])
+
+
+def tokenize(words):
+    '''
+    tokenize(words)
+
+    Parameters
+    ----------
+        param1 : words
+            The string that we want to split into index tokens.
+
+    Returns
+    -------
+        A set of lower case word tokens. Common stop words are
+        removed unless the statement is made up of nothing but
+        stop words (Ie, "Who are you"), in which case we keep
+        them so that short statements can still be found.
+    '''
+    tokens = set(TOKEN_PATTERN.findall(str(words).lower()))
+    content_tokens = tokens - STOP_WORDS
+    if len(content_tokens) > 0:
+        return content_tokens
+    return tokens
+
+
+class StatementIndex(object):
+    '''
+    StatementIndex(object):
+
+    Parameters
+    ----------
+        param1 : engine
+            The SQLAlchemy engine of the storage adapter. The index
+            lives in the same database as the statements so it is
+            saved and loaded along with the corpus.
+
+        param2 : shortlist_size
+            The maximum number of candidate statements that
+            self.candidates() hands back to the logic adapter.
+
+    Attributes
+    ----------
+        self.engine
+            The SQLAlchemy engine that we run all of our queries on.
+
+        self.shortlist_size
+            See param2.
+
+    Members
+    -------
+        def exists(self)
+            Returns True if the statement_token table is present.
+
+        def build(self)
+            Creates the statement_token table and fills it from every
+            statement that has a known response.
+
+        def add(self, texts)
+            Adds the statements whose text is in texts to the index.
+
+        def candidates(self, words)
+            Returns the text of the statements that share the most
+            tokens with words.
+
+        def scored_candidates(self, words)
+            The same, as (text, tokens shared) pairs.
+
+    Notes
+    -----
+        BestMatch compares the users input against every statement
+        that has a known response. That's fine for the starter
+        database but it's linear in the size of the corpus. The index
+        maps each token to the ids of the statements that contain it,
+        so we only have to compare the input against the handful of
+        statements that actually share words with it.
+    '''
+
+    def __init__(self, engine, shortlist_size=50):
+        self.engine = engine
+        self.shortlist_size = shortlist_size
+
+    def exists(self):
+        '''
+        exists(self)
+
+        Returns
+        -------
+            True if the statement_token table has been created.
+        '''
+        return self.engine.dialect.has_table(self.engine, 'statement_token')
+
+    def build(self):
+        '''
+        build(self)
+
+        Notes
+        -----
+            Only statements whose text appears in response.text are
+            indexed. Those are the statements that BestMatch can pick
+            as a closest match, everything else has no response to
+            give back to the user.
+        '''
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                'CREATE TABLE IF NOT EXISTS statement_token ('
+                'token VARCHAR(64) NOT NULL, '
+                'statement_id INTEGER NOT NULL, '
+                'PRIMARY KEY (token, statement_id))'))
+            rows = connection.execute(text(
+                'SELECT id, text FROM statement '
+                'WHERE text IN (SELECT text FROM response)')).fetchall()
+            self.__insert(connection, rows)
+
+    def add(self, texts):
+        '''
+        add(self, texts)
+
+        Parameters
+        ----------
+            param1 : texts
+                A list of statement texts that have just become
+                response statements. Texts that are already indexed
+                are ignored.
+        '''
+        if len(texts) <= 0:
+            return None
+        query = text('SELECT id, text FROM statement WHERE text IN :texts')
+        query = query.bindparams(bindparam('texts', expanding=True))
+        with self.engine.begin() as connection:
+            rows = connection.execute(query, {'texts': list(texts)}).fetchall()
+            self.__insert(connection, rows)
+
+    def candidates(self, words):
+        '''
+        candidates(self, words)
+
+        Parameters
+        ----------
+            param1 : words
+                The users input statement text.
+
+        Returns
+        -------
+            A list of up to self.shortlist_size statement texts,
+            ordered by the number of tokens they share with words.
+        '''
+        return [match for match, shared in self.scored_candidates(words)]
+
+    def scored_candidates(self, words):
+        '''
+        scored_candidates(self, words)
+
+        Returns
+        -------
+            The statements candidates() would return as a list of
+            (text, number of tokens shared with words). ShardedStorage
+            uses the number to merge the shortlists of several
+            databases.
+        '''
+        tokens = tokenize(words)
+        if len(tokens) <= 0:
+            return []
+        query = text(
+            'SELECT statement.text, COUNT(*) FROM statement_token '
+            'JOIN statement ON statement.id = statement_token.statement_id '
+            'WHERE statement_token.token IN :tokens '
+            'GROUP BY statement_token.statement_id '
+            'ORDER BY COUNT(*) DESC LIMIT :limit')
+        query = query.bindparams(bindparam('tokens', expanding=True))
+        with self.engine.connect() as connection:
+            rows = connection.execute(query, {'tokens': list(tokens), 'limit': self.shortlist_size}).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def __insert(self, connection, rows):
+        postings = []
+        for statement_id, statement_text in rows:
+            for token in tokenize(statement_text):
+                postings.append({'token': token, 'statement_id': statement_id})
+        if len(postings) > 0:
+            connection.execute(text(
+                'INSERT OR IGNORE INTO statement_token (token, statement_id) '
+                'VALUES (:token, :statement_id)'), postings)
+
+
+class IndexedSQLStorageAdapter(SQLStorageAdapter):
+    '''
+    IndexedSQLStorageAdapter(SQLStorageAdapter):
+
+    Parameters
+    ----------
+        param1 : **kwargs
+            The same keyword arguments that ChatBot() passes to the
+            SQLStorageAdapter. index_shortlist_size can be supplied to
+            change how many candidates the index returns.
+            sqlite_pragmas, the dictionary from
+            StorageProfile.profile_pragmas(), switches the engine to
+            pooled connections that run those pragmas when they open.
+            learning_write_behind, learning_batch_size and
+            learning_interval turn on a LearningQueue() for everything
+            the chatbot learns, see [learning] in sentience.ini.
+
+    Attributes
+    ----------
+        self.statement_index
+            Our StatementIndex() object. It's built the first time
+            this adapter opens a database that doesn't have one.
+
+        self.update_listeners
+            A list of functions that are called with the text of any
+            statements that have just become response statements. Logic
+            adapters that keep their own copy of the corpus (Ie,
+            TfidfMatch.TfidfBestMatch) register themselves here.
+
+        self.learning_queue
+            The LearningQueue() learning goes through, or None when
+            it's written straight to the database.
+
+    Members
+    -------
+        def update(self, statement)
+            Saves the statement like SQLStorageAdapter does and then
+            adds any newly learned response statements to the index.
+
+        def find(self, statement_text), def filter(self, **kwargs)
+        def add_to_conversation(self, conversation_id, statement, response)
+        def get_latest_response(self, conversation_id)
+            Go through the learning queue when there is one, so what's
+            waiting to be committed is seen as if it already had been.
+
+        def close(self)
+            Commits whatever the learning queue still has waiting.
+    '''
+
+    def __init__(self, **kwargs):
+        super(IndexedSQLStorageAdapter, self).__init__(**kwargs)
+        pragmas = self.kwargs.get('sqlite_pragmas')
+        if pragmas and self.database_uri.startswith('sqlite:///'):
+            self.engine.dispose()
+            self.engine = open_engine(self.database_uri, pragmas)
+            self.Session = sessionmaker(bind=self.engine, expire_on_commit=True)
+        self.statement_index = StatementIndex(self.engine, self.kwargs.get('index_shortlist_size', 50))
+        self.update_listeners = []
+        if not self.statement_index.exists():
+            self.statement_index.build()
+        self.learning_queue = None
+        if self.kwargs.get('learning_write_behind') and not self.read_only:
+            from LearningQueue import LearnedStatementIndex, LearningQueue
+            self.learning_queue = LearningQueue(self.engine,
+                                                self.kwargs.get('learning_batch_size', 64),
+                                                self.kwargs.get('learning_interval', 0.25),
+                                                self.logger)
+            self.statement_index = LearnedStatementIndex(self.statement_index, self.learning_queue)
+
+    def update(self, statement):
+        '''
+        update(self, statement)
+
+        Notes
+        -----
+            When the chatbot learns, statement.in_response_to holds the
+            text of the chatbots previous response. That text is now a
+            statement with a known response, so it goes in the index.
+        '''
+        if self.learning_queue is None:
+            super(IndexedSQLStorageAdapter, self).update(statement)
+        elif statement:
+            self.learning_queue.update(statement)
+        if statement and not self.read_only:
+            texts = [response.text for response in statement.in_response_to]
+            if self.learning_queue is None:
+                self.statement_index.add(texts)
+            for listener in self.update_listeners:
+                listener(texts)
+
+    def add_to_conversation(self, conversation_id, statement, response):
+        if self.learning_queue is None:
+            return super(IndexedSQLStorageAdapter, self).add_to_conversation(conversation_id, statement, response)
+        self.learning_queue.add_to_conversation(conversation_id, statement, response)
+
+    def get_latest_response(self, conversation_id):
+        if self.learning_queue is not None:
+            latest = self.learning_queue.latest_response(conversation_id)
+            if latest is not None:
+                return latest
+        return super(IndexedSQLStorageAdapter, self).get_latest_response(conversation_id)
+
+    def filter(self, **kwargs):
+        '''
+        filter(self, **kwargs)
+
+        Notes
+        -----
+            filter(in_response_to__contains=text), which BestMatch uses
+            to find the responses to its closest match, has the learned
+            responses that are still in the queue added to what the
+            database returns.
+        '''
+        if self.learning_queue is None or list(kwargs) != ['in_response_to__contains']:
+            return super(IndexedSQLStorageAdapter, self).filter(**kwargs)
+        from LearningQueue import merge_responses
+        words = kwargs['in_response_to__contains']
+        learned = self.learning_queue.responses(words)
+        merged = OrderedDict((statement.text, statement) for statement in super(IndexedSQLStorageAdapter, self).filter(**kwargs))
+        for statement_text, occurrence in learned.items():
+            merge_responses(merged.setdefault(statement_text, Statement(statement_text)), {words: occurrence})
+        return list(merged.values())
+
+    def find(self, statement_text):
+        if self.learning_queue is None:
+            return super(IndexedSQLStorageAdapter, self).find(statement_text)
+        return self.learning_queue.statement(statement_text, lambda: super(IndexedSQLStorageAdapter, self).find(statement_text))
+
+    def close(self):
+        if self.learning_queue is not None:
+            self.learning_queue.close()
+
+
+class IndexedBestMatch(BestMatch):
+    '''
+    IndexedBestMatch(BestMatch):
+
+    Members
+    -------
+        def get_candidates(self, input_statement)
+            Returns the text of the statements that get() should
+            compare against the input, or None if there is no index
+            to ask. Adapters with a different index override this.
+
+        def get(self, input_statement)
+            Works the same as BestMatch.get() except the statements
+            that are compared come from self.get_candidates() instead
+            of the entire statement table.
+
+        def process(self, input_statement)
+            Works the same as BestMatch.process() except the response
+            remembers the text of the statement it was picked for in
+            response.closest_match_text. ResponseCache uses it to know
+            which cached responses go stale when that statement learns
+            a new response.
+
+    Notes
+    -----
+        If the storage adapter doesn't have a statement_index we fall
+        back to BestMatch.get() so this adapter is always safe to use.
+    '''
+
+    def get_candidates(self, input_statement):
+        statement_index = getattr(self.chatbot.storage, 'statement_index', None)
+        if statement_index is None:
+            return None
+        return statement_index.candidates(input_statement.text)
+
+    def get(self, input_statement):
+        candidates = self.get_candidates(input_statement)
+        if candidates is None:
+            return super(IndexedBestMatch, self).get(input_statement)
+
+        statement_list = [Statement(match) for match in candidates]
+
+        if not statement_list:
+            if self.chatbot.storage.count():
+                self.logger.info('No indexed statements are close to the input. Choosing a random response to return.')
+                random_response = self.chatbot.storage.get_random()
+                random_response.confidence = 0
+                return random_response
+            else:
+                raise self.EmptyDatasetException()
+
+        closest_match = input_statement
+        closest_match.confidence = 0
+
+        for statement in statement_list:
+            confidence = self.compare_statements(input_statement, statement)
+            if confidence > closest_match.confidence:
+                statement.confidence = confidence
+                closest_match = statement
+
+        return closest_match
+
+    def process(self, input_statement):
+        closest_match = self.get(input_statement)
+        self.logger.info('Using "{}" as a close match to "{}"'.format(input_statement.text, closest_match.text))
+
+        response_list = self.chatbot.storage.filter(in_response_to__contains=closest_match.text)
+
+        if response_list:
+            response = self.select_response(input_statement, response_list)
+            response.confidence = closest_match.confidence
+            response.closest_match_text = closest_match.text
+        else:
+            self.logger.info('No response to "{}" found. Selecting a random response.'.format(closest_match.text))
+            response = self.chatbot.storage.get_random()
+            response.confidence = 0
+        return response
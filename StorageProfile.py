@@ -0,0 +1,123 @@
+import re
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+
+# journal_mode has to come first, the rest don't care about order.
+PRAGMAS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store')
+
+PROFILES = {
+    # Whatever chatterbot does on its own, WAL with synchronous NORMAL
+    # and a new connection for every query.
+    'default': {},
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': '268435456',
+        'cache_size': '-65536',
+        'temp_store': 'MEMORY',
+    },
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'mmap_size': '268435456',
+        'cache_size': '-16384',
+        'temp_store': 'MEMORY',
+    },
+    # Only for building a corpus that can be rebuilt if the machine
+    # dies half way through. Never for the database we chat with.
+    'bulk': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'mmap_size': '1073741824',
+        'cache_size': '-262144',
+        'temp_store': 'MEMORY',
+    },
+}
+
+PRAGMA_VALUE = re.compile(r'^-?[A-Za-z0-9]+$')
+
+
+def profile_pragmas(config):
+    '''
+    profile_pragmas(config)
+
+    Parameters
+    ----------
+        param1 : config
+            The ConfigParser returned by SentienceConfig.load_config().
+
+    Returns
+    -------
+        A dictionary of pragma name to value for the [storage] profile,
+        with any of the pragmas that are set in [storage] replacing the
+        profiles own value.
+
+    Exceptions
+    ----------
+        ValueError
+            Raised if the profile isn't one of PROFILES or a pragma
+            value isn't a plain word or number.
+    '''
+    name = config.get('storage', 'profile')
+    if name not in PROFILES:
+        raise ValueError('Unknown storage profile ' + name + ' in sentience.ini. Use one of ' + ', '.join(sorted(PROFILES)))
+    pragmas = dict(PROFILES[name])
+    for pragma in PRAGMAS:
+        value = config.get('storage', pragma, fallback='').strip()
+        if len(value) > 0:
+            pragmas[pragma] = value
+    for pragma, value in pragmas.items():
+        if not PRAGMA_VALUE.match(value):
+            raise ValueError('Bad value ' + value + ' for ' + pragma + ' in the [storage] section of sentience.ini')
+    return pragmas
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    for pragma in PRAGMAS:
+        if pragma in pragmas:
+            cursor.execute('PRAGMA ' + pragma + ' = ' + pragmas[pragma])
+    cursor.close()
+
+
+def open_engine(database_uri, pragmas, pool_size=4):
+    '''
+    open_engine(database_uri, pragmas, pool_size)
+
+    Parameters
+    ----------
+        param1 : database_uri
+            A sqlite:/// SQLAlchemy database uri.
+
+        param2 : pragmas
+            The dictionary returned by profile_pragmas().
+
+        param3 : pool_size
+            How many connections we keep open.
+
+    Returns
+    -------
+        A SQLAlchemy engine that runs the pragmas on every new
+        connection.
+
+    Notes
+    -----
+        SQLAlchemy opens a new connection to a sqlite file for every
+        query by default, which throws away the page cache and the
+        memory map each time. Here the connections are pooled so
+        cache_size and mmap_size actually get to do something. The pool
+        never hands one connection to two threads at once, so it's
+        safe to turn off sqlite's same thread check.
+    '''
+    engine = create_engine(database_uri,
+                           convert_unicode=True,
+                           poolclass=QueuePool,
+                           pool_size=pool_size,
+                           connect_args={'check_same_thread': False})
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+    return engine
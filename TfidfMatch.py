@@ -0,0 +1,239 @@
+import math
+import threading
+import numpy
+from scipy import sparse
+from sqlalchemy import text
+from chatterbot.conversation import Statement
+from StatementIndex import TOKEN_PATTERN, IndexedBestMatch
+
+
+class TfidfBestMatch(IndexedBestMatch):
+    '''
+    TfidfBestMatch(IndexedBestMatch):
+
+    Parameters
+    ----------
+        param1 : **kwargs
+            The keyword arguments that ChatBot() passes to every logic
+            adapter. tfidf_rebuild_threshold can be supplied to change
+            how many learned statements we collect before the matrix
+            is rebuilt.
+
+    Attributes
+    ----------
+        self.vocabulary
+            A dictionary mapping each token to its row in
+            self.term_matrix.
+
+        self.idf
+            A numpy array holding the inverse document frequency of
+            every token in self.vocabulary.
+
+        self.term_matrix
+            A scipy CSR matrix with one row per token and one column
+            per response statement. Each column is the L2 normalised
+            TF-IDF vector of the statement in self.texts at the same
+            position.
+
+        self.texts
+            The text of every response statement in the matrix.
+
+        self.pending
+            Statements that have been learned since the matrix was
+            built. They're scored one at a time until there are enough
+            of them to make a rebuild worth it. The rebuild then runs
+            on a thread of its own and the new matrix is swapped in
+            when it's done, so no response waits for it.
+
+    Members
+    -------
+        def build(self)
+            Reads every response statement out of the storage adapter
+            and computes self.term_matrix.
+
+        def learn(self, texts)
+            Called by the storage adapter when new response statements
+            have been saved.
+
+        def get(self, input_statement)
+            Returns the response statement with the highest cosine
+            similarity to the input statement.
+
+    Notes
+    -----
+        We only borrow process() from IndexedBestMatch, get() is our
+        own and never asks the token index for candidates.
+
+        To use this in place of BestMatch replace
+        'StatementIndex.IndexedBestMatch' in the logic_adapters list of
+        ChatBot() with 'TfidfMatch.TfidfBestMatch'. Scoring a statement
+        is a single sparse dot product that only touches the matrix
+        rows of the tokens in the input, so the cost of a response
+        grows with the number of statements that share words with the
+        input rather than with the size of the whole corpus.
+    '''
+
+    def __init__(self, **kwargs):
+        super(TfidfBestMatch, self).__init__(**kwargs)
+        self.rebuild_threshold = kwargs.get('tfidf_rebuild_threshold', 500)
+        self.vocabulary = {}
+        self.idf = numpy.zeros(0)
+        self.term_matrix = None
+        self.texts = []
+        self.pending = []
+        self.__known = set()
+        self.__rebuild = None
+        self.__lock = threading.RLock()
+
+    def set_chatbot(self, chatbot):
+        super(TfidfBestMatch, self).set_chatbot(chatbot)
+        listeners = getattr(chatbot.storage, 'update_listeners', None)
+        if listeners is not None:
+            listeners.append(self.learn)
+
+    def build(self):
+        '''
+        build(self)
+
+        Notes
+        -----
+            We use a sublinear term frequency (1 + log(tf)) and a
+            smoothed idf, the same weighting most TF-IDF
+            implementations default to.
+        '''
+        with self.chatbot.storage.engine.connect() as connection:
+            rows = connection.execute(text(
+                'SELECT text FROM statement '
+                'WHERE text IN (SELECT text FROM response)')).fetchall()
+        texts = [row[0] for row in rows]
+
+        vocabulary = {}
+        row_ids = []
+        column_ids = []
+        weights = []
+        for column, statement_text in enumerate(texts):
+            counts = {}
+            for token in TOKEN_PATTERN.findall(statement_text.lower()):
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                row_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                column_ids.append(column)
+                weights.append(1.0 + math.log(count))
+
+        term_matrix = sparse.csr_matrix(
+            (numpy.array(weights, dtype=numpy.float32), (row_ids, column_ids)),
+            shape=(len(vocabulary), len(texts)))
+        document_frequency = numpy.diff(term_matrix.indptr)
+        idf = numpy.log((1.0 + len(texts)) / (1.0 + document_frequency)) + 1.0
+        term_matrix = sparse.diags(idf.astype(numpy.float32)).dot(term_matrix).tocsc()
+        norms = numpy.sqrt(numpy.asarray(term_matrix.multiply(term_matrix).sum(axis=0))).ravel()
+        norms[norms == 0] = 1.0
+        term_matrix = term_matrix.dot(sparse.diags((1.0 / norms).astype(numpy.float32))).tocsr()
+
+        with self.__lock:
+            built = set(texts)
+            self.vocabulary = vocabulary
+            self.idf = idf
+            self.term_matrix = term_matrix
+            self.texts = texts
+            self.pending = [statement_text for statement_text in self.pending if statement_text not in built]
+            self.__known = built.union(self.pending)
+
+    def learn(self, texts):
+        '''
+        learn(self, texts)
+
+        Parameters
+        ----------
+            param1 : texts
+                A list of statement texts that now have a known
+                response.
+        '''
+        with self.__lock:
+            if self.term_matrix is None:
+                return None
+            for statement_text in texts:
+                if statement_text not in self.__known:
+                    self.__known.add(statement_text)
+                    self.pending.append(statement_text)
+            if len(self.pending) >= self.rebuild_threshold and self.__rebuild is None:
+                self.__rebuild = threading.Thread(name='tfidf_rebuild', target=self.__rebuild_matrix)
+                self.__rebuild.daemon = True
+                self.__rebuild.start()
+
+    def get(self, input_statement):
+        with self.__lock:
+            if self.term_matrix is None:
+                self.build()
+            vocabulary = self.vocabulary
+            idf = self.idf
+            term_matrix = self.term_matrix
+            texts = self.texts
+            pending = list(self.pending)
+
+        if len(texts) + len(pending) <= 0:
+            if self.chatbot.storage.count():
+                self.logger.info('No statements have known responses. Choosing a random response to return.')
+                random_response = self.chatbot.storage.get_random()
+                random_response.confidence = 0
+                return random_response
+            else:
+                raise self.EmptyDatasetException()
+
+        query_ids, query_weights = self.__vectorize(input_statement.text, vocabulary, idf)
+
+        closest_match = input_statement
+        closest_match.confidence = 0
+
+        if len(query_ids) > 0:
+            query = sparse.csr_matrix(
+                (query_weights, ([0] * len(query_ids), query_ids)),
+                shape=(1, term_matrix.shape[0]))
+            scores = query.dot(term_matrix)
+            if scores.nnz > 0:
+                best = scores.data.argmax()
+                confidence = round(float(scores.data[best]), 2)
+                if confidence > closest_match.confidence:
+                    closest_match = Statement(texts[scores.indices[best]])
+                    closest_match.confidence = confidence
+
+        for statement_text in pending:
+            statement_ids, statement_weights = self.__vectorize(statement_text, vocabulary, idf)
+            weights = dict(zip(statement_ids, statement_weights))
+            confidence = round(float(sum(weight * weights.get(token_id, 0.0) for token_id, weight in zip(query_ids, query_weights))), 2)
+            if confidence > closest_match.confidence:
+                closest_match = Statement(statement_text)
+                closest_match.confidence = confidence
+
+        return closest_match
+
+    def __rebuild_matrix(self):
+        '''
+        __rebuild_matrix(self)
+
+        Notes
+        -----
+            Runs on the rebuild thread. Statements learned while the
+            matrix is being built stay in self.pending if the database
+            didn't have them yet when it was read.
+        '''
+        try:
+            self.build()
+        except Exception as error:
+            self.logger.error('TfidfBestMatch: could not rebuild the matrix: ' + str(error))
+        finally:
+            with self.__lock:
+                self.__rebuild = None
+
+    def __vectorize(self, words, vocabulary, idf):
+        counts = {}
+        for token in TOKEN_PATTERN.findall(str(words).lower()):
+            if token in vocabulary:
+                token_id = vocabulary[token]
+                counts[token_id] = counts.get(token_id, 0) + 1
+        token_ids = list(counts.keys())
+        weights = numpy.array([(1.0 + math.log(counts[token_id])) * idf[token_id] for token_id in token_ids], dtype=numpy.float32)
+        norm = numpy.sqrt(weights.dot(weights))
+        if norm > 0:
+            weights = weights / norm
+        return token_ids, weights
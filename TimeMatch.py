@@ -0,0 +1,116 @@
+import threading
+from chatterbot.logic import LogicAdapter
+from StatementIndex import tokenize
+
+
+POSITIVE = [
+    'what time is it',
+    'hey what time is it',
+    'do you have the time',
+    'do you know the time',
+    'do you know what time it is',
+    'what is the time'
+]
+
+NEGATIVE = [
+    'it is time to go to sleep',
+    'what is your favorite color',
+    'i had a great time',
+    'thyme is my favorite herb',
+    'do you have time to look at my essay',
+    'how do you have the time to do all this'
+    'what is it'
+]
+
+
+def warm_adapters(chatbot, wait=False):
+    '''
+    warm_adapters(chatbot, wait)
+
+    Parameters
+    ----------
+        param1 : chatbot
+            Our ChatBot() object.
+
+        param2 : wait
+            Return once every adapter is ready instead of straight away.
+
+    Notes
+    -----
+        Calls warm() on every logic adapter of chatbot that has one.
+    '''
+    threads = [adapter.warm() for adapter in chatbot.logic.adapters if hasattr(adapter, 'warm')]
+    if wait:
+        for thread in threads:
+            thread.join()
+    return threads
+
+
+class LazyTimeLogicAdapter(LogicAdapter):
+    '''
+    LazyTimeLogicAdapter(LogicAdapter):
+
+    Parameters
+    ----------
+        param1 : **kwargs
+            positive and negative, the same example questions
+            chatterbot.logic.TimeLogicAdapter takes. They default to
+            the same ones it uses.
+
+    Members
+    -------
+        def can_process(self, statement)
+            True if the statement has the word time in it.
+
+        def process(self, statement)
+            Returns 'The current time is ...' with a confidence of 1
+            if the classifier thinks statement asks for the time and
+            0 if it doesn't.
+
+        def warm(self)
+            Imports nltk and trains the classifier on a daemon thread
+            and returns the thread. See warm_adapters().
+
+    Notes
+    -----
+        chatterbot's TimeLogicAdapter imports nltk and trains its
+        classifier when the chatbot is built. nltk pulls in scipy.stats
+        on the way, which is about 2 seconds of the start up of
+        Sentience.py for an adapter that answers one kind of question.
+        This is the same classifier trained on the same examples, but
+        nothing is imported until the first statement with the word
+        time in it shows up. Every positive example has it in it, so
+        without it there's nothing the classifier could call a time
+        question.
+
+        Left at that, the 1.5 seconds or so move into the first turn
+        that asks about the time. The window calls warm() once the
+        chatbot is built, so it's done in the background while the
+        user is still typing, and --headless doesn't bother.
+    '''
+
+    def __init__(self, **kwargs):
+        super(LazyTimeLogicAdapter, self).__init__(**kwargs)
+        self.positive = kwargs.get('positive', POSITIVE)
+        self.negative = kwargs.get('negative', NEGATIVE)
+        self.__adapter = None
+        self.__lock = threading.Lock()
+
+    def can_process(self, statement):
+        return 'time' in tokenize(statement.text)
+
+    def process(self, statement):
+        return self.__classifier().process(statement)
+
+    def warm(self):
+        thread = threading.Thread(name='time_adapter_warm', target=self.__classifier)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def __classifier(self):
+        with self.__lock:
+            if self.__adapter is None:
+                from chatterbot.logic import TimeLogicAdapter
+                self.__adapter = TimeLogicAdapter(positive=self.positive, negative=self.negative)
+            return self.__adapter
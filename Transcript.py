@@ -0,0 +1,150 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+
+Turn = namedtuple('Turn', ['speaker', 'timestamp', 'text'])
+
+
+class Transcript(object):
+    '''
+    Transcript(object):
+
+    Parameters
+    ----------
+        param1 : spill_path
+            The file that turns are moved to once they fall out of the
+            in memory window. None keeps everything in memory.
+
+        param2 : window
+            Roughly how many turns we keep in memory.
+
+        param3 : chunk_size
+            Turns are kept in lists of this many. A whole chunk is
+            spilled at a time.
+
+    Attributes
+    ----------
+        self.generation
+            Goes up by one every time the transcript is cleared, so
+            anyone keeping track of a turn number knows it's stale.
+
+        self.listeners
+            Functions that are called with every new Turn after it's
+            been appended.
+
+    Members
+    -------
+        def append(self, speaker, text, timestamp)
+            Adds a turn to the end of the transcript.
+
+        def turns(self, start)
+            Yields every Turn from number start onwards, reading the
+            spilled ones back from disk.
+
+        def render(self, start)
+            Returns the turns from number start onwards as text, one
+            'Speaker: text' per line.
+
+        def window_start(self)
+            Returns the number of the oldest turn still in memory.
+
+        def clear(self)
+            Forgets every turn and removes the spill file.
+
+    Notes
+    -----
+        This replaces the master_log string. Adding to a string copies
+        the whole thing, so a long conversation got slower to add to
+        with every turn. Here append() only puts a small tuple on the
+        end of a list, and the text is only put together when someone
+        asks for it.
+    '''
+
+    def __init__(self, spill_path=None, window=2000, chunk_size=256):
+        self.spill_path = spill_path
+        self.window = max(int(window), int(chunk_size))
+        self.chunk_size = int(chunk_size)
+        self.__chunks = deque()
+        self.__current = []
+        self.__in_memory = 0
+        self.__spilled = 0
+        self.generation = 0
+        self.listeners = []
+        self.__lock = threading.RLock()
+        if spill_path is not None and os.path.isfile(spill_path):
+            os.remove(spill_path)
+
+    def __len__(self):
+        with self.__lock:
+            return self.__spilled + self.__in_memory
+
+    def append(self, speaker, text, timestamp=None):
+        turn = Turn(sys.intern(str(speaker)), timestamp or time.time(), str(text))
+        with self.__lock:
+            self.__current.append(turn)
+            self.__in_memory += 1
+            if len(self.__current) >= self.chunk_size:
+                self.__chunks.append(self.__current)
+                self.__current = []
+                if self.spill_path is not None and self.__in_memory > self.window:
+                    chunk = self.__chunks.popleft()
+                    try:
+                        self.__spill(chunk)
+                    except (IOError, OSError):
+                        # Keep it in memory, we'll try again with the next chunk.
+                        self.__chunks.appendleft(chunk)
+        for listener in self.listeners:
+            listener(turn)
+
+    def window_start(self):
+        with self.__lock:
+            return self.__spilled
+
+    def turns(self, start=0):
+        with self.__lock:
+            spilled = self.__spilled
+            chunks = list(self.__chunks) + [list(self.__current)]
+        number = 0
+        if start < spilled:
+            with open(self.spill_path, 'r') as spill:
+                for line in spill:
+                    if number >= spilled:
+                        break
+                    if number >= start:
+                        yield Turn(*json.loads(line))
+                    number += 1
+        number = spilled
+        for chunk in chunks:
+            if number + len(chunk) <= start:
+                number += len(chunk)
+                continue
+            for turn in chunk:
+                if number >= start:
+                    yield turn
+                number += 1
+
+    def render(self, start=0):
+        return ''.join('\n' + turn.speaker + ': ' + turn.text for turn in self.turns(start))
+
+    def clear(self):
+        with self.__lock:
+            self.__chunks.clear()
+            self.__current = []
+            self.__in_memory = 0
+            self.__spilled = 0
+            self.generation += 1
+            if self.spill_path is not None and os.path.isfile(self.spill_path):
+                os.remove(self.spill_path)
+
+    def __spill(self, chunk):
+        directory = os.path.dirname(self.spill_path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(self.spill_path, 'a') as spill:
+            spill.write(''.join(json.dumps(list(turn)) + '\n' for turn in chunk))
+        self.__spilled += len(chunk)
+        self.__in_memory -= len(chunk)
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+from kivy.clock import Clock
+
+
+class UIDispatcher(object):
+    '''
+    UIDispatcher(object):
+
+    Members
+    -------
+        def set(self, widget, name, value)
+            Sets widget.name = value on the next frame.
+
+        def call(self, function, *args)
+            Calls function(*args) on the next frame.
+
+        def flush(self, dt)
+            Applies everything that's waiting. The Clock calls this,
+            nobody else should need to.
+
+    Notes
+    -----
+        Kivy widgets may only be changed on the kivy thread, and every
+        change to a TextInput's text lays it out again. Both set() and
+        call() can be used from any thread. Whatever is queued before
+        the next frame is applied in one Clock callback, and setting
+        the same property of the same widget twice only keeps the last
+        value, so the widget is laid out once however many times a
+        worker changed it.
+    '''
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__pending = OrderedDict()
+        self.__scheduled = False
+
+    def set(self, widget, name, value):
+        with self.__lock:
+            key = (id(widget), name)
+            self.__pending.pop(key, None)
+            self.__pending[key] = (setattr, (widget, name, value))
+            self.__schedule()
+
+    def call(self, function, *args):
+        with self.__lock:
+            self.__pending[(object(), None)] = (function, args)
+            self.__schedule()
+
+    def flush(self, dt=None):
+        with self.__lock:
+            pending = self.__pending
+            self.__pending = OrderedDict()
+            self.__scheduled = False
+        for function, args in pending.values():
+            function(*args)
+
+    def __schedule(self):
+        if not self.__scheduled:
+            self.__scheduled = True
+            Clock.schedule_once(self.flush)